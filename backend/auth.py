@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import base64
+import functools
 import hashlib
 import hmac
 import json
@@ -11,44 +13,46 @@ from fastapi import Depends, HTTPException, Request, status
 
 from backend import config
 from backend.db import models
+from backend.db.cache import TTLCache
 
+# initData older than this is rejected
+INIT_DATA_MAX_AGE = 3600
 
-def validate_init_data(init_data: str, bot_token: str) -> bool:
-    """Validate Telegram Mini App initData using HMAC-SHA256.
+# Recently verified initData, keyed by SHA-256 of the raw string. Each entry
+# expires together with the initData it was parsed from.
+_verified_cache = TTLCache(max_size=10000, ttl=INIT_DATA_MAX_AGE)
 
-    Algorithm per Telegram docs:
-    1. Parse URL-encoded initData
-    2. Extract and remove 'hash'
-    3. Sort remaining params alphabetically
-    4. Join as 'key=value' with newline separator
-    5. secret_key = HMAC-SHA256(key=b"WebAppData", msg=bot_token)
-    6. computed = HMAC-SHA256(key=secret_key, msg=data_check_string)
-    7. Compare computed with extracted hash
-    """
-    parsed = parse_qs(init_data, keep_blank_values=True)
+# Telegram profile fields carried in session tokens
+_SESSION_USER_FIELDS = ("id", "first_name", "last_name", "username", "language_code")
+
+
+@functools.lru_cache(maxsize=4)
+def _secret_key(bot_token: str) -> bytes:
+    """HMAC-SHA256(key="WebAppData", msg=bot_token), derived once per token."""
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
+
+@functools.lru_cache(maxsize=4)
+def _session_key(bot_token: str) -> bytes:
+    """Key for signing session tokens, kept separate from the initData key."""
+    return hmac.new(b"SessionToken", bot_token.encode(), hashlib.sha256).digest()
 
-    hash_value = parsed.pop("hash", [None])[0]
+
+def _check_hash(parsed: dict[str, list[str]], bot_token: str) -> bool:
+    """Verify the 'hash' field of already-parsed initData. Does not modify `parsed`."""
+    hash_value = parsed.get("hash", [None])[0]
     if not hash_value:
         return False
 
     # Build data-check-string: sorted key=value pairs joined by newline
     # parse_qs returns lists, take first value for each key
-    items = []
-    for key in sorted(parsed.keys()):
-        value = parsed[key][0]
-        items.append(f"{key}={value}")
-    data_check_string = "\n".join(items)
-
-    # Create secret key: HMAC-SHA256(key="WebAppData", msg=bot_token)
-    secret_key = hmac.new(
-        b"WebAppData",
-        bot_token.encode(),
-        hashlib.sha256,
-    ).digest()
+    data_check_string = "\n".join(
+        f"{key}={parsed[key][0]}" for key in sorted(parsed.keys()) if key != "hash"
+    )
 
     # Compute hash: HMAC-SHA256(key=secret_key, msg=data_check_string)
     computed_hash = hmac.new(
-        secret_key,
+        _secret_key(bot_token),
         data_check_string.encode(),
         hashlib.sha256,
     ).hexdigest()
@@ -56,9 +60,27 @@ def validate_init_data(init_data: str, bot_token: str) -> bool:
     return hmac.compare_digest(computed_hash, hash_value)
 
 
+def validate_init_data(init_data: str, bot_token: str) -> bool:
+    """Validate Telegram Mini App initData using HMAC-SHA256.
+
+    Algorithm per Telegram docs:
+    1. Parse URL-encoded initData
+    2. Extract and remove 'hash'
+    3. Sort remaining params alphabetically
+    4. Join as 'key=value' with newline separator
+    5. secret_key = HMAC-SHA256(key=b"WebAppData", msg=bot_token)
+    6. computed = HMAC-SHA256(key=secret_key, msg=data_check_string)
+    7. Compare computed with extracted hash
+    """
+    return _check_hash(parse_qs(init_data, keep_blank_values=True), bot_token)
+
+
 def parse_init_data(init_data: str) -> dict[str, Any]:
     """Parse initData and extract user information."""
-    parsed = parse_qs(init_data, keep_blank_values=True)
+    return _decode_fields(parse_qs(init_data, keep_blank_values=True))
+
+
+def _decode_fields(parsed: dict[str, list[str]]) -> dict[str, Any]:
     result: dict[str, Any] = {}
 
     for key, values in parsed.items():
@@ -74,47 +96,49 @@ def parse_init_data(init_data: str) -> dict[str, Any]:
     return result
 
 
-async def get_current_user(request: Request) -> dict[str, Any]:
-    """FastAPI dependency: extract and validate Telegram user from initData.
+def verify_init_data(init_data_raw: str) -> tuple[dict[str, Any], float]:
+    """Validate initData and return (user, expires_at epoch seconds).
 
-    Expects header: Authorization: tma <initData>
+    Results are cached until the initData expires, so repeat requests with
+    the same initData skip parsing and the HMAC. Raises 401 on failure.
     """
-    auth_header = request.headers.get("Authorization", "")
+    cache_key = hashlib.sha256(init_data_raw.encode()).digest()
+    cached = _verified_cache.get(cache_key)
+    if cached is not None:
+        user, expires_at = cached  # type: ignore[misc]
+        if time.time() < expires_at:
+            return dict(user), expires_at
 
-    if not auth_header.startswith("tma "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing or invalid Authorization header. Expected: tma <initData>",
-        )
-
-    init_data_raw = auth_header[4:]
+    parsed = parse_qs(init_data_raw, keep_blank_values=True)
 
     # Validate signature
-    if not validate_init_data(init_data_raw, config.TELEGRAM_BOT_TOKEN):
+    if not _check_hash(parsed, config.TELEGRAM_BOT_TOKEN):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid initData signature",
         )
 
     # Check expiration (1 hour)
-    parsed = parse_qs(init_data_raw, keep_blank_values=True)
+    now = time.time()
+    expires_at = now + INIT_DATA_MAX_AGE
     auth_date_str = parsed.get("auth_date", [None])[0]
     if auth_date_str:
         try:
             auth_date = int(auth_date_str)
-            if time.time() - auth_date > 3600:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="initData has expired",
-                )
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid auth_date",
             )
+        expires_at = auth_date + INIT_DATA_MAX_AGE
+        if now > expires_at:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="initData has expired",
+            )
 
     # Extract user
-    data = parse_init_data(init_data_raw)
+    data = _decode_fields(parsed)
     user = data.get("user")
     if not user or not isinstance(user, dict) or "id" not in user:
         raise HTTPException(
@@ -122,6 +146,82 @@ async def get_current_user(request: Request) -> dict[str, Any]:
             detail="User data not found in initData",
         )
 
+    _verified_cache.put(cache_key, (user, expires_at), ttl=expires_at - now)
+    return dict(user), expires_at
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def issue_session_token(user: dict[str, Any], expires_at: float) -> tuple[str, int]:
+    """Sign a session token for a verified user. Returns (token, exp).
+
+    The token is `<payload>.<signature>`, both base64url: the payload is the
+    user's profile fields plus `exp`, the signature an HMAC-SHA256 of it.
+    """
+    exp = int(min(time.time() + config.SESSION_TOKEN_TTL, expires_at))
+    payload = {
+        "u": {k: user[k] for k in _SESSION_USER_FIELDS if user.get(k) is not None},
+        "exp": exp,
+    }
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    signature = hmac.new(_session_key(config.TELEGRAM_BOT_TOKEN), body.encode(), hashlib.sha256).digest()
+    return f"{body}.{_b64encode(signature)}", exp
+
+
+def verify_session_token(token: str) -> dict[str, Any] | None:
+    """Return the user from a valid, unexpired session token, else None."""
+    body, _, signature = token.partition(".")
+    if not body or not signature:
+        return None
+    expected = hmac.new(_session_key(config.TELEGRAM_BOT_TOKEN), body.encode(), hashlib.sha256).digest()
+    try:
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        payload = json.loads(_b64decode(body))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(payload, dict) or payload.get("exp", 0) <= time.time():
+        return None
+    user = payload.get("u")
+    if not isinstance(user, dict) or "id" not in user:
+        return None
+    return user
+
+
+def verified_cache_info() -> dict:
+    return _verified_cache.stats()
+
+
+async def get_current_user(request: Request) -> dict[str, Any]:
+    """FastAPI dependency: extract and validate Telegram user from initData.
+
+    Expects header: Authorization: tma <initData>, or Authorization: Bearer
+    <token> with a token from POST /api/user/session.
+    """
+    auth_header = request.headers.get("Authorization", "")
+
+    if auth_header.startswith("Bearer "):
+        user = verify_session_token(auth_header[7:])
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired session token",
+            )
+        return user
+
+    if not auth_header.startswith("tma "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid Authorization header. Expected: tma <initData>",
+        )
+
+    user, _ = verify_init_data(auth_header[4:])
     return user
 
 
@@ -129,7 +229,11 @@ async def ensure_user(
     request: Request,
     user: dict[str, Any] = Depends(get_current_user),
 ) -> dict[str, Any]:
-    """Validate auth and upsert user record in DB. Returns merged user dict."""
+    """Validate auth and upsert user record in DB. Returns merged user dict.
+
+    The upsert is skipped while the cached row still matches the profile
+    (see models.get_or_create_user), so read-only requests stay read-only.
+    """
     db = request.app.state.db
     db_user = await models.get_or_create_user(
         db,
@@ -11,9 +11,16 @@ load_dotenv(_env_path, override=True)
 
 # Telegram Bot Token
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
+# Lifetime of session tokens from POST /api/user/session (capped by initData expiry)
+SESSION_TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL", "3600"))
 
 # Database
 DATABASE_PATH = os.getenv("DATABASE_PATH", "database/flashcards.db")
+# Read-only connections used by SELECT-only queries (WAL allows concurrent readers)
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+# Group commit: coalesce writes for up to N ms or M pending commits (0 ms disables)
+DB_COMMIT_INTERVAL_MS = int(os.getenv("DB_COMMIT_INTERVAL_MS", "5"))
+DB_COMMIT_MAX_BATCH = int(os.getenv("DB_COMMIT_MAX_BATCH", "64"))
 
 # LLM Provider Configuration
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
@@ -25,6 +32,21 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 # Model Selection
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4.1-mini")
 
+# Optional second provider: used when the first fails or is slow (empty = off)
+LLM_FALLBACK_PROVIDER = os.getenv("LLM_FALLBACK_PROVIDER", "").lower()
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "")
+# Send a hedged request to the fallback after this many ms without an answer (0 = failover only)
+LLM_HEDGE_AFTER_MS = int(os.getenv("LLM_HEDGE_AFTER_MS", "3000"))
+# Per-call deadline, concurrency ceiling and circuit breaker for each provider
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "30"))
+# Deadline for vision and multi-word batch calls, which generate far more tokens
+LLM_LONG_CALL_TIMEOUT = float(os.getenv("LLM_LONG_CALL_TIMEOUT", "120"))
+# Deadline for a whole streamed explanation (the first token still gets LLM_CALL_TIMEOUT)
+LLM_STREAM_TIMEOUT = float(os.getenv("LLM_STREAM_TIMEOUT", "120"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
 # Frontend URL for CORS
 FRONTEND_URL = os.getenv("FRONTEND_URL", "https://your-frontend-domain.com")
 
@@ -44,15 +66,48 @@ TTS_VOICE = os.getenv("TTS_VOICE", "coral")
 # Cache sizes
 TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "5000"))
 EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "2000"))
+# Persistent LLM answer cache in the database (0 days disables it)
+LLM_CACHE_TTL_DAYS = int(os.getenv("LLM_CACHE_TTL_DAYS", "90"))
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "100000"))
+# Translate misses arriving within this window are sent as one multi-word call (0 = off)
+LLM_TRANSLATE_BATCH_WINDOW_MS = int(os.getenv("LLM_TRANSLATE_BATCH_WINDOW_MS", "0"))
+LLM_TRANSLATE_BATCH_MAX_WORDS = int(os.getenv("LLM_TRANSLATE_BATCH_MAX_WORDS", "20"))
+# Memory-mapped lexicon built by scripts/build_lexicon.py, checked before the LLM (empty or missing file = off)
+LEXICON_PATH = os.getenv("LEXICON_PATH", "database/lexicon.bin")
+
+# Image uploads: downsized to this long edge and re-encoded as JPEG before the vision call
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1568"))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+IMAGE_PREP_WORKERS = int(os.getenv("IMAGE_PREP_WORKERS", "2"))
+# Image translation results kept in memory, and how many of the 64 perceptual-hash
+# bits may differ for a different upload to reuse one (0 = identical files only)
+IMAGE_CACHE_SIZE = int(os.getenv("IMAGE_CACHE_SIZE", "500"))
+IMAGE_PHASH_MAX_BITS = int(os.getenv("IMAGE_PHASH_MAX_BITS", "0"))
+# Background image translation jobs (POST /api/cards/translate-image/jobs)
+IMAGE_JOB_WORKERS = int(os.getenv("IMAGE_JOB_WORKERS", "4"))
+IMAGE_JOB_QUEUE_SIZE = int(os.getenv("IMAGE_JOB_QUEUE_SIZE", "32"))
+# Most unfinished jobs one user may have in a worker's queue
+IMAGE_JOB_MAX_PER_USER = int(os.getenv("IMAGE_JOB_MAX_PER_USER", "3"))
+# Seconds a finished job's result stays available for polling
+IMAGE_JOB_TTL_SECONDS = int(os.getenv("IMAGE_JOB_TTL_SECONDS", "600"))
 
 # Rate limiting (requests per hour per user)
 RATE_LIMIT_TRANSLATE = int(os.getenv("RATE_LIMIT_TRANSLATE", "60"))
 RATE_LIMIT_EXPLAIN = int(os.getenv("RATE_LIMIT_EXPLAIN", "30"))
 RATE_LIMIT_IMAGE = int(os.getenv("RATE_LIMIT_IMAGE", "10"))
 RATE_LIMIT_TTS = int(os.getenv("RATE_LIMIT_TTS", "200"))
+# Most (user, endpoint group) pairs tracked at once; least recently used are dropped
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Where limiter state lives: "memory" (per process) or "sqlite" (shared by all workers)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "database/rate_limit.db")
 
 # Daily cost ceiling per user (USD). Admin is exempt.
 MAX_DAILY_COST_PER_USER = float(os.getenv("MAX_DAILY_COST_PER_USER", "0.10"))
+# "process": check the ceiling against an in-memory total of this process's
+# logged calls instead of querying api_usage. Only correct with one worker
+# process; off ("") by default.
+COST_LEDGER = os.getenv("COST_LEDGER", "").lower()
 
 # Input length limits
 MAX_TRANSLATE_INPUT_LENGTH = int(os.getenv("MAX_TRANSLATE_INPUT_LENGTH", "100"))
@@ -0,0 +1,123 @@
+"""Group commit: coalesce commits from concurrent requests into one transaction."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBatcher:
+    """Batches commits on the shared writer connection.
+
+    All writes already run on one aiosqlite connection, so statements from
+    concurrent requests naturally land in the same implicit transaction.
+    Instead of every helper committing on its own, callers register with
+    ``commit()`` and a background task commits once per window: after
+    ``interval_ms`` from the first pending write, or immediately when
+    ``max_batch`` commits are pending. ``commit(wait=True)`` resolves only once
+    the covering COMMIT has finished; ``wait=False`` is fire-and-forget.
+    Every COMMIT is taken under the writer lock so it never lands in the
+    middle of a ``Database.transaction()`` block.
+    """
+
+    def __init__(
+        self,
+        conn: aiosqlite.Connection,
+        lock: asyncio.Lock,
+        interval_ms: int,
+        max_batch: int,
+    ) -> None:
+        self._conn = conn
+        self._lock = lock
+        self._interval = interval_ms / 1000
+        self._max_batch = max(1, max_batch)
+        self._pending = 0
+        self._waiters: list[asyncio.Future] = []
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self.commits = 0
+        self.batched_writes = 0
+
+    def start(self) -> None:
+        if self._task is None and self._interval > 0:
+            self._task = asyncio.create_task(self._run(), name="db-write-batcher")
+
+    async def commit(self, wait: bool = True) -> None:
+        """Schedule a commit of everything executed so far on the writer."""
+        if self._task is None or self._closed:
+            # Batching disabled (interval 0) or shutting down: commit inline
+            async with self._lock:
+                await self._conn.commit()
+            self.commits += 1
+            return
+
+        self._pending += 1
+        waiter = None
+        if wait:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        self._has_pending.set()
+        if self._pending >= self._max_batch:
+            self._batch_full.set()
+        if waiter is not None:
+            await waiter
+
+    async def flush(self) -> None:
+        """Commit all pending writes now and release their waiters."""
+        pending, waiters = self._pending, self._waiters
+        self._pending, self._waiters = 0, []
+        self._has_pending.clear()
+        self._batch_full.clear()
+        try:
+            async with self._lock:
+                await self._conn.commit()
+        except Exception as e:
+            logger.exception("Group commit of %d writes failed", pending)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        self.commits += 1
+        self.batched_writes += pending
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            if not self._closed:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=self._interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+            if self._closed:
+                return
+
+    async def close(self) -> None:
+        """Stop the background task and flush whatever is still pending.
+
+        The task is woken rather than cancelled so an in-progress COMMIT is
+        never abandoned with waiters still attached to it.
+        """
+        self._closed = True
+        if self._task is not None:
+            self._has_pending.set()
+            self._batch_full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "commits": self.commits,
+            "batched_writes": self.batched_writes,
+            "pending": self._pending,
+        }
@@ -0,0 +1,92 @@
+"""In-process caches for values derived from the database."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Hashable
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._cache: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> object | None:
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._cache[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: object, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self._ttl if ttl is None else ttl)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self._max_size:
+            self._cache.popitem(last=False)
+        self._cache[key] = (expires_at, value)
+
+    def pop(self, key: Hashable) -> None:
+        self._cache.pop(key, None)
+
+    @property
+    def size(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "hits": self.hits, "misses": self.misses}
+
+
+def utc_today() -> str:
+    """Current UTC date as YYYY-MM-DD, the same day boundary as SQLite's date('now')."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class DailyCostLedger:
+    """Running per-user cost totals for the current UTC day.
+
+    Loaded once from the database, then kept current by adding each logged
+    call. The first access on a new UTC day starts from zero.
+    """
+
+    def __init__(self) -> None:
+        self._day: str | None = None
+        self._costs: dict[int, float] = {}
+
+    def load(self, day: str, totals: dict[int, float]) -> None:
+        self._day = day
+        self._costs = dict(totals)
+
+    def _roll_over(self, day: str) -> bool:
+        if self._day is None:
+            return False
+        if self._day != day:
+            self._day = day
+            self._costs = {}
+        return True
+
+    def add(self, user_id: int, cost: float) -> None:
+        if self._roll_over(utc_today()):
+            self._costs[user_id] = self._costs.get(user_id, 0.0) + cost
+
+    def get(self, user_id: int) -> float | None:
+        """Today's total for a user, or None if the ledger was never loaded."""
+        if not self._roll_over(utc_today()):
+            return None
+        return self._costs.get(user_id, 0.0)
+
+    @property
+    def loaded(self) -> bool:
+        return self._day is not None
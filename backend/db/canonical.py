@@ -0,0 +1,45 @@
+"""Canonical form of user-typed words, for cache keys and duplicate checks."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Spelling variants NFKC leaves alone. Russian ё is routinely written е.
+_FOLD = str.maketrans({
+    "ё": "е",
+    "’": "'",  # right single quotation mark
+    "‘": "'",  # left single quotation mark
+    "ʼ": "'",  # modifier letter apostrophe
+    "‐": "-",  # hyphen
+    "‑": "-",  # non-breaking hyphen
+})
+
+
+# Stripped from the ends of a word: sentence punctuation, quotes, brackets,
+# separators. Dashes stay ("-요" is a suffix) and so do symbols ("C++").
+_EDGE_CATEGORIES = {"Po", "Pi", "Pf", "Ps", "Pe", "Zs", "Zl", "Zp"}
+
+
+def _is_edge_junk(ch: str) -> bool:
+    return unicodedata.category(ch) in _EDGE_CATEGORIES
+
+
+def canonical_text(text: str) -> str:
+    """Fold the spellings a user may type for one word to a single key.
+
+    NFKC (which composes NFD Hangul jamo and maps full-width forms to ASCII),
+    casefold, ё→е and typographic quotes/hyphens to ASCII, whitespace
+    collapsed, and punctuation stripped from both ends ("Hello!",
+    "«привет»"). Inner punctuation ("don't", "e-mail") is kept. Input that is
+    nothing but punctuation keeps its folded form rather than becoming "".
+    """
+    folded = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text).casefold().translate(_FOLD)).strip()
+    start, end = 0, len(folded)
+    while start < end and _is_edge_junk(folded[start]):
+        start += 1
+    while end > start and _is_edge_junk(folded[end - 1]):
+        end -= 1
+    return folded[start:end] or folded
@@ -1,5 +1,16 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
 import aiosqlite
 
+from backend.db.batcher import WriteBatcher
+from backend.db.canonical import canonical_text
+
 _SCHEMA = """
 CREATE TABLE IF NOT EXISTS flashcards (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -98,20 +109,227 @@ CREATE TABLE IF NOT EXISTS review_history (
 );
 """
 
+# Per-(user, language pair, deck) card counters, kept in sync by triggers.
+# `due` counts cards with next_review <= due_watermark; `next_due_at` is a lower
+# bound on the earliest next_review after the watermark. Once now passes
+# next_due_at the row is refreshed (see models.get_card_counts).
+_CARD_COUNTERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS card_counters (
+    user_id INTEGER NOT NULL,
+    language_pair TEXT NOT NULL,
+    deck_id INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    due INTEGER NOT NULL DEFAULT 0,
+    new_count INTEGER NOT NULL DEFAULT 0,
+    learning_count INTEGER NOT NULL DEFAULT 0,
+    young_count INTEGER NOT NULL DEFAULT 0,
+    mature_count INTEGER NOT NULL DEFAULT 0,
+    due_watermark TEXT NOT NULL,
+    next_due_at TEXT,
+    PRIMARY KEY (user_id, language_pair, deck_id)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_card_counters_insert AFTER INSERT ON flashcards
+BEGIN
+    INSERT OR IGNORE INTO card_counters (user_id, language_pair, deck_id, due_watermark)
+    VALUES (NEW.user_id, NEW.language_pair, NEW.deck_id, datetime('now'));
+    UPDATE card_counters SET
+        total = total + 1,
+        due = due + IFNULL(NEW.next_review <= due_watermark, 0),
+        next_due_at = CASE
+            WHEN NEW.next_review > due_watermark AND (next_due_at IS NULL OR NEW.next_review < next_due_at)
+            THEN NEW.next_review ELSE next_due_at END,
+        new_count = new_count + IFNULL(NEW.interval_days = 0, 0),
+        learning_count = learning_count + IFNULL(NEW.interval_days BETWEEN 1 AND 6, 0),
+        young_count = young_count + IFNULL(NEW.interval_days BETWEEN 7 AND 30, 0),
+        mature_count = mature_count + IFNULL(NEW.interval_days > 30, 0)
+    WHERE user_id = NEW.user_id AND language_pair = NEW.language_pair AND deck_id = NEW.deck_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_card_counters_delete AFTER DELETE ON flashcards
+BEGIN
+    UPDATE card_counters SET
+        total = total - 1,
+        due = due - IFNULL(OLD.next_review <= due_watermark, 0),
+        new_count = new_count - IFNULL(OLD.interval_days = 0, 0),
+        learning_count = learning_count - IFNULL(OLD.interval_days BETWEEN 1 AND 6, 0),
+        young_count = young_count - IFNULL(OLD.interval_days BETWEEN 7 AND 30, 0),
+        mature_count = mature_count - IFNULL(OLD.interval_days > 30, 0)
+    WHERE user_id = OLD.user_id AND language_pair = OLD.language_pair AND deck_id = OLD.deck_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_card_counters_update
+AFTER UPDATE OF user_id, language_pair, deck_id, next_review, interval_days ON flashcards
+BEGIN
+    UPDATE card_counters SET
+        total = total - 1,
+        due = due - IFNULL(OLD.next_review <= due_watermark, 0),
+        new_count = new_count - IFNULL(OLD.interval_days = 0, 0),
+        learning_count = learning_count - IFNULL(OLD.interval_days BETWEEN 1 AND 6, 0),
+        young_count = young_count - IFNULL(OLD.interval_days BETWEEN 7 AND 30, 0),
+        mature_count = mature_count - IFNULL(OLD.interval_days > 30, 0)
+    WHERE user_id = OLD.user_id AND language_pair = OLD.language_pair AND deck_id = OLD.deck_id;
+    INSERT OR IGNORE INTO card_counters (user_id, language_pair, deck_id, due_watermark)
+    VALUES (NEW.user_id, NEW.language_pair, NEW.deck_id, datetime('now'));
+    UPDATE card_counters SET
+        total = total + 1,
+        due = due + IFNULL(NEW.next_review <= due_watermark, 0),
+        next_due_at = CASE
+            WHEN NEW.next_review > due_watermark AND (next_due_at IS NULL OR NEW.next_review < next_due_at)
+            THEN NEW.next_review ELSE next_due_at END,
+        new_count = new_count + IFNULL(NEW.interval_days = 0, 0),
+        learning_count = learning_count + IFNULL(NEW.interval_days BETWEEN 1 AND 6, 0),
+        young_count = young_count + IFNULL(NEW.interval_days BETWEEN 7 AND 30, 0),
+        mature_count = mature_count + IFNULL(NEW.interval_days > 30, 0)
+    WHERE user_id = NEW.user_id AND language_pair = NEW.language_pair AND deck_id = NEW.deck_id;
+END;
+"""
+
+# Durable second tier for LLM translate/explain answers (see services/llm_cache.py).
+# key_hash covers kind, normalized input, model and prompt version.
+_LLM_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    input_key TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Explanation markdown stored once per (word, translation, language pair,
+# prompt version) and shared by every card with that content. Rebuilds the
+# per-card explanations table as a link to it (see migration 14).
+_EXPLANATION_TEXTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS explanation_texts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL UNIQUE,
+    source_text TEXT NOT NULL,
+    target_text TEXT NOT NULL,
+    language_pair TEXT NOT NULL,
+    prompt_version INTEGER NOT NULL,
+    explanation TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS explanations_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    card_id INTEGER NOT NULL UNIQUE,
+    user_id INTEGER NOT NULL,
+    text_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (card_id) REFERENCES flashcards(id) ON DELETE CASCADE,
+    FOREIGN KEY (text_id) REFERENCES explanation_texts(id)
+);
+"""
+
+# Trigram full-text index over card text, synced from flashcards by triggers.
+# Trigrams work on characters, so Hangul and Cyrillic need no word
+# segmentation; case folding is Unicode-aware.
+#
+# The extra `scope` column holds the owner's id spelled as three Private Use
+# Area characters (base 6400), which the trigram tokenizer indexes as one
+# token that only that user's cards carry. Searches put it in the MATCH
+# expression, so FTS5 intersects the query with one user's postings instead
+# of matching every user's cards and filtering after the join.
+_FTS_SCOPE_BASE = 0xE000
+_FTS_SCOPE_RADIX = 6400
+
+
+def _fts_scope_sql(user_id: str) -> str:
+    r = _FTS_SCOPE_RADIX
+    digits = (f"{user_id} % {r}", f"({user_id} / {r}) % {r}", f"({user_id} / {r * r}) % {r}")
+    return "char(" + ", ".join(f"{_FTS_SCOPE_BASE} + {d}" for d in digits) + ")"
+
+
+def fts_scope(user_id: int) -> str:
+    """The flashcards_fts `scope` value for a user (mirrors _fts_scope_sql)."""
+    r = _FTS_SCOPE_RADIX
+    return "".join(chr(_FTS_SCOPE_BASE + (user_id // r**i) % r) for i in range(3))
+
+
+_FTS_COLUMNS = "source_text, target_text, example_source, example_target, scope"
+_FLASHCARDS_FTS_SCHEMA = f"""
+CREATE VIEW IF NOT EXISTS flashcards_fts_content AS
+SELECT id, source_text, target_text, example_source, example_target,
+    {_fts_scope_sql("user_id")} AS scope
+FROM flashcards;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5(
+    {_FTS_COLUMNS},
+    content='flashcards_fts_content', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_flashcards_fts_insert AFTER INSERT ON flashcards
+BEGIN
+    INSERT INTO flashcards_fts (rowid, {_FTS_COLUMNS})
+    VALUES (NEW.id, NEW.source_text, NEW.target_text, NEW.example_source, NEW.example_target,
+        {_fts_scope_sql("NEW.user_id")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flashcards_fts_delete AFTER DELETE ON flashcards
+BEGIN
+    INSERT INTO flashcards_fts (flashcards_fts, rowid, {_FTS_COLUMNS})
+    VALUES ('delete', OLD.id, OLD.source_text, OLD.target_text, OLD.example_source, OLD.example_target,
+        {_fts_scope_sql("OLD.user_id")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flashcards_fts_update
+AFTER UPDATE OF source_text, target_text, example_source, example_target, user_id ON flashcards
+BEGIN
+    INSERT INTO flashcards_fts (flashcards_fts, rowid, {_FTS_COLUMNS})
+    VALUES ('delete', OLD.id, OLD.source_text, OLD.target_text, OLD.example_source, OLD.example_target,
+        {_fts_scope_sql("OLD.user_id")});
+    INSERT INTO flashcards_fts (rowid, {_FTS_COLUMNS})
+    VALUES (NEW.id, NEW.source_text, NEW.target_text, NEW.example_source, NEW.example_target,
+        {_fts_scope_sql("NEW.user_id")});
+END;
+"""
+
+# Image translation jobs (see services/image_jobs.py). A job runs in the
+# worker process that accepted it; its state lives here so polls and event
+# streams served by any worker see it.
+_IMAGE_JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_jobs (
+    id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    job_key TEXT NOT NULL,
+    language_pair TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error_kind TEXT,
+    error_detail TEXT,
+    retry_after INTEGER,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+"""
+
 _INDEXES = """
 CREATE INDEX IF NOT EXISTS idx_user_review ON flashcards(user_id, next_review);
 CREATE INDEX IF NOT EXISTS idx_user_source ON flashcards(user_id, language_pair, source_text);
+CREATE INDEX IF NOT EXISTS idx_user_source_key ON flashcards(user_id, language_pair, source_key);
 CREATE INDEX IF NOT EXISTS idx_deck_user ON decks(user_id, language_pair);
 CREATE INDEX IF NOT EXISTS idx_flashcard_deck ON flashcards(deck_id);
 CREATE INDEX IF NOT EXISTS idx_explanation_card ON explanations(card_id);
+CREATE INDEX IF NOT EXISTS idx_explanation_text ON explanations(text_id);
 CREATE INDEX IF NOT EXISTS idx_user_lang_review ON flashcards(user_id, language_pair, next_review);
+CREATE INDEX IF NOT EXISTS idx_user_created ON flashcards(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_user_lang_created ON flashcards(user_id, language_pair, created_at);
 CREATE INDEX IF NOT EXISTS idx_api_usage_user ON api_usage(user_id);
 CREATE INDEX IF NOT EXISTS idx_api_usage_created ON api_usage(created_at);
 CREATE INDEX IF NOT EXISTS idx_api_usage_user_date ON api_usage(user_id, created_at);
 CREATE UNIQUE INDEX IF NOT EXISTS idx_tts_hash ON tts_cache(text_hash);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_llm_cache_hash ON llm_cache(key_hash);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at);
 CREATE INDEX IF NOT EXISTS idx_review_history_user ON review_history(user_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_review_history_card ON review_history(card_id);
 CREATE INDEX IF NOT EXISTS idx_review_history_user_mode ON review_history(user_id, study_mode, created_at);
+CREATE INDEX IF NOT EXISTS idx_image_jobs_key ON image_jobs(job_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_image_jobs_created ON image_jobs(created_at);
 """
 
 _MIGRATION_SETUP = """
@@ -380,8 +598,288 @@ async def _run_migration_10(conn: aiosqlite.Connection) -> None:
     await conn.commit()
 
 
-async def init_db(db_path: str) -> aiosqlite.Connection:
-    """Open the database, enable WAL mode, and create schema if needed."""
+class Database:
+    """One writer connection plus a bounded pool of read-only connections.
+
+    Exposes the subset of the aiosqlite.Connection API the models use
+    (``execute``, ``execute_fetchall``, ``executescript``, ``commit``), always
+    routed to the writer, so existing call sites keep working. SELECT-only
+    helpers borrow a reader via ``read()``; WAL mode lets those run
+    concurrently with the writer.
+    ``commit()`` goes through the group-commit batcher, and ``transaction()``
+    runs a multi-statement block atomically.
+    """
+
+    def __init__(
+        self,
+        writer: aiosqlite.Connection,
+        readers: list[aiosqlite.Connection],
+        write_lock: asyncio.Lock,
+        batcher: WriteBatcher,
+    ) -> None:
+        self.writer = writer
+        self.batcher = batcher
+        self._write_lock = write_lock
+        self._readers = readers
+        self._pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        for reader in readers:
+            self._pool.put_nowait(reader)
+
+    @property
+    def read_pool_size(self) -> int:
+        return len(self._readers)
+
+    async def execute(self, sql: str, parameters=None) -> aiosqlite.Cursor:
+        async with self._write_lock:
+            return await self.writer.execute(sql, parameters)
+
+    async def execute_fetchall(self, sql: str, parameters=None):
+        """Execute and fetch under the lock (needed for UPDATE ... RETURNING)."""
+        async with self._write_lock:
+            return await self.writer.execute_fetchall(sql, parameters)
+
+    async def executescript(self, sql_script: str) -> aiosqlite.Cursor:
+        async with self._write_lock:
+            return await self.writer.executescript(sql_script)
+
+    async def commit(self, wait: bool = True) -> None:
+        """Commit via the batcher. ``wait=False`` returns before the write is durable."""
+        await self.batcher.commit(wait=wait)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run a block of statements atomically on the writer.
+
+        Holds the write lock for the whole block, so statements from other
+        requests and group commits cannot interleave with it. The block runs
+        inside a savepoint: an exception rolls back only this block's
+        statements, while success leaves them in the open transaction to be
+        committed by the batcher. Use the yielded raw connection inside the
+        block; calling ``Database.execute`` there would deadlock on the lock.
+        """
+        async with self._write_lock:
+            if not self.writer.in_transaction:
+                await self.writer.execute("BEGIN")
+            await self.writer.execute("SAVEPOINT tx")
+            try:
+                yield self.writer
+            except BaseException:
+                await self.writer.execute("ROLLBACK TO tx")
+                await self.writer.execute("RELEASE tx")
+                raise
+            await self.writer.execute("RELEASE tx")
+        await self.commit()
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection. Falls back to the writer if there is no pool."""
+        if not self._readers:
+            yield self.writer
+            return
+        conn = await self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put_nowait(conn)
+
+    async def close(self) -> None:
+        await self.batcher.close()
+        for reader in self._readers:
+            await reader.close()
+        await self.writer.close()
+
+
+async def _open_reader(db_path: str) -> aiosqlite.Connection:
+    """Open a read-only connection to an existing database file."""
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    conn = await aiosqlite.connect(uri, uri=True)
+    conn.row_factory = aiosqlite.Row
+    await conn.execute("PRAGMA busy_timeout=5000")
+    await conn.execute("PRAGMA cache_size=-2000")
+    await conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+async def _run_migration_11(conn: aiosqlite.Connection) -> None:
+    """Migration 11: Create card_counters with its triggers and backfill from flashcards."""
+    cursor = await conn.execute("SELECT 1 FROM schema_versions WHERE version = 11")
+    if await cursor.fetchone():
+        return
+
+    await conn.executescript(_CARD_COUNTERS_SCHEMA)
+    await conn.execute("DELETE FROM card_counters")
+    await conn.execute(
+        """
+        INSERT INTO card_counters
+            (user_id, language_pair, deck_id, total, due,
+             new_count, learning_count, young_count, mature_count,
+             due_watermark, next_due_at)
+        SELECT
+            user_id, language_pair, deck_id, COUNT(*),
+            SUM(IFNULL(next_review <= datetime('now'), 0)),
+            SUM(IFNULL(interval_days = 0, 0)),
+            SUM(IFNULL(interval_days BETWEEN 1 AND 6, 0)),
+            SUM(IFNULL(interval_days BETWEEN 7 AND 30, 0)),
+            SUM(IFNULL(interval_days > 30, 0)),
+            datetime('now'),
+            MIN(CASE WHEN next_review > datetime('now') THEN next_review END)
+        FROM flashcards
+        GROUP BY user_id, language_pair, deck_id
+        """
+    )
+    await conn.execute(
+        "INSERT INTO schema_versions (version, description) VALUES (11, 'create card_counters and backfill')"
+    )
+    await conn.commit()
+
+
+async def _run_migration_12(conn: aiosqlite.Connection) -> None:
+    """Migration 12: Create the flashcards_fts search index and backfill it."""
+    cursor = await conn.execute("SELECT 1 FROM schema_versions WHERE version = 12")
+    if await cursor.fetchone():
+        return
+
+    await conn.executescript(_FLASHCARDS_FTS_SCHEMA)
+    await conn.execute("INSERT INTO flashcards_fts (flashcards_fts) VALUES ('rebuild')")
+    await conn.execute(
+        "INSERT INTO schema_versions (version, description) VALUES (12, 'create flashcards_fts trigram index')"
+    )
+    await conn.commit()
+
+
+async def _run_migration_13(conn: aiosqlite.Connection) -> None:
+    """Migration 13: Create llm_cache table for persisted LLM answers."""
+    cursor = await conn.execute("SELECT 1 FROM schema_versions WHERE version = 13")
+    if await cursor.fetchone():
+        return
+
+    await conn.executescript(_LLM_CACHE_SCHEMA)
+    await conn.execute(
+        "INSERT INTO schema_versions (version, description) VALUES (13, 'create llm_cache table')"
+    )
+    await conn.commit()
+
+
+def explanation_content_hash(
+    source_text: str, target_text: str, language_pair: str, prompt_version: int
+) -> str:
+    """Compute SHA-256 content key for explanation_texts (case- and whitespace-insensitive)."""
+    normalized = f"{source_text.strip().lower()}|{target_text.strip().lower()}|{language_pair}|{prompt_version}"
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+async def _run_migration_14(conn: aiosqlite.Connection) -> None:
+    """Migration 14: Move explanation text into content-addressed explanation_texts.
+
+    Existing per-card rows are deduplicated by card content; the earliest
+    explanation for each key is kept. They were all generated with prompt
+    version 1.
+    """
+    cursor = await conn.execute("SELECT 1 FROM schema_versions WHERE version = 14")
+    if await cursor.fetchone():
+        return
+
+    await conn.executescript(_EXPLANATION_TEXTS_SCHEMA)
+    cursor = await conn.execute(
+        """
+        SELECT e.card_id, e.user_id, e.explanation, e.created_at,
+               f.source_text, f.target_text, f.language_pair
+        FROM explanations e
+        JOIN flashcards f ON f.id = e.card_id
+        ORDER BY e.created_at, e.id
+        """
+    )
+    rows = await cursor.fetchall()
+    text_ids: dict[str, int] = {}
+    for row in rows:
+        content_hash = explanation_content_hash(row["source_text"], row["target_text"], row["language_pair"], 1)
+        if content_hash not in text_ids:
+            cursor = await conn.execute(
+                """
+                INSERT INTO explanation_texts
+                    (content_hash, source_text, target_text, language_pair, prompt_version, explanation, created_at)
+                VALUES (?, ?, ?, ?, 1, ?, ?)
+                """,
+                (content_hash, row["source_text"], row["target_text"], row["language_pair"],
+                 row["explanation"], row["created_at"]),
+            )
+            text_ids[content_hash] = cursor.lastrowid  # type: ignore[assignment]
+        await conn.execute(
+            "INSERT INTO explanations_new (card_id, user_id, text_id, created_at) VALUES (?, ?, ?, ?)",
+            (row["card_id"], row["user_id"], text_ids[content_hash], row["created_at"]),
+        )
+
+    await conn.execute("DROP TABLE explanations")
+    await conn.execute("ALTER TABLE explanations_new RENAME TO explanations")
+    await conn.execute(
+        "INSERT INTO schema_versions (version, description) VALUES (14, 'content-addressed explanation_texts')"
+    )
+    await conn.commit()
+
+
+async def _run_migration_15(conn: aiosqlite.Connection) -> None:
+    """Migration 15: Add flashcards.source_key (canonical source text) for duplicate checks."""
+    cursor = await conn.execute("SELECT 1 FROM schema_versions WHERE version = 15")
+    if await cursor.fetchone():
+        return
+
+    await conn.execute("ALTER TABLE flashcards ADD COLUMN source_key TEXT")
+    cursor = await conn.execute("SELECT id, source_text FROM flashcards")
+    rows = await cursor.fetchall()
+    await conn.executemany(
+        "UPDATE flashcards SET source_key = ? WHERE id = ?",
+        [(canonical_text(row["source_text"]), row["id"]) for row in rows],
+    )
+    await conn.execute(
+        "INSERT INTO schema_versions (version, description) VALUES (15, 'add flashcards.source_key')"
+    )
+    await conn.commit()
+
+
+async def _run_migration_16(conn: aiosqlite.Connection) -> None:
+    """Migration 16: Create image_jobs table shared by all workers."""
+    cursor = await conn.execute("SELECT 1 FROM schema_versions WHERE version = 16")
+    if await cursor.fetchone():
+        return
+
+    await conn.executescript(_IMAGE_JOBS_SCHEMA)
+    await conn.execute(
+        "INSERT INTO schema_versions (version, description) VALUES (16, 'create image_jobs table')"
+    )
+    await conn.commit()
+
+
+async def _run_migration_17(conn: aiosqlite.Connection) -> None:
+    """Migration 17: Rebuild flashcards_fts with the per-user scope column."""
+    cursor = await conn.execute("SELECT 1 FROM schema_versions WHERE version = 17")
+    if await cursor.fetchone():
+        return
+
+    for trigger in ("insert", "delete", "update"):
+        await conn.execute(f"DROP TRIGGER IF EXISTS trg_flashcards_fts_{trigger}")
+    await conn.execute("DROP TABLE IF EXISTS flashcards_fts")
+    await conn.execute("DROP VIEW IF EXISTS flashcards_fts_content")
+    await conn.executescript(_FLASHCARDS_FTS_SCHEMA)
+    await conn.execute("INSERT INTO flashcards_fts (flashcards_fts) VALUES ('rebuild')")
+    await conn.execute(
+        "INSERT INTO schema_versions (version, description) VALUES (17, 'scope flashcards_fts by user')"
+    )
+    await conn.commit()
+
+
+async def init_db(
+    db_path: str,
+    read_pool_size: int = 0,
+    commit_interval_ms: int = 0,
+    commit_max_batch: int = 64,
+) -> Database:
+    """Open the database, enable WAL mode, and create schema if needed.
+
+    The writer is opened first (it runs the migrations), then up to
+    ``read_pool_size`` read-only connections. In-memory databases cannot be
+    shared between connections, so they always get an empty pool.
+    ``commit_interval_ms`` > 0 enables group commit on the writer.
+    """
     conn = await aiosqlite.connect(db_path)
     conn.row_factory = aiosqlite.Row
     await conn.execute("PRAGMA journal_mode=WAL")
@@ -405,11 +903,27 @@ async def init_db(db_path: str) -> aiosqlite.Connection:
     await _run_migration_8(conn)
     await _run_migration_9(conn)
     await _run_migration_10(conn)
+    await _run_migration_11(conn)
+    await _run_migration_12(conn)
+    await _run_migration_13(conn)
+    await _run_migration_14(conn)
+    await _run_migration_15(conn)
+    await _run_migration_16(conn)
+    await _run_migration_17(conn)
     await conn.executescript(_INDEXES)
     await conn.commit()
-    return conn
+
+    readers: list[aiosqlite.Connection] = []
+    if db_path != ":memory:":
+        for _ in range(read_pool_size):
+            readers.append(await _open_reader(db_path))
+
+    write_lock = asyncio.Lock()
+    batcher = WriteBatcher(conn, write_lock, commit_interval_ms, commit_max_batch)
+    batcher.start()
+    return Database(conn, readers, write_lock, batcher)
 
 
-async def close_db(conn: aiosqlite.Connection) -> None:
-    """Close the database connection."""
-    await conn.close()
+async def close_db(db: Database) -> None:
+    """Flush pending writes, then close the writer and all pooled readers."""
+    await db.close()
@@ -1,9 +1,65 @@
 from __future__ import annotations
 
+import base64
+import functools
+import json
+import random
+import time
 from datetime import datetime, timedelta
 
 import aiosqlite
 
+from backend.db.cache import DailyCostLedger, TTLCache, utc_today
+from backend.db.canonical import canonical_text
+from backend.db.connection import Database, explanation_content_hash, fts_scope
+
+# Candidate rows read from the index before shuffling (due cards and quiz distractors)
+DUE_SAMPLE_WINDOW = 200
+DISTRACTOR_WINDOW = 50
+
+# Search results beyond this are not counted; the UI shows "1000+"
+SEARCH_TOTAL_CAP = 1000
+
+# Search totals for cursor pagination, keyed by (user_id, language_pair, query)
+_search_total_cache = TTLCache(max_size=2000, ttl=30)
+
+
+def _read_only(fn):
+    """Run a SELECT-only helper on a pooled reader when given a Database.
+
+    Raw aiosqlite connections (scripts, migrations) are passed through as-is.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(conn, *args, **kwargs):
+        if isinstance(conn, Database):
+            async with conn.read() as reader:
+                return await fn(reader, *args, **kwargs)
+        return await fn(conn, *args, **kwargs)
+
+    return wrapper
+
+
+async def _commit_nowait(conn: aiosqlite.Connection | Database) -> None:
+    """Commit without waiting for durability (append-only logs)."""
+    if isinstance(conn, Database):
+        await conn.commit(wait=False)
+    else:
+        await conn.commit()
+
+
+# Telegram profile fields last written by get_or_create_user, keyed by user
+# id. An entry lives for USER_CACHE_TTL seconds, so the upsert (and the
+# updated_at refresh) runs at most that often per user. Only the profile is
+# cached: preferences and streaks can be changed by any worker, so the row
+# itself is always read fresh.
+USER_CACHE_TTL = 300
+_user_cache = TTLCache(max_size=10000, ttl=USER_CACHE_TTL)
+
+
+def user_cache_info() -> dict:
+    return _user_cache.stats()
+
 
 async def get_or_create_user(
     conn: aiosqlite.Connection,
@@ -12,7 +68,22 @@ async def get_or_create_user(
     username: str | None = None,
     last_name: str | None = None,
 ) -> dict:
-    """Upsert a user record. Creates if not exists, updates Telegram profile fields."""
+    """Upsert a user record. Creates if not exists, updates Telegram profile fields.
+
+    With a Database handle, while the profile fields match the ones this
+    process last wrote, the upsert is skipped until the entry expires and
+    the row is only read (on a pooled reader).
+    """
+    profile = {"first_name": first_name, "telegram_username": username, "last_name": last_name}
+    if isinstance(conn, Database):
+        written = _user_cache.get(user_id)
+        if written is not None and all(
+            value is None or written[key] == value for key, value in profile.items()  # type: ignore[index]
+        ):
+            row = await _read_user(conn, user_id)
+            if row is not None:
+                return row
+
     await conn.execute(
         "INSERT OR IGNORE INTO users (id) VALUES (?)",
         (user_id,),
@@ -39,8 +110,10 @@ async def get_or_create_user(
     await conn.commit()
 
     cursor = await conn.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    row = await cursor.fetchone()
-    return dict(row)  # type: ignore[arg-type]
+    row = dict(await cursor.fetchone())  # type: ignore[arg-type]
+    if isinstance(conn, Database):
+        _user_cache.put(user_id, {key: row[key] for key in profile})
+    return row
 
 
 async def get_user(
@@ -53,6 +126,11 @@ async def get_user(
     return dict(row) if row else None
 
 
+@_read_only
+async def _read_user(conn: aiosqlite.Connection, user_id: int) -> dict | None:
+    return await get_user(conn, user_id)
+
+
 async def update_user_preferences(
     conn: aiosqlite.Connection,
     user_id: int,
@@ -79,6 +157,7 @@ async def update_user_preferences(
         params,
     )
     await conn.commit()
+    invalidate_user_stats(user_id)
     return await get_user(conn, user_id)
 
 
@@ -128,6 +207,7 @@ async def create_deck(
     return cursor.lastrowid  # type: ignore[return-value]
 
 
+@_read_only
 async def get_user_decks(
     conn: aiosqlite.Connection,
     user_id: int,
@@ -135,16 +215,18 @@ async def get_user_decks(
 ) -> list[dict]:
     """List user's decks with card counts. Default deck appears first."""
     query = """
-        SELECT d.*, COUNT(f.id) as card_count
+        SELECT d.*, (
+            SELECT COALESCE(SUM(c.total), 0) FROM card_counters c
+            WHERE c.user_id = d.user_id AND c.deck_id = d.id
+        ) as card_count
         FROM decks d
-        LEFT JOIN flashcards f ON f.deck_id = d.id
         WHERE d.user_id = ?
     """
     params: list = [user_id]
     if language_pair is not None:
         query += " AND d.language_pair = ?"
         params.append(language_pair)
-    query += " GROUP BY d.id ORDER BY d.is_default DESC, d.created_at ASC"
+    query += " ORDER BY d.is_default DESC, d.created_at ASC"
 
     cursor = await conn.execute(query, params)
     rows = await cursor.fetchall()
@@ -219,6 +301,7 @@ async def delete_deck(
         (deck_id, user_id),
     )
     await conn.commit()
+    invalidate_user_stats(user_id)
     return True
 
 
@@ -239,6 +322,7 @@ async def move_card_to_deck(
         (deck_id, card_id, user_id),
     )
     await conn.commit()
+    invalidate_user_stats(user_id)
     return cursor.rowcount > 0
 
 
@@ -259,12 +343,14 @@ async def add_flashcard(
         deck_id = deck["id"]
     cursor = await conn.execute(
         """
-        INSERT INTO flashcards (user_id, source_text, target_text, example_source, example_target, language_pair, deck_id, part_of_speech)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO flashcards (user_id, source_text, source_key, target_text, example_source, example_target, language_pair, deck_id, part_of_speech)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (user_id, source_text, target_text, example_source, example_target, language_pair, deck_id, part_of_speech),
+        (user_id, source_text, canonical_text(source_text), target_text, example_source, example_target,
+         language_pair, deck_id, part_of_speech),
     )
     await conn.commit()
+    invalidate_user_stats(user_id)
     return cursor.lastrowid  # type: ignore[return-value]
 
 
@@ -282,14 +368,22 @@ async def get_flashcard_by_id(
     return dict(row) if row else None
 
 
+@_read_only
 async def get_due_flashcards(
     conn: aiosqlite.Connection,
     user_id: int,
     limit: int = 10,
     language_pair: str | None = None,
     deck_id: int | None = None,
+    seed: int | None = None,
 ) -> list[dict]:
-    """Fetch flashcards where next_review <= now, ordered by next_review ASC."""
+    """Sample up to `limit` due flashcards in random order.
+
+    Reads the ids of at most a bounded window of the most overdue cards by
+    walking the (user_id, [language_pair,] next_review) index, shuffles only
+    that window and loads the chosen rows, so the cost does not grow with the
+    size of the due backlog. Pass `seed` for a reproducible order.
+    """
     where = "WHERE user_id = ? AND next_review <= datetime('now')"
     params: list = [user_id]
     if language_pair is not None:
@@ -298,19 +392,58 @@ async def get_due_flashcards(
     if deck_id is not None:
         where += " AND deck_id = ?"
         params.append(deck_id)
+    window = max(limit * 2, DUE_SAMPLE_WINDOW)
+    # Only ids in the window (covered by the index), full rows for the sample
     cursor = await conn.execute(
         f"""
-        SELECT * FROM flashcards
+        SELECT id FROM flashcards
         {where}
-        ORDER BY RANDOM()
+        ORDER BY next_review ASC
         LIMIT ?
         """,
-        params + [limit],
+        params + [window],
     )
-    rows = await cursor.fetchall()
-    return [dict(r) for r in rows]
+    ids = [r["id"] for r in await cursor.fetchall()]
+    random.Random(seed).shuffle(ids)
+    ids = ids[:limit]
+    if not ids:
+        return []
+
+    placeholders = ",".join("?" for _ in ids)
+    cursor = await conn.execute(
+        f"SELECT * FROM flashcards WHERE id IN ({placeholders})",
+        ids,
+    )
+    by_id = {r["id"]: dict(r) for r in await cursor.fetchall()}
+    return [by_id[i] for i in ids if i in by_id]
 
 
+def encode_cursor(created_at: str, card_id: int) -> str:
+    """Encode a (created_at, id) seek position as an opaque URL-safe token."""
+    raw = json.dumps([created_at, card_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """Decode a token from encode_cursor. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, card_id = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(card_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, card_id
+
+
+def _next_cursor(rows: list[dict], limit: int) -> str | None:
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last["created_at"], last["id"])
+
+
+@_read_only
 async def get_all_flashcards(
     conn: aiosqlite.Connection,
     user_id: int,
@@ -329,8 +462,9 @@ async def get_all_flashcards(
         where += " AND language_pair = ?"
         params.append(language_pair)
 
+    # Total from card_counters (same filters) instead of COUNT(*) over flashcards
     cursor = await conn.execute(
-        f"SELECT COUNT(*) as cnt FROM flashcards {where}",
+        f"SELECT COALESCE(SUM(total), 0) as cnt FROM card_counters {where}",
         params,
     )
     row = await cursor.fetchone()
@@ -340,7 +474,7 @@ async def get_all_flashcards(
         f"""
         SELECT * FROM flashcards
         {where}
-        ORDER BY created_at DESC
+        ORDER BY created_at DESC, id DESC
         LIMIT ? OFFSET ?
         """,
         params + [limit, offset],
@@ -349,6 +483,86 @@ async def get_all_flashcards(
     return [dict(r) for r in rows], total
 
 
+@_read_only
+async def get_flashcards_after(
+    conn: aiosqlite.Connection,
+    user_id: int,
+    limit: int = 10,
+    cursor: str | None = None,
+    deck_id: int | None = None,
+    language_pair: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """Keyset page of cards, newest first. Returns (flashcards, next_cursor).
+
+    Seeks on (created_at, id) via idx_user_created / idx_user_lang_created,
+    so deep pages cost the same as the first one.
+    """
+    where = "WHERE user_id = ?"
+    params: list = [user_id]
+    if language_pair is not None:
+        where += " AND language_pair = ?"
+        params.append(language_pair)
+    if deck_id is not None:
+        where += " AND deck_id = ?"
+        params.append(deck_id)
+    if cursor:
+        where += " AND (created_at, id) < (?, ?)"
+        params.extend(decode_cursor(cursor))
+
+    db_cursor = await conn.execute(
+        f"""
+        SELECT * FROM flashcards
+        {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+        """,
+        params + [limit + 1],
+    )
+    rows = [dict(r) for r in await db_cursor.fetchall()]
+    return rows[:limit], _next_cursor(rows, limit)
+
+
+def _search_clause(user_id: int, query: str, language_pair: str) -> tuple[str, str, list, str]:
+    """Build (source, where, params, rank order) for a card search.
+
+    Queries of 3+ characters use the flashcards_fts trigram index over source,
+    target and example text, ranked by bm25 with source matches weighted
+    highest. The MATCH is scoped to the user's cards through the index's
+    `scope` column, so other users' matches are never visited. Shorter
+    queries (one- or two-syllable Korean words) are below the trigram size
+    and fall back to LIKE on source/target.
+    """
+    if len(query) >= 3:
+        source = """
+            FROM flashcards_fts
+            JOIN flashcards f ON f.id = flashcards_fts.rowid
+        """
+        where = "WHERE flashcards_fts MATCH ? AND f.user_id = ? AND f.language_pair = ?"
+        match = (
+            f'scope : "{fts_scope(user_id)}" AND '
+            '{source_text target_text example_source example_target} : "' + query.replace('"', '""') + '"'
+        )
+        params: list = [match, user_id, language_pair]
+        order = "bm25(flashcards_fts, 10.0, 5.0, 1.0, 1.0, 0.0), f.created_at DESC"
+    else:
+        like_param = f"%{query}%"
+        source = "FROM flashcards f"
+        where = "WHERE f.user_id = ? AND f.language_pair = ? AND (f.source_text LIKE ? OR f.target_text LIKE ?)"
+        params = [user_id, language_pair, like_param, like_param]
+        order = "f.created_at DESC"
+    return source, where, params, order
+
+
+async def _count_search(conn: aiosqlite.Connection, source: str, where: str, params: list) -> int:
+    cursor = await conn.execute(
+        f"SELECT COUNT(*) as cnt FROM (SELECT 1 {source} {where} LIMIT ?)",
+        params + [SEARCH_TOTAL_CAP],
+    )
+    row = await cursor.fetchone()
+    return row["cnt"] if row else 0
+
+
+@_read_only
 async def search_flashcards(
     conn: aiosqlite.Connection,
     user_id: int,
@@ -357,32 +571,74 @@ async def search_flashcards(
     offset: int = 0,
     limit: int = 10,
 ) -> tuple[list[dict], int]:
-    """Search flashcards by source_text or target_text within a language pair. Returns (cards, total_count)."""
-    like_param = f"%{query}%"
+    """Search flashcards within a language pair, best matches first. Returns (cards, total_count).
 
+    The total is exact when the page is not full, otherwise counted up to
+    SEARCH_TOTAL_CAP.
+    """
+    source, where, params, order = _search_clause(user_id, query, language_pair)
     cursor = await conn.execute(
-        """
-        SELECT COUNT(*) as cnt FROM flashcards
-        WHERE user_id = ? AND language_pair = ? AND (source_text LIKE ? OR target_text LIKE ?)
+        f"""
+        SELECT f.*, d.name as deck_name
+        {source}
+        JOIN decks d ON f.deck_id = d.id
+        {where}
+        ORDER BY {order}
+        LIMIT ? OFFSET ?
         """,
-        (user_id, language_pair, like_param, like_param),
+        params + [limit, offset],
     )
-    row = await cursor.fetchone()
-    total = row["cnt"] if row else 0
+    cards = [dict(r) for r in await cursor.fetchall()]
 
-    cursor = await conn.execute(
-        """
+    if 0 < len(cards) < limit or (offset == 0 and not cards):
+        return cards, offset + len(cards)
+    return cards, await _count_search(conn, source, where, params)
+
+
+@_read_only
+async def search_flashcards_after(
+    conn: aiosqlite.Connection,
+    user_id: int,
+    query: str,
+    language_pair: str,
+    limit: int = 10,
+    cursor: str | None = None,
+    include_total: bool = False,
+) -> tuple[list[dict], str | None, int | None]:
+    """Keyset page of search matches, newest first like the card list.
+
+    Returns (cards, next_cursor, total). The total is only computed when
+    requested and is cached briefly per (user, pair, query), since scrolling
+    asks for the same count on every page.
+    """
+    source, where, params, _ = _search_clause(user_id, query, language_pair)
+    page_where = where
+    page_params = list(params)
+    if cursor:
+        page_where += " AND (f.created_at, f.id) < (?, ?)"
+        page_params.extend(decode_cursor(cursor))
+
+    db_cursor = await conn.execute(
+        f"""
         SELECT f.*, d.name as deck_name
-        FROM flashcards f
+        {source}
         JOIN decks d ON f.deck_id = d.id
-        WHERE f.user_id = ? AND f.language_pair = ? AND (f.source_text LIKE ? OR f.target_text LIKE ?)
-        ORDER BY f.created_at DESC
-        LIMIT ? OFFSET ?
+        {page_where}
+        ORDER BY f.created_at DESC, f.id DESC
+        LIMIT ?
         """,
-        (user_id, language_pair, like_param, like_param, limit, offset),
+        page_params + [limit + 1],
     )
-    rows = await cursor.fetchall()
-    return [dict(r) for r in rows], total
+    rows = [dict(r) for r in await db_cursor.fetchall()]
+
+    total = None
+    if include_total:
+        key = (user_id, language_pair, query)
+        total = _search_total_cache.get(key)
+        if total is None:
+            total = await _count_search(conn, source, where, params)
+            _search_total_cache.put(key, total)
+    return rows[:limit], _next_cursor(rows, limit), total  # type: ignore[return-value]
 
 
 async def update_flashcard(
@@ -430,6 +686,7 @@ async def delete_flashcard(
         (flashcard_id, user_id),
     )
     await conn.commit()
+    invalidate_user_stats(user_id)
     return cursor.rowcount > 0
 
 
@@ -442,15 +699,18 @@ async def update_flashcard_srs(
     next_review: str,
 ) -> None:
     """Update SRS fields after a review."""
-    await conn.execute(
+    rows = await conn.execute_fetchall(
         """
         UPDATE flashcards
         SET ease_factor = ?, interval_days = ?, repetitions = ?, next_review = ?
         WHERE id = ?
+        RETURNING user_id
         """,
         (ease_factor, interval_days, repetitions, next_review, flashcard_id),
     )
     await conn.commit()
+    for row in rows:
+        invalidate_user_stats(row["user_id"])
 
 
 async def update_streak(
@@ -489,67 +749,219 @@ async def update_streak(
     )
 
 
-async def get_user_stats(
+def _counter_filter(language_pair: str | None, deck_id: int | None, alias: str = "") -> tuple[str, tuple]:
+    where = ""
+    params: tuple = ()
+    if language_pair is not None:
+        where += f" AND {alias}language_pair = ?"
+        params += (language_pair,)
+    if deck_id is not None:
+        where += f" AND {alias}deck_id = ?"
+        params += (deck_id,)
+    return where, params
+
+
+async def _sum_counters(
     conn: aiosqlite.Connection,
     user_id: int,
     language_pair: str | None = None,
     deck_id: int | None = None,
 ) -> dict:
-    """Return stats: total cards, cards due today, interval distribution. Optionally scoped to a language pair and/or deck."""
-    extra_filter = ""
-    extra_params: tuple = ()
-    if language_pair is not None:
-        extra_filter += " AND language_pair = ?"
-        extra_params += (language_pair,)
-    if deck_id is not None:
-        extra_filter += " AND deck_id = ?"
-        extra_params += (deck_id,)
+    """Sum card_counters in scope and read the streak fields in one statement.
 
-    cursor = await conn.execute(
-        "SELECT COUNT(*) as cnt FROM flashcards WHERE user_id = ?" + extra_filter,
-        (user_id,) + extra_params,
+    card_counters is WITHOUT ROWID with (user_id, language_pair, deck_id) as
+    its primary key, so this is a range scan over one user's buckets.
+    """
+    where, params = _counter_filter(language_pair, deck_id, alias="c.")
+    rows = await conn.execute_fetchall(
+        f"""
+        SELECT
+            COALESCE(SUM(c.total), 0) AS total,
+            COALESCE(SUM(c.due), 0) AS due,
+            COALESCE(SUM(c.new_count), 0) AS new_count,
+            COALESCE(SUM(c.learning_count), 0) AS learning_count,
+            COALESCE(SUM(c.young_count), 0) AS young_count,
+            COALESCE(SUM(c.mature_count), 0) AS mature_count,
+            MIN(c.next_due_at) AS next_due_at,
+            u.current_streak, u.longest_streak, u.last_practice_date
+        FROM (SELECT ? AS id) k
+        LEFT JOIN users u ON u.id = k.id
+        LEFT JOIN card_counters c ON c.user_id = k.id{where}
+        """,
+        (user_id, *params),
     )
-    row = await cursor.fetchone()
-    total = row["cnt"] if row else 0
+    return dict(rows[0])
 
-    cursor = await conn.execute(
-        "SELECT COUNT(*) as cnt FROM flashcards WHERE user_id = ? AND next_review <= datetime('now')" + extra_filter,
-        (user_id,) + extra_params,
-    )
-    row = await cursor.fetchone()
-    due = row["cnt"] if row else 0
 
-    cursor = await conn.execute(
-        """
-        SELECT
-            SUM(CASE WHEN interval_days = 0 THEN 1 ELSE 0 END) as new_count,
-            SUM(CASE WHEN interval_days BETWEEN 1 AND 6 THEN 1 ELSE 0 END) as learning_count,
-            SUM(CASE WHEN interval_days BETWEEN 7 AND 30 THEN 1 ELSE 0 END) as young_count,
-            SUM(CASE WHEN interval_days > 30 THEN 1 ELSE 0 END) as mature_count
-        FROM flashcards
-        WHERE user_id = ?
-        """ + extra_filter,
-        (user_id,) + extra_params,
+_aggregate_counters = _read_only(_sum_counters)
+
+
+async def _refresh_due_counters(
+    conn: aiosqlite.Connection,
+    user_id: int,
+    language_pair: str | None = None,
+    deck_id: int | None = None,
+) -> None:
+    """Recount `due` for rows whose next_due_at has passed."""
+    where, params = _counter_filter(language_pair, deck_id)
+    await conn.execute(
+        f"""
+        UPDATE card_counters SET
+            due = (
+                SELECT COUNT(*) FROM flashcards f
+                WHERE f.user_id = card_counters.user_id
+                    AND f.language_pair = card_counters.language_pair
+                    AND f.next_review <= datetime('now')
+                    AND f.deck_id = card_counters.deck_id
+            ),
+            next_due_at = (
+                SELECT MIN(f.next_review) FROM flashcards f
+                WHERE f.user_id = card_counters.user_id
+                    AND f.language_pair = card_counters.language_pair
+                    AND f.next_review > datetime('now')
+                    AND f.deck_id = card_counters.deck_id
+            ),
+            due_watermark = datetime('now')
+        WHERE user_id = ? AND next_due_at <= datetime('now'){where}
+        """,
+        (user_id,) + params,
     )
-    row = await cursor.fetchone()
-    distribution = {
-        "new": row["new_count"] or 0,
-        "learning": row["learning_count"] or 0,
-        "young": row["young_count"] or 0,
-        "mature": row["mature_count"] or 0,
-    } if row else {"new": 0, "learning": 0, "young": 0, "mature": 0}
 
-    user = await get_user(conn, user_id)
+
+# Stats snapshots per user, keyed by (language_pair, deck_id) inside the entry.
+# The entry carries the user's invalidation generation, so generations are
+# bounded and aged out together with the snapshots. A load that raced an
+# invalidation sees the generation move and does not store its result; one
+# that outlived its entry stores into a detached object nobody reads.
+STATS_CACHE_TTL = 60
+
+
+class _UserStats:
+    __slots__ = ("generation", "scopes")
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.scopes: dict[tuple, tuple[float, dict]] = {}
+
+
+_stats_cache = TTLCache(max_size=5000, ttl=STATS_CACHE_TTL)
+_stats_counts = {"hits": 0, "misses": 0}
+
+
+def invalidate_user_stats(user_id: int) -> None:
+    """Drop cached stats for a user. Call after the write has committed."""
+    entry: _UserStats | None = _stats_cache.get(user_id)  # type: ignore[assignment]
+    if entry is not None:
+        entry.generation += 1
+        entry.scopes.clear()
+
+
+def stats_cache_info() -> dict:
+    return {"users": _stats_cache.size, **_stats_counts}
+
+
+async def _load_stats_snapshot(
+    conn: aiosqlite.Connection,
+    user_id: int,
+    language_pair: str | None,
+    deck_id: int | None,
+) -> dict:
+    snapshot = await _aggregate_counters(conn, user_id, language_pair, deck_id)
+    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    if snapshot["next_due_at"] is not None and snapshot["next_due_at"] <= now:
+        # Some cards crossed from "not yet due" to "due" since the last count.
+        # Re-aggregate on the writer, which sees the refresh before it commits.
+        await _refresh_due_counters(conn, user_id, language_pair, deck_id)
+        snapshot = await _sum_counters(conn, user_id, language_pair, deck_id)
+        if isinstance(conn, Database):
+            await _commit_nowait(conn)
     return {
-        "total": total,
-        "due": due,
-        "distribution": distribution,
-        "current_streak": user["current_streak"] if user else 0,
-        "longest_streak": user["longest_streak"] if user else 0,
-        "last_practice_date": user["last_practice_date"] if user else None,
+        "total": snapshot["total"],
+        "due": snapshot["due"],
+        "distribution": {
+            "new": snapshot["new_count"],
+            "learning": snapshot["learning_count"],
+            "young": snapshot["young_count"],
+            "mature": snapshot["mature_count"],
+        },
+        "current_streak": snapshot["current_streak"] or 0,
+        "longest_streak": snapshot["longest_streak"] or 0,
+        "last_practice_date": snapshot["last_practice_date"],
+        "next_due_at": snapshot["next_due_at"],
+    }
+
+
+async def _get_stats_snapshot(
+    conn: aiosqlite.Connection,
+    user_id: int,
+    language_pair: str | None,
+    deck_id: int | None,
+) -> dict:
+    """Return the stats snapshot for a scope, served from cache when possible.
+
+    Only Database handles are cached: a raw connection may be inside a
+    transaction whose writes other requests cannot see yet.
+    """
+    if not isinstance(conn, Database):
+        return await _load_stats_snapshot(conn, user_id, language_pair, deck_id)
+
+    entry: _UserStats | None = _stats_cache.get(user_id)  # type: ignore[assignment]
+    if entry is None:
+        entry = _UserStats()
+        _stats_cache.put(user_id, entry)
+    scope = (language_pair, deck_id)
+    cached = entry.scopes.get(scope)
+    if cached is not None and cached[0] > time.monotonic():
+        _stats_counts["hits"] += 1
+        return cached[1]
+    _stats_counts["misses"] += 1
+
+    # Read the generation before loading so a concurrent invalidation is never lost
+    generation = entry.generation
+    snapshot = await _load_stats_snapshot(conn, user_id, language_pair, deck_id)
+    ttl: float = STATS_CACHE_TTL
+    if snapshot["next_due_at"] is not None:
+        # Expire when the next card becomes due, since `due` changes then
+        next_due = datetime.strptime(snapshot["next_due_at"], "%Y-%m-%d %H:%M:%S")
+        ttl = min(ttl, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
+    if entry.generation == generation:
+        entry.scopes[scope] = (time.monotonic() + ttl, snapshot)
+    return snapshot
+
+
+async def get_card_counts(
+    conn: aiosqlite.Connection,
+    user_id: int,
+    language_pair: str | None = None,
+    deck_id: int | None = None,
+) -> dict:
+    """Return total, due and interval distribution from card_counters.
+
+    O(number of decks in scope) instead of scanning the user's cards. Buckets
+    whose next_due_at has passed are recounted first. When given a raw
+    connection the caller owns the transaction, so nothing is committed here.
+    """
+    snapshot = await _get_stats_snapshot(conn, user_id, language_pair, deck_id)
+    return {
+        "total": snapshot["total"],
+        "due": snapshot["due"],
+        "distribution": dict(snapshot["distribution"]),
     }
 
 
+async def get_user_stats(
+    conn: aiosqlite.Connection,
+    user_id: int,
+    language_pair: str | None = None,
+    deck_id: int | None = None,
+) -> dict:
+    """Return stats: total cards, cards due today, interval distribution. Optionally scoped to a language pair and/or deck."""
+    snapshot = await _get_stats_snapshot(conn, user_id, language_pair, deck_id)
+    stats = {k: v for k, v in snapshot.items() if k != "next_due_at"}
+    stats["distribution"] = dict(snapshot["distribution"])
+    return stats
+
+
 async def get_explanation(
     conn: aiosqlite.Connection,
     card_id: int,
@@ -557,31 +969,78 @@ async def get_explanation(
 ) -> dict | None:
     """Fetch cached explanation for a card, scoped to user."""
     cursor = await conn.execute(
-        "SELECT * FROM explanations WHERE card_id = ? AND user_id = ?",
+        """
+        SELECT e.*, t.explanation
+        FROM explanations e
+        JOIN explanation_texts t ON t.id = e.text_id
+        WHERE e.card_id = ? AND e.user_id = ?
+        """,
         (card_id, user_id),
     )
     row = await cursor.fetchone()
     return dict(row) if row else None
 
 
+@_read_only
+async def get_shared_explanation(
+    conn: aiosqlite.Connection,
+    source_text: str,
+    target_text: str,
+    language_pair: str,
+    prompt_version: int,
+) -> dict | None:
+    """Find an explanation already generated for the same word content (any user)."""
+    cursor = await conn.execute(
+        "SELECT * FROM explanation_texts WHERE content_hash = ?",
+        (explanation_content_hash(source_text, target_text, language_pair, prompt_version),),
+    )
+    row = await cursor.fetchone()
+    return dict(row) if row else None
+
+
+async def link_explanation(
+    conn: aiosqlite.Connection,
+    card_id: int,
+    user_id: int,
+    text_id: int,
+) -> None:
+    """Point a card at a shared explanation text."""
+    await conn.execute(
+        "INSERT OR REPLACE INTO explanations (card_id, user_id, text_id) VALUES (?, ?, ?)",
+        (card_id, user_id, text_id),
+    )
+    await conn.commit()
+
+
 async def save_explanation(
     conn: aiosqlite.Connection,
     card_id: int,
     user_id: int,
     explanation: str,
+    source_text: str,
+    target_text: str,
+    language_pair: str,
+    prompt_version: int,
 ) -> dict:
-    """Insert or replace explanation for a card."""
+    """Store explanation text by content (once across users) and link the card to it."""
+    content_hash = explanation_content_hash(source_text, target_text, language_pair, prompt_version)
     await conn.execute(
-        "INSERT OR REPLACE INTO explanations (card_id, user_id, explanation) VALUES (?, ?, ?)",
-        (card_id, user_id, explanation),
+        """
+        INSERT INTO explanation_texts (content_hash, source_text, target_text, language_pair, prompt_version, explanation)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (content_hash) DO NOTHING
+        """,
+        (content_hash, source_text, target_text, language_pair, prompt_version, explanation),
     )
-    await conn.commit()
-    cursor = await conn.execute(
-        "SELECT * FROM explanations WHERE card_id = ? AND user_id = ?",
-        (card_id, user_id),
+    await conn.execute(
+        """
+        INSERT OR REPLACE INTO explanations (card_id, user_id, text_id)
+        SELECT ?, ?, id FROM explanation_texts WHERE content_hash = ?
+        """,
+        (card_id, user_id, content_hash),
     )
-    row = await cursor.fetchone()
-    return dict(row)  # type: ignore[arg-type]
+    await conn.commit()
+    return await get_explanation(conn, card_id, user_id)  # type: ignore[return-value]
 
 
 async def delete_explanations_for_card(
@@ -598,14 +1057,19 @@ async def check_duplicate(
     source_text: str,
     language_pair: str = "ko-en",
 ) -> bool:
-    """Check if user already has a card with this source text for the given language pair."""
+    """Check if user already has a card with this source text for the given language pair.
+
+    Texts are compared by canonical_text, so "사과." or a full-width spelling
+    matches an existing "사과".
+    """
     cursor = await conn.execute(
-        "SELECT 1 FROM flashcards WHERE user_id = ? AND source_text = ? AND language_pair = ?",
-        (user_id, source_text, language_pair),
+        "SELECT 1 FROM flashcards WHERE user_id = ? AND source_key = ? AND language_pair = ?",
+        (user_id, canonical_text(source_text), language_pair),
     )
     return await cursor.fetchone() is not None
 
 
+@_read_only
 async def get_random_distractors(
     conn: aiosqlite.Connection,
     user_id: int,
@@ -627,26 +1091,37 @@ async def get_random_distractors(
 
     # Get the correct card's answer text
     cursor = await conn.execute(
-        f"SELECT {column} FROM flashcards WHERE id = ? AND user_id = ?",
+        f"SELECT source_text, {column} FROM flashcards WHERE id = ? AND user_id = ?",
         (card_id, user_id),
     )
     row = await cursor.fetchone()
     if not row:
         return []
     correct_text = row[column]
+    pivot = row["source_text"]
 
-    # Get random distractors excluding the current card AND any cards with matching text
+    # Candidates are the cards on either side of this one in idx_user_source:
+    # two bounded index seeks instead of sorting every card by RANDOM()
     cursor = await conn.execute(
         f"""
-        SELECT {column} FROM flashcards
-        WHERE user_id = ? AND language_pair = ? AND id != ? AND {column} != ?
-        ORDER BY RANDOM()
-        LIMIT ?
+        SELECT {column} FROM (
+            SELECT {column} FROM flashcards
+            WHERE user_id = ? AND language_pair = ? AND source_text > ?
+            ORDER BY source_text ASC LIMIT ?
+        )
+        UNION ALL
+        SELECT {column} FROM (
+            SELECT {column} FROM flashcards
+            WHERE user_id = ? AND language_pair = ? AND source_text < ?
+            ORDER BY source_text DESC LIMIT ?
+        )
         """,
-        (user_id, language_pair, card_id, correct_text, count),
+        (user_id, language_pair, pivot, DISTRACTOR_WINDOW,
+         user_id, language_pair, pivot, DISTRACTOR_WINDOW),
     )
     rows = await cursor.fetchall()
-    return [row[column] for row in rows]
+    candidates = list(dict.fromkeys(r[column] for r in rows if r[column] != correct_text))
+    return random.sample(candidates, min(count, len(candidates)))
 
 
 async def check_duplicates_batch(
@@ -655,16 +1130,23 @@ async def check_duplicates_batch(
     source_texts: list[str],
     language_pair: str = "ko-en",
 ) -> set[str]:
-    """Check which source_texts already exist for this user+language_pair. Returns set of duplicates."""
+    """Check which source_texts already exist for this user+language_pair. Returns set of duplicates.
+
+    Matching is by canonical_text (see check_duplicate); the returned set
+    holds the texts as passed in.
+    """
     if not source_texts:
         return set()
-    placeholders = ",".join("?" for _ in source_texts)
+    keys = {text: canonical_text(text) for text in source_texts}
+    unique_keys = list(set(keys.values()))
+    placeholders = ",".join("?" for _ in unique_keys)
     cursor = await conn.execute(
-        f"SELECT source_text FROM flashcards WHERE user_id = ? AND language_pair = ? AND source_text IN ({placeholders})",
-        [user_id, language_pair] + source_texts,
+        f"SELECT source_key FROM flashcards WHERE user_id = ? AND language_pair = ? AND source_key IN ({placeholders})",
+        [user_id, language_pair] + unique_keys,
     )
     rows = await cursor.fetchall()
-    return {row["source_text"] for row in rows}
+    existing = {row["source_key"] for row in rows}
+    return {text for text, key in keys.items() if key in existing}
 
 
 async def log_api_usage(
@@ -685,16 +1167,46 @@ async def log_api_usage(
         """,
         (user_id, call_type, model, input_tokens, output_tokens, estimated_cost_usd, language_pair),
     )
-    await conn.commit()
+    await _commit_nowait(conn)
+    _cost_ledger.add(user_id, estimated_cost_usd)
+
+
+# Today's API cost per user, for the daily ceiling check without a query
+_cost_ledger = DailyCostLedger()
+
+# created_at is 'YYYY-MM-DD HH:MM:SS' UTC, so a day is a string range the
+# (user_id, created_at) and (created_at) indexes can seek
+_TODAY_RANGE = "created_at >= date('now') AND created_at < date('now', '+1 day')"
+
+
+async def load_cost_ledger(conn: aiosqlite.Connection) -> int:
+    """Rebuild the in-memory cost ledger from today's api_usage rows. Returns user count."""
+    day = utc_today()
+    cursor = await conn.execute(
+        f"""
+        SELECT user_id, SUM(estimated_cost_usd) as total
+        FROM api_usage
+        WHERE {_TODAY_RANGE}
+        GROUP BY user_id
+        """
+    )
+    totals = {row["user_id"]: float(row["total"]) for row in await cursor.fetchall()}
+    _cost_ledger.load(day, totals)
+    return len(totals)
+
+
+def get_ledger_daily_cost(user_id: int) -> float | None:
+    """Today's cost for a user from the ledger, or None if it was not loaded."""
+    return _cost_ledger.get(user_id)
 
 
 async def get_user_daily_cost(conn: aiosqlite.Connection, user_id: int) -> float:
     """Get total estimated API cost for a user today (UTC)."""
     cursor = await conn.execute(
-        """
+        f"""
         SELECT COALESCE(SUM(estimated_cost_usd), 0.0) as total
         FROM api_usage
-        WHERE user_id = ? AND date(created_at) = date('now')
+        WHERE user_id = ? AND {_TODAY_RANGE}
         """,
         (user_id,),
     )
@@ -702,6 +1214,7 @@ async def get_user_daily_cost(conn: aiosqlite.Connection, user_id: int) -> float
     return float(row["total"]) if row else 0.0
 
 
+@_read_only
 async def get_admin_global_stats(conn: aiosqlite.Connection) -> dict:
     """Get global admin statistics across all users."""
     # Total users
@@ -749,6 +1262,7 @@ async def get_admin_global_stats(conn: aiosqlite.Connection) -> dict:
     }
 
 
+@_read_only
 async def get_admin_user_stats(conn: aiosqlite.Connection) -> list[dict]:
     """Get per-user statistics for admin dashboard."""
     cursor = await conn.execute(
@@ -810,9 +1324,10 @@ async def log_review(
          int(was_correct) if was_correct is not None else None,
          quality, response_time_ms),
     )
-    await conn.commit()
+    await _commit_nowait(conn)
 
 
+@_read_only
 async def get_session_stats(
     conn: aiosqlite.Connection,
     user_id: int,
@@ -848,6 +1363,7 @@ async def get_session_stats(
     }
 
 
+@_read_only
 async def get_accuracy_stats(
     conn: aiosqlite.Connection,
     user_id: int,
@@ -924,3 +1440,64 @@ async def get_accuracy_stats(
         result[key] = round(correct / total, 2) if total > 0 else 0
 
     return result
+
+
+# Image translation jobs. Rows are written by the worker that runs the job
+# and read by whichever worker a poll lands on.
+
+_IMAGE_JOB_COLUMNS = (
+    "id", "user_id", "job_key", "language_pair", "status", "result",
+    "error_kind", "error_detail", "retry_after", "created_at", "finished_at",
+)
+
+
+async def save_image_job(conn: aiosqlite.Connection, job: dict) -> None:
+    """Insert or update an image job row from a dict with _IMAGE_JOB_COLUMNS keys."""
+    placeholders = ", ".join("?" for _ in _IMAGE_JOB_COLUMNS)
+    updates = ", ".join(f"{col} = excluded.{col}" for col in _IMAGE_JOB_COLUMNS[4:])
+    await conn.execute(
+        f"""
+        INSERT INTO image_jobs ({", ".join(_IMAGE_JOB_COLUMNS)}) VALUES ({placeholders})
+        ON CONFLICT (id) DO UPDATE SET {updates}
+        """,
+        [job[col] for col in _IMAGE_JOB_COLUMNS],
+    )
+    await conn.commit()
+
+
+@_read_only
+async def get_image_job(conn: aiosqlite.Connection, job_id: str, user_id: int) -> dict | None:
+    cursor = await conn.execute(
+        "SELECT * FROM image_jobs WHERE id = ? AND user_id = ?",
+        (job_id, user_id),
+    )
+    row = await cursor.fetchone()
+    return dict(row) if row else None
+
+
+@_read_only
+async def find_image_job(conn: aiosqlite.Connection, job_key: str, finished_after: float) -> dict | None:
+    """The newest job for this key that has not failed and did not finish before `finished_after`."""
+    cursor = await conn.execute(
+        """
+        SELECT * FROM image_jobs
+        WHERE job_key = ? AND status != 'failed' AND (finished_at IS NULL OR finished_at >= ?)
+        ORDER BY created_at DESC
+        LIMIT 1
+        """,
+        (job_key, finished_after),
+    )
+    row = await cursor.fetchone()
+    return dict(row) if row else None
+
+
+async def delete_expired_image_jobs(
+    conn: aiosqlite.Connection, finished_before: float, created_before: float
+) -> int:
+    """Delete jobs finished before `finished_before`, and unfinished ones created before `created_before`."""
+    cursor = await conn.execute(
+        "DELETE FROM image_jobs WHERE finished_at < ? OR (finished_at IS NULL AND created_at < ?)",
+        (finished_before, created_before),
+    )
+    await conn.commit()
+    return cursor.rowcount
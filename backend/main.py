@@ -7,7 +7,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend import config
+from backend.db import models
 from backend.db.connection import close_db, init_db
+from backend.rate_limit import close_rate_limiter, init_rate_limiter
+from backend.services.image_jobs import ImageJobQueue
 from backend.services.llm import create_llm_provider
 from backend.services.tts import TTSService
 
@@ -21,10 +24,32 @@ async def lifespan(app: FastAPI):
     """Manage application lifecycle: init and cleanup resources."""
     # Startup
     logger.info("Initializing database at %s", config.DATABASE_PATH)
-    app.state.db = await init_db(config.DATABASE_PATH)
-
-    logger.info("Creating LLM provider: %s", config.LLM_PROVIDER)
-    app.state.llm = create_llm_provider()
+    app.state.db = await init_db(
+        config.DATABASE_PATH,
+        read_pool_size=config.DB_READ_POOL_SIZE,
+        commit_interval_ms=config.DB_COMMIT_INTERVAL_MS,
+        commit_max_batch=config.DB_COMMIT_MAX_BATCH,
+    )
+
+    if config.COST_LEDGER == "process":
+        users = await models.load_cost_ledger(app.state.db)
+        logger.info("Loaded today's API cost for %d users", users)
+
+    await init_rate_limiter()
+
+    logger.info("Creating LLM provider: %s (fallback: %s)", config.LLM_PROVIDER, config.LLM_FALLBACK_PROVIDER or "none")
+    app.state.llm = create_llm_provider(app.state.db)
+    await app.state.llm.start()
+
+    app.state.image_jobs = ImageJobQueue(
+        app.state.llm,
+        app.state.db,
+        workers=config.IMAGE_JOB_WORKERS,
+        max_queued=config.IMAGE_JOB_QUEUE_SIZE,
+        ttl_seconds=config.IMAGE_JOB_TTL_SECONDS,
+        max_per_user=config.IMAGE_JOB_MAX_PER_USER,
+    )
+    await app.state.image_jobs.start()
 
     logger.info("Creating TTS service")
     app.state.tts = TTSService()
@@ -34,7 +59,12 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down...")
+    await app.state.image_jobs.close()
+    # Persist queued LLM cache entries before the database closes
+    await app.state.llm.close()
+    # Flushes any writes still waiting on the group-commit batcher
     await close_db(app.state.db)
+    await close_rate_limiter()
 
 
 app = FastAPI(
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Hashable
 
+import aiosqlite
 from fastapi import Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 
@@ -13,9 +18,6 @@ from backend.auth import ensure_user
 
 logger = logging.getLogger(__name__)
 
-# Sliding window storage: (user_id, group) -> list of timestamps
-_windows: dict[tuple[int, str], list[float]] = {}
-
 WINDOW_SECONDS = 3600  # 1 hour
 
 # Rate limits per endpoint group (requests per hour)
@@ -27,31 +29,273 @@ _LIMITS: dict[str, int] = {
 }
 
 
-def _prune(timestamps: list[float], now: float) -> list[float]:
-    """Remove timestamps older than the window."""
-    cutoff = now - WINDOW_SECONDS
-    return [t for t in timestamps if t > cutoff]
+class _Counter:
+    """Request counts for the current and previous fixed window of one key."""
+
+    __slots__ = ("window", "current", "previous")
+
+    def __init__(self, window: int, current: int = 0, previous: int = 0) -> None:
+        self.window = window
+        self.current = current
+        self.previous = previous
+
+
+def _slide(counter: _Counter, limit: int, now: float, window_seconds: float, hits: int = 1) -> int | None:
+    """Advance `counter` to the window containing `now` and record `hits` hits if allowed.
+
+    Returns seconds until retry if limited, None if the hits were recorded.
+    The sliding count is estimated by weighting the previous window by how
+    much of it still overlaps the last `window_seconds`. Several hits are
+    all-or-nothing: they are recorded only if every one of them fits.
+    """
+    window = int(now // window_seconds)
+    if counter.window != window:
+        counter.previous = counter.current if counter.window == window - 1 else 0
+        counter.current = 0
+        counter.window = window
+
+    elapsed = now - window * window_seconds
+    weight = 1 - elapsed / window_seconds
+    # The count must stay below this for the last of the hits to fit
+    limit -= hits - 1
+    if counter.previous * weight + counter.current < limit:
+        counter.current += hits
+        return None
+
+    if counter.current < limit:
+        # The previous window's weight decays enough within this window
+        wait = window_seconds * (1 - (limit - counter.current) / counter.previous) - elapsed
+    else:
+        # Wait for the next window, then for this window's weight to decay
+        wait = window_seconds - elapsed + window_seconds * (1 - limit / counter.current)
+    return max(int(wait) + 1, 1)
+
+
+class SlidingWindowLimiter:
+    """Sliding-window-counter rate limiter with bounded memory.
+
+    Each key keeps two integers instead of a timestamp list: hits in the
+    current fixed window and in the one before it (see `_slide`), so a check
+    is O(1) whatever the limit.
+
+    Keys are kept in least-recently-used order. Idle keys (nothing in the
+    last two windows) are swept from the front every `sweep_interval`
+    seconds, and when `max_keys` is reached the least recently used key is
+    dropped to make room.
+    """
+
+    def __init__(self, window_seconds: float, max_keys: int, sweep_interval: float = 60) -> None:
+        self._window_seconds = window_seconds
+        self._max_keys = max(1, max_keys)
+        self._sweep_interval = sweep_interval
+        self._counters: OrderedDict[Hashable, _Counter] = OrderedDict()
+        self._next_sweep = 0.0
+        self.evictions = 0
+
+    def check(self, key: Hashable, limit: int, now: float, hits: int = 1) -> int | None:
+        """Record `hits` hits for `key`. Returns seconds until retry if limited, None if OK."""
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+        counter = self._counters.get(key)
+        if counter is None:
+            if len(self._counters) >= self._max_keys:
+                self._counters.popitem(last=False)
+                self.evictions += 1
+            counter = self._counters[key] = _Counter(int(now // self._window_seconds))
+        else:
+            self._counters.move_to_end(key)
+        return _slide(counter, limit, now, self._window_seconds, hits)
+
+    def sweep(self, now: float) -> int:
+        """Drop keys with no hits in the current or previous window. Returns the count."""
+        self._next_sweep = now + self._sweep_interval
+        window = int(now // self._window_seconds)
+        removed = 0
+        # LRU order: the first key touched in the last two windows ends the sweep
+        while self._counters:
+            key, counter = next(iter(self._counters.items()))
+            if counter.window >= window - 1:
+                break
+            del self._counters[key]
+            removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def stats(self) -> dict:
+        return {"keys": len(self._counters), "evictions": self.evictions}
+
+
+class MemoryBackend:
+    """Limiter state in this process. Each uvicorn worker counts separately."""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int) -> None:
+        self._limiter = SlidingWindowLimiter(WINDOW_SECONDS, max_keys)
+
+    async def start(self) -> None:
+        pass
+
+    async def check(self, user_id: int, group: str, limit: int, hits: int = 1) -> int | None:
+        return self._limiter.check((user_id, group), limit, time.monotonic(), hits)
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **self._limiter.stats()}
+
+
+_SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rate_limit_counters (
+        user_id INTEGER NOT NULL,
+        grp TEXT NOT NULL,
+        window INTEGER NOT NULL,
+        current INTEGER NOT NULL,
+        previous INTEGER NOT NULL,
+        PRIMARY KEY (user_id, grp)
+    ) WITHOUT ROWID
+"""
+
+
+class SQLiteBackend:
+    """Limiter state in a SQLite file shared by every worker on the host.
+
+    Each check is a read-modify-write inside BEGIN IMMEDIATE, which takes
+    SQLite's write lock up front, so concurrent checks from any number of
+    processes serialize and the limit holds as if there were one worker.
+    Uses its own file so checks never wait on the main database's group
+    commits. Windows are aligned on wall-clock time, shared by all workers.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str, sweep_interval: float = 60) -> None:
+        self._db_path = db_path
+        self._sweep_interval = sweep_interval
+        self._conn: aiosqlite.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._next_sweep = 0.0
+        self.checks = 0
+
+    async def start(self) -> None:
+        Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: transactions are only the ones opened explicitly below
+        self._conn = await aiosqlite.connect(self._db_path, isolation_level=None)
+        await self._conn.execute("PRAGMA journal_mode=WAL")
+        await self._conn.execute("PRAGMA busy_timeout=5000")
+        await self._conn.execute("PRAGMA synchronous=NORMAL")
+        await self._conn.execute(_SQLITE_SCHEMA)
+
+    async def check(self, user_id: int, group: str, limit: int, hits: int = 1) -> int | None:
+        assert self._conn is not None, "SQLiteBackend.start() was not awaited"
+        now = time.time()
+        async with self._lock:
+            await self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = await self._conn.execute(
+                    "SELECT window, current, previous FROM rate_limit_counters WHERE user_id = ? AND grp = ?",
+                    (user_id, group),
+                )
+                row = await cursor.fetchone()
+                counter = _Counter(*row) if row else _Counter(int(now // WINDOW_SECONDS))
+                retry_after = _slide(counter, limit, now, WINDOW_SECONDS, hits)
+                if retry_after is None or row is None or row[0] != counter.window:
+                    await self._conn.execute(
+                        """
+                        INSERT INTO rate_limit_counters (user_id, grp, window, current, previous)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (user_id, grp) DO UPDATE SET
+                            window = excluded.window,
+                            current = excluded.current,
+                            previous = excluded.previous
+                        """,
+                        (user_id, group, counter.window, counter.current, counter.previous),
+                    )
+                if now >= self._next_sweep:
+                    self._next_sweep = now + self._sweep_interval
+                    await self._conn.execute(
+                        "DELETE FROM rate_limit_counters WHERE window < ?",
+                        (int(now // WINDOW_SECONDS) - 1,),
+                    )
+                await self._conn.execute("COMMIT")
+            except BaseException:
+                await self._conn.execute("ROLLBACK")
+                raise
+        self.checks += 1
+        return retry_after
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "checks": self.checks}
+
+
+def _create_backend() -> MemoryBackend | SQLiteBackend:
+    if config.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBackend(config.RATE_LIMIT_DB_PATH)
+    if config.RATE_LIMIT_BACKEND != "memory":
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {config.RATE_LIMIT_BACKEND}")
+    return MemoryBackend(config.RATE_LIMIT_MAX_KEYS)
+
+
+_backend = _create_backend()
+
+
+async def init_rate_limiter() -> None:
+    """Open the configured backend. Called from the app lifespan."""
+    logger.info("Rate limit backend: %s", _backend.name)
+    await _backend.start()
+
+
+async def close_rate_limiter() -> None:
+    await _backend.close()
+
+
+def limiter_stats() -> dict:
+    return _backend.stats()
 
 
-def _check(user_id: int, group: str) -> int | None:
+async def _check(user_id: int, group: str, hits: int = 1) -> int | None:
     """Check rate limit. Returns seconds until retry if limited, None if OK."""
     limit = _LIMITS.get(group)
     if limit is None:
         return None
+    if hits > limit:
+        raise HTTPException(
+            status_code=400,
+            detail=f"This request counts as {hits} requests, more than the limit of {limit} per hour.",
+        )
+    return await _backend.check(user_id, group, limit, hits)
 
-    now = time.monotonic()
-    key = (user_id, group)
 
-    timestamps = _prune(_windows.get(key, []), now)
-    _windows[key] = timestamps
+async def charge_rate_limit(user: dict, group: str, hits: int = 1) -> None:
+    """Count `hits` requests against the user's limit for `group`; raise 429 if they do not all fit.
 
-    if len(timestamps) >= limit:
-        oldest = timestamps[0]
-        retry_after = int(oldest + WINDOW_SECONDS - now) + 1
-        return max(retry_after, 1)
+    For endpoints that do several units of work per request (e.g. one hit
+    per word of a batch). The admin is exempt.
+    """
+    user_id = user["id"]
+    if user_id == config.ADMIN_USER_ID:
+        return
 
-    timestamps.append(now)
-    return None
+    retry_after = await _check(user_id, group, hits)
+    if retry_after is not None:
+        logger.warning(
+            "Rate limit hit: user=%s group=%s hits=%d retry_after=%ds",
+            user_id, group, hits, retry_after,
+        )
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many requests. Try again in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)},
+        )
 
 
 def rate_limit(group: str):
@@ -61,23 +305,7 @@ def rate_limit(group: str):
         request: Request,
         user: dict = Depends(ensure_user),
     ):
-        user_id = user["id"]
-
-        # Admin is exempt from rate limits
-        if user_id == config.ADMIN_USER_ID:
-            return user
-
-        retry_after = _check(user_id, group)
-        if retry_after is not None:
-            logger.warning(
-                "Rate limit hit: user=%s group=%s retry_after=%ds",
-                user_id, group, retry_after,
-            )
-            raise HTTPException(
-                status_code=429,
-                detail=f"Too many requests. Try again in {retry_after} seconds.",
-                headers={"Retry-After": str(retry_after)},
-            )
+        await charge_rate_limit(user, group)
         return user
 
     return dependency
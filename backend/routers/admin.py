@@ -5,8 +5,9 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from backend import config
-from backend.auth import ensure_user
+from backend.auth import ensure_user, verified_cache_info
 from backend.db import models
+from backend.rate_limit import limiter_stats
 
 router = APIRouter()
 
@@ -52,3 +53,27 @@ async def get_admin_users(
     db = request.app.state.db
     users = await models.get_admin_user_stats(db)
     return {"users": users}
+
+
+@router.get("/llm")
+async def get_admin_llm(
+    request: Request,
+    user: dict[str, Any] = Depends(require_admin),
+):
+    """Get circuit breaker, concurrency limit and timeout counters per LLM provider, and the image job queue."""
+    return {"guards": request.app.state.llm.health(), "image_jobs": request.app.state.image_jobs.stats()}
+
+
+@router.get("/cache")
+async def get_admin_cache(
+    request: Request,
+    user: dict[str, Any] = Depends(require_admin),
+):
+    """Get hit/miss counters for in-process caches."""
+    return {
+        "llm": request.app.state.llm.stats(),
+        "stats_snapshots": models.stats_cache_info(),
+        "users": models.user_cache_info(),
+        "init_data": verified_cache_info(),
+        "rate_limit": limiter_stats(),
+    }
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-import base64
+import json
 import logging
 from typing import Any
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from backend import config
 from backend.auth import ensure_user
 from backend.config import SUPPORTED_LANGUAGE_PAIRS
 from backend.db import models
-from backend.rate_limit import rate_limit
+from backend.db.canonical import canonical_text
+from backend.rate_limit import charge_rate_limit, rate_limit
+from backend.services.call_guard import LLMUnavailableError
+from backend.services.image_jobs import DONE, FAILED, ImageJob, TooManyJobsError, translate_image_for_user
+from backend.services.llm import EXPLAIN_PROMPT_VERSION, StreamEnd
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +24,7 @@ router = APIRouter()
 
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
+JOB_KEEPALIVE_SECONDS = 15
 
 
 class TranslateRequest(BaseModel):
@@ -26,6 +32,11 @@ class TranslateRequest(BaseModel):
     language_pair: str = "ko-en"
 
 
+class TranslateBatchRequest(BaseModel):
+    words: list[str] = Field(..., min_length=1, max_length=config.LLM_TRANSLATE_BATCH_MAX_WORDS)
+    language_pair: str = "ko-en"
+
+
 class ExplainRequest(BaseModel):
     source_text: str = Field(..., min_length=1, max_length=config.MAX_EXPLAIN_SOURCE_LENGTH)
     target_text: str = Field(..., min_length=1, max_length=config.MAX_EXPLAIN_TARGET_LENGTH)
@@ -53,17 +64,113 @@ class BatchCreateRequest(BaseModel):
     deck_id: int | None = None
 
 
-async def _check_daily_cost(db, user_id: int) -> None:
-    """Raise 429 if user has exceeded daily cost ceiling. Admin is exempt."""
+async def _check_daily_cost(db, user_id: int, pending_cost: float = 0.0) -> None:
+    """Raise 429 if user has exceeded daily cost ceiling, or would with `pending_cost` more. Admin is exempt."""
     if user_id == config.ADMIN_USER_ID:
         return
-    daily_cost = await models.get_user_daily_cost(db, user_id)
+    daily_cost = None
+    if config.COST_LEDGER == "process":
+        # Opted in as a single worker: the in-process ledger sees every logged call
+        daily_cost = models.get_ledger_daily_cost(user_id)
+    if daily_cost is None:
+        daily_cost = await models.get_user_daily_cost(db, user_id)
     if daily_cost >= config.MAX_DAILY_COST_PER_USER:
         logger.warning("Daily cost ceiling hit: user=%s cost=$%.4f", user_id, daily_cost)
         raise HTTPException(
             status_code=429,
             detail="Daily usage limit reached. Please try again tomorrow.",
         )
+    if pending_cost and daily_cost + pending_cost > config.MAX_DAILY_COST_PER_USER:
+        logger.warning(
+            "Daily cost ceiling would be exceeded: user=%s cost=$%.4f pending=$%.4f",
+            user_id, daily_cost, pending_cost,
+        )
+        raise HTTPException(
+            status_code=429,
+            detail="This request would exceed your daily usage limit. Try fewer words.",
+        )
+
+
+UNAVAILABLE_DETAIL = "AI service is temporarily unavailable. Please try again shortly."
+
+
+def _unavailable(e: LLMUnavailableError) -> HTTPException:
+    logger.warning("LLM unavailable: %s", e)
+    return HTTPException(status_code=503, detail=UNAVAILABLE_DETAIL, headers={"Retry-After": str(e.retry_after)})
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    # X-Accel-Buffering stops nginx from holding back the deltas
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _usage_logger(db, user_id: int, call_type: str, language_pair: str):
+    """Log a usage dict as an api_usage row for this user; failures are logged, not raised."""
+    async def log(usage: dict) -> None:
+        try:
+            await models.log_api_usage(
+                db, user_id, call_type, usage["model"],
+                usage["input_tokens"], usage["output_tokens"],
+                usage["estimated_cost_usd"], language_pair,
+            )
+        except Exception:
+            logger.exception("Failed to log API usage for %s", call_type)
+    return log
+
+
+async def _stream_explanation(
+    db,
+    llm,
+    user_id: int,
+    source_text: str,
+    target_text: str,
+    language_pair: str,
+    card_id: int | None = None,
+):
+    """SSE events for a streamed explanation: `delta` events, then `done` or `error`.
+
+    Usage is logged and, for a card, the explanation saved once the stream
+    completes. If the client disconnects first, the provider still finishes
+    the explanation and logs its usage through the same logger.
+    """
+    source_lang, target_lang = language_pair.split("-", 1)
+    log_usage = _usage_logger(db, user_id, "explain", language_pair)
+    end: StreamEnd | None = None
+    detail = "Explanation failed"
+    try:
+        async for item in llm.explain_word_stream(source_text, target_text, source_lang, target_lang, log_usage):
+            if isinstance(item, StreamEnd):
+                end = item
+            else:
+                yield _sse("delta", {"text": item})
+    except LLMUnavailableError as e:
+        logger.warning("LLM unavailable: %s", e)
+        detail = UNAVAILABLE_DETAIL
+    except Exception:
+        logger.exception("Explanation stream failed")
+    if end is None:
+        yield _sse("error", {"detail": detail})
+        return
+
+    if not end.was_cached and end.usage:
+        await log_usage(end.usage)
+
+    done: dict[str, Any] = {"explanation": end.text}
+    if card_id is not None:
+        await models.save_explanation(
+            db, card_id, user_id, end.text,
+            source_text, target_text, language_pair, EXPLAIN_PROMPT_VERSION,
+        )
+        done["card_id"] = card_id
+    yield _sse("done", done)
 
 
 @router.post("/translate")
@@ -79,17 +186,13 @@ async def translate_word(
     llm = request.app.state.llm
     try:
         source_lang, target_lang = body.language_pair.split("-", 1)
-        result, usage, was_cached = await llm.translate(body.word.strip(), source_lang, target_lang)
+        log_usage = _usage_logger(db, user["id"], "translate", body.language_pair)
+        result, usage, was_cached = await llm.translate(body.word.strip(), source_lang, target_lang, log_usage)
         if not was_cached:
-            try:
-                await models.log_api_usage(
-                    db, user["id"], "translate", usage["model"],
-                    usage["input_tokens"], usage["output_tokens"],
-                    usage["estimated_cost_usd"], body.language_pair,
-                )
-            except Exception:
-                logger.exception("Failed to log API usage for translate")
+            await log_usage(usage)
         return result.model_dump()
+    except LLMUnavailableError as e:
+        raise _unavailable(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception:
@@ -97,58 +200,208 @@ async def translate_word(
         raise HTTPException(status_code=500, detail="Translation failed")
 
 
-@router.post("/translate-image")
-async def translate_image(
+@router.post("/translate-batch")
+async def translate_words_batch(
+    body: TranslateBatchRequest,
     request: Request,
-    image: UploadFile = File(...),
-    language_pair: str = Form("ko-en"),
-    user: dict[str, Any] = Depends(rate_limit("translate_image")),
+    user: dict[str, Any] = Depends(ensure_user),
 ):
-    """Extract and translate all words from an uploaded image."""
+    """Translate several words; uncached ones are sent to the AI in batched calls.
+
+    Each word counts as one translate request against the rate limit, and
+    the batch is refused if its estimated cost would cross the daily ceiling.
+    """
+    words = list(dict.fromkeys(w.strip() for w in body.words if w.strip()))
+    if not words:
+        raise HTTPException(status_code=400, detail="No words provided")
+    if any(len(w) > config.MAX_TRANSLATE_INPUT_LENGTH for w in words):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Words must be at most {config.MAX_TRANSLATE_INPUT_LENGTH} characters",
+        )
+    if body.language_pair not in SUPPORTED_LANGUAGE_PAIRS:
+        raise HTTPException(status_code=400, detail=f"Unsupported language pair: {body.language_pair}")
+
+    await charge_rate_limit(user, "translate", len(words))
+    db = request.app.state.db
+    llm = request.app.state.llm
+    await _check_daily_cost(db, user["id"], len(words) * llm.estimated_word_cost())
+
+    source_lang, target_lang = body.language_pair.split("-", 1)
+    try:
+        answers = await llm.translate_batch(words, source_lang, target_lang)
+    except Exception:
+        logger.exception("Batch translation failed")
+        raise HTTPException(status_code=500, detail="Translation failed")
+    if all(isinstance(a, LLMUnavailableError) for a in answers):
+        raise _unavailable(answers[0])  # type: ignore[arg-type]
+
+    for answer in answers:
+        if isinstance(answer, Exception) or answer[2] or not answer[1]:
+            continue
+        usage = answer[1]
+        try:
+            await models.log_api_usage(
+                db, user["id"], "translate", usage["model"],
+                usage["input_tokens"], usage["output_tokens"],
+                usage["estimated_cost_usd"], body.language_pair,
+            )
+        except Exception:
+            logger.exception("Failed to log API usage for translate")
+
+    source_texts = [a[0].source_text for a in answers if not isinstance(a, Exception)]
+    duplicates = await models.check_duplicates_batch(db, user["id"], source_texts, body.language_pair)
+    translations = []
+    for word, answer in zip(words, answers):
+        if isinstance(answer, ValueError):
+            translations.append({"word": word, "error": str(answer)})
+        elif isinstance(answer, LLMUnavailableError):
+            translations.append({"word": word, "error": UNAVAILABLE_DETAIL})
+        elif isinstance(answer, Exception):
+            logger.error("Translation failed for %r: %s", word, answer)
+            translations.append({"word": word, "error": "Translation failed"})
+        else:
+            item = answer[0].model_dump()
+            item["word"] = word
+            item["is_duplicate"] = answer[0].source_text in duplicates
+            translations.append(item)
+    return {"translations": translations, "count": len(translations)}
+
+
+async def _read_image(image: UploadFile, language_pair: str) -> bytes:
+    """Validate an uploaded image and its language pair; returns the image bytes."""
     # Validate file type
     content_type = image.content_type or ""
     if content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(status_code=400, detail=f"Unsupported image type: {content_type}. Use JPEG, PNG, or WebP.")
 
-    # Read and validate size
-    image_bytes = await image.read()
+    # Read and validate size (never buffer more than one byte past the limit)
+    image_bytes = await image.read(MAX_IMAGE_SIZE + 1)
     if len(image_bytes) > MAX_IMAGE_SIZE:
         raise HTTPException(status_code=400, detail="Image too large. Maximum size is 5MB.")
 
     if language_pair not in SUPPORTED_LANGUAGE_PAIRS:
         raise HTTPException(status_code=400, detail=f"Unsupported language pair: {language_pair}")
+    return image_bytes
 
+
+def _image_error(e: Exception) -> HTTPException:
+    """Map an image translation failure to the HTTP error the client sees."""
+    if isinstance(e, LLMUnavailableError):
+        return HTTPException(status_code=503, detail=UNAVAILABLE_DETAIL, headers={"Retry-After": str(e.retry_after)})
+    if isinstance(e, ValueError):
+        return HTTPException(status_code=400, detail=str(e))
+    return HTTPException(status_code=500, detail="Image translation failed")
+
+
+@router.post("/translate-image")
+async def translate_image(
+    request: Request,
+    image: UploadFile = File(...),
+    language_pair: str = Form("ko-en"),
+    user: dict[str, Any] = Depends(rate_limit("translate_image")),
+):
+    """Extract and translate all words from an uploaded image."""
+    image_bytes = await _read_image(image, language_pair)
     db = request.app.state.db
     await _check_daily_cost(db, user["id"])
 
-    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+    try:
+        return await translate_image_for_user(
+            request.app.state.llm, db, user["id"], image_bytes, image.content_type or "", language_pair
+        )
+    except LLMUnavailableError as e:
+        raise _unavailable(e)
+    except Exception as e:
+        if not isinstance(e, ValueError):
+            logger.exception("Image translation failed")
+        raise _image_error(e)
+
+
+def _job_view(job: ImageJob) -> dict:
+    view: dict[str, Any] = {"job_id": job.id, "status": job.status}
+    if job.status == DONE:
+        view.update(job.result or {})
+    elif job.status == FAILED:
+        error = _image_error(job.error or Exception())
+        view["error"] = {"status_code": error.status_code, "detail": error.detail}
+        if error.headers and "Retry-After" in error.headers:
+            view["error"]["retry_after"] = int(error.headers["Retry-After"])
+    return view
+
+
+async def _get_job(request: Request, job_id: str, user_id: int) -> ImageJob:
+    job = await request.app.state.image_jobs.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@router.post("/translate-image/jobs", status_code=202)
+async def submit_translate_image_job(
+    request: Request,
+    response: Response,
+    image: UploadFile = File(...),
+    language_pair: str = Form("ko-en"),
+    user: dict[str, Any] = Depends(rate_limit("translate_image")),
+):
+    """Queue an image for translation and return its job at once.
 
-    llm = request.app.state.llm
+    Poll GET /translate-image/jobs/{job_id} or subscribe to its /events
+    stream for the result. Re-uploading the same image returns the same job.
+    """
+    image_bytes = await _read_image(image, language_pair)
+    await _check_daily_cost(request.app.state.db, user["id"])
     try:
-        source_lang, target_lang = language_pair.split("-", 1)
-        results, usage = await llm.translate_image(image_base64, content_type, source_lang, target_lang)
-        try:
-            await models.log_api_usage(
-                db, user["id"], "translate_image", usage["model"],
-                usage["input_tokens"], usage["output_tokens"],
-                usage["estimated_cost_usd"], language_pair,
-            )
-        except Exception:
-            logger.exception("Failed to log API usage for translate_image")
-        # Check for duplicates
-        source_texts = [r.source_text for r in results]
-        duplicates = await models.check_duplicates_batch(db, user["id"], source_texts, language_pair)
-        translations = []
-        for r in results:
-            item = r.model_dump()
-            item["is_duplicate"] = r.source_text in duplicates
-            translations.append(item)
-        return {"translations": translations, "count": len(translations)}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception:
-        logger.exception("Image translation failed")
-        raise HTTPException(status_code=500, detail="Image translation failed")
+        job, deduplicated = await request.app.state.image_jobs.submit(
+            user["id"], image_bytes, image.content_type or "", language_pair
+        )
+    except LLMUnavailableError as e:
+        raise _unavailable(e)
+    except TooManyJobsError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "10"})
+    response.headers["Location"] = f"/api/cards/translate-image/jobs/{job.id}"
+    return {**_job_view(job), "deduplicated": deduplicated}
+
+
+@router.get("/translate-image/jobs/{job_id}")
+async def get_translate_image_job(
+    request: Request,
+    job_id: str,
+    user: dict[str, Any] = Depends(ensure_user),
+):
+    """Get an image translation job: its status, and the translations once done."""
+    return _job_view(await _get_job(request, job_id, user["id"]))
+
+
+@router.get("/translate-image/jobs/{job_id}/events")
+async def stream_translate_image_job(
+    request: Request,
+    job_id: str,
+    user: dict[str, Any] = Depends(ensure_user),
+):
+    """Server-Sent Events for a job: a "status" event per change, then "done" or "error"."""
+    jobs = request.app.state.image_jobs
+    job = await _get_job(request, job_id, user["id"])
+
+    async def events():
+        current: ImageJob | None = job
+        while current is not None and not current.finished:
+            status = current.status
+            yield _sse("status", _job_view(current))
+            # wait_change compares with the status sent, so a change made while
+            # this generator was suspended at a yield is not missed.
+            # Comment line as a keep-alive, so proxies do not drop an idle stream
+            while not await jobs.wait_change(current, status, JOB_KEEPALIVE_SECONDS):
+                yield ": keep-alive\n\n"
+            # A job run by another worker is a snapshot: read it again
+            current = await jobs.get(job_id, user["id"])
+        if current is None:
+            yield _sse("error", {"job_id": job_id, "error": {"status_code": 404, "detail": "Job not found or expired"}})
+            return
+        yield _sse("done" if current.status == DONE else "error", _job_view(current))
+
+    return _sse_response(events())
 
 
 @router.post("/batch")
@@ -176,11 +429,13 @@ async def create_cards_batch(
     # Check all duplicates at once
     source_texts = [c.source_text for c in body.cards]
     existing = await models.check_duplicates_batch(db, user_id, source_texts, language_pair)
+    existing_keys = {canonical_text(text) for text in existing}
 
     created_cards = []
     duplicates_count = 0
     for card in body.cards:
-        if card.source_text in existing:
+        source_key = canonical_text(card.source_text)
+        if source_key in existing_keys:
             duplicates_count += 1
             continue
         deck_id = body.deck_id or card.deck_id
@@ -194,7 +449,7 @@ async def create_cards_batch(
         if saved:
             created_cards.append(saved)
         # Add to existing set to catch duplicates within the batch itself
-        existing.add(card.source_text)
+        existing_keys.add(source_key)
 
     return {"created": len(created_cards), "duplicates": duplicates_count, "cards": created_cards}
 
@@ -229,15 +484,36 @@ async def list_cards(
     per_page: int = 10,
     deck_id: int | None = None,
     language_pair: str | None = None,
+    cursor: str | None = None,
+    include_total: bool = False,
     user: dict[str, Any] = Depends(ensure_user),
 ):
-    """List user's flashcards with pagination, optionally filtered by deck and/or language pair."""
+    """List user's flashcards with pagination, optionally filtered by deck and/or language pair.
+
+    Passing `cursor` (empty for the first page) switches to keyset pagination:
+    the response carries `next_cursor` instead of page numbers, and `total`
+    only when `include_total` is set.
+    """
     if per_page < 1:
         raise HTTPException(status_code=400, detail="per_page must be >= 1")
     if language_pair is not None and language_pair not in SUPPORTED_LANGUAGE_PAIRS:
         raise HTTPException(status_code=400, detail=f"Unsupported language pair: {language_pair}")
     db = request.app.state.db
     user_id = user["id"]
+
+    if cursor is not None:
+        try:
+            cards, next_cursor = await models.get_flashcards_after(
+                db, user_id, per_page, cursor, deck_id=deck_id, language_pair=language_pair,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        result: dict[str, Any] = {"cards": cards, "next_cursor": next_cursor, "per_page": per_page}
+        if include_total:
+            counts = await models.get_card_counts(db, user_id, language_pair=language_pair, deck_id=deck_id)
+            result["total"] = counts["total"]
+        return result
+
     offset = (page - 1) * per_page
 
     cards, total = await models.get_all_flashcards(db, user_id, offset, per_page, deck_id=deck_id, language_pair=language_pair)
@@ -259,9 +535,17 @@ async def search_cards(
     page: int = 1,
     per_page: int = 10,
     language_pair: str = "ko-en",
+    cursor: str | None = None,
+    include_total: bool = False,
     user: dict[str, Any] = Depends(ensure_user),
 ):
-    """Search cards by source or target text within a language pair."""
+    """Search cards within a language pair.
+
+    Queries of 3+ characters also match the example sentences (source and
+    target text rank higher); shorter ones match source or target text only.
+    Passing `cursor` (empty for the first page) switches to keyset pagination
+    over matches in newest-first order, as in the card list.
+    """
     if per_page < 1:
         raise HTTPException(status_code=400, detail="per_page must be >= 1")
     if not q.strip():
@@ -270,6 +554,20 @@ async def search_cards(
         raise HTTPException(status_code=400, detail=f"Unsupported language pair: {language_pair}")
     db = request.app.state.db
     user_id = user["id"]
+
+    if cursor is not None:
+        try:
+            cards, next_cursor, total = await models.search_flashcards_after(
+                db, user_id, q.strip(), language_pair, per_page, cursor, include_total=include_total,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        result: dict[str, Any] = {"cards": cards, "next_cursor": next_cursor, "per_page": per_page}
+        if total is not None:
+            result["total"] = total
+            result["total_is_estimate"] = total >= models.SEARCH_TOTAL_CAP
+        return result
+
     offset = (page - 1) * per_page
 
     cards, total = await models.search_flashcards(db, user_id, q.strip(), language_pair, offset, per_page)
@@ -278,6 +576,7 @@ async def search_cards(
     return {
         "cards": cards,
         "total": total,
+        "total_is_estimate": total >= models.SEARCH_TOTAL_CAP,
         "page": page,
         "per_page": per_page,
         "total_pages": total_pages,
@@ -300,18 +599,14 @@ async def explain_word(
     llm = request.app.state.llm
     try:
         source_lang, target_lang = body.language_pair.split("-", 1)
+        log_usage = _usage_logger(db, user["id"], "explain", body.language_pair)
         explanation_text, usage, was_cached = await llm.explain_word(
-            body.source_text.strip(), body.target_text.strip(), source_lang, target_lang
+            body.source_text.strip(), body.target_text.strip(), source_lang, target_lang, log_usage
         )
         if not was_cached:
-            try:
-                await models.log_api_usage(
-                    db, user["id"], "explain", usage["model"],
-                    usage["input_tokens"], usage["output_tokens"],
-                    usage["estimated_cost_usd"], body.language_pair,
-                )
-            except Exception:
-                logger.exception("Failed to log API usage for explain")
+            await log_usage(usage)
+    except LLMUnavailableError as e:
+        raise _unavailable(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception:
@@ -320,6 +615,25 @@ async def explain_word(
     return {"explanation": explanation_text}
 
 
+@router.post("/explain/stream")
+async def explain_word_stream(
+    body: ExplainRequest,
+    request: Request,
+    user: dict[str, Any] = Depends(rate_limit("explain")),
+):
+    """Like POST /explain, but streams the explanation as Server-Sent Events."""
+    if body.language_pair not in SUPPORTED_LANGUAGE_PAIRS:
+        raise HTTPException(status_code=400, detail=f"Unsupported language pair: {body.language_pair}")
+
+    db = request.app.state.db
+    await _check_daily_cost(db, user["id"])
+
+    return _sse_response(_stream_explanation(
+        db, request.app.state.llm, user["id"],
+        body.source_text.strip(), body.target_text.strip(), body.language_pair,
+    ))
+
+
 @router.get("/{card_id}")
 async def get_card(
     card_id: int,
@@ -365,6 +679,31 @@ async def get_explanation(
     return {"explanation": explanation["explanation"], "card_id": card_id}
 
 
+async def _find_card_explanation(db, card_id: int, user_id: int) -> tuple[dict | None, str | None]:
+    """Return (card, explanation) for a card; explanation is None if one must be generated.
+
+    Raises 404 if the card does not exist or belongs to another user.
+    """
+    # Return cached if exists
+    cached = await models.get_explanation(db, card_id, user_id)
+    if cached:
+        return None, cached["explanation"]
+
+    # Fetch card and verify ownership
+    card = await models.get_flashcard_by_id(db, card_id, user_id)
+    if not card:
+        raise HTTPException(status_code=404, detail="Card not found")
+
+    # Reuse an explanation generated for the same word by anyone
+    shared = await models.get_shared_explanation(
+        db, card["source_text"], card["target_text"], card["language_pair"], EXPLAIN_PROMPT_VERSION
+    )
+    if shared:
+        await models.link_explanation(db, card_id, user_id, shared["id"])
+        return card, shared["explanation"]
+    return card, None
+
+
 @router.post("/{card_id}/explanation")
 async def generate_explanation(
     card_id: int,
@@ -375,43 +714,61 @@ async def generate_explanation(
     db = request.app.state.db
     user_id = user["id"]
 
-    # Return cached if exists
-    cached = await models.get_explanation(db, card_id, user_id)
-    if cached:
-        return {"explanation": cached["explanation"], "card_id": card_id}
+    card, existing = await _find_card_explanation(db, card_id, user_id)
+    if existing is not None:
+        return {"explanation": existing, "card_id": card_id}
 
     await _check_daily_cost(db, user_id)
 
-    # Fetch card and verify ownership
-    card = await models.get_flashcard_by_id(db, card_id, user_id)
-    if not card:
-        raise HTTPException(status_code=404, detail="Card not found")
-
     # Generate via LLM
     llm = request.app.state.llm
     try:
         source_lang, target_lang = card["language_pair"].split("-", 1)
+        log_usage = _usage_logger(db, user_id, "explain", card["language_pair"])
         explanation_text, usage, was_cached = await llm.explain_word(
-            card["source_text"], card["target_text"], source_lang, target_lang
+            card["source_text"], card["target_text"], source_lang, target_lang, log_usage
         )
         if not was_cached:
-            try:
-                await models.log_api_usage(
-                    db, user_id, "explain", usage["model"],
-                    usage["input_tokens"], usage["output_tokens"],
-                    usage["estimated_cost_usd"], card["language_pair"],
-                )
-            except Exception:
-                logger.exception("Failed to log API usage for explain")
+            await log_usage(usage)
+    except LLMUnavailableError as e:
+        raise _unavailable(e)
     except Exception:
         logger.exception("Explanation generation failed")
         raise HTTPException(status_code=500, detail="Explanation failed")
 
     # Cache in DB
-    await models.save_explanation(db, card_id, user_id, explanation_text)
+    await models.save_explanation(
+        db, card_id, user_id, explanation_text,
+        card["source_text"], card["target_text"], card["language_pair"], EXPLAIN_PROMPT_VERSION,
+    )
     return {"explanation": explanation_text, "card_id": card_id}
 
 
+@router.post("/{card_id}/explanation/stream")
+async def generate_explanation_stream(
+    card_id: int,
+    request: Request,
+    user: dict[str, Any] = Depends(rate_limit("explain")),
+):
+    """Like POST /{card_id}/explanation, but streams the explanation as Server-Sent Events."""
+    db = request.app.state.db
+    user_id = user["id"]
+
+    card, existing = await _find_card_explanation(db, card_id, user_id)
+    if existing is not None:
+        async def saved():
+            yield _sse("done", {"explanation": existing, "card_id": card_id})
+        return _sse_response(saved())
+
+    await _check_daily_cost(db, user_id)
+
+    return _sse_response(_stream_explanation(
+        db, request.app.state.llm, user_id,
+        card["source_text"], card["target_text"], card["language_pair"],
+        card_id=card_id,
+    ))
+
+
 @router.delete("/{card_id}")
 async def delete_card(
     card_id: int,
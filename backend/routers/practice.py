@@ -8,7 +8,8 @@ from pydantic import BaseModel, model_validator
 from backend.auth import ensure_user
 from backend.config import SUPPORTED_LANGUAGE_PAIRS
 from backend.db import models
-from backend.services.srs import SRSResult, calculate_srs, difficulty_to_quality, mode_result_to_quality
+from backend.services import review
+from backend.services.srs import mode_result_to_quality
 
 router = APIRouter()
 
@@ -33,22 +34,28 @@ async def get_due_cards(
     limit: int = 20,
     language_pair: str | None = None,
     deck_id: int | None = None,
+    seed: int | None = None,
     user: dict[str, Any] = Depends(ensure_user),
 ):
-    """Get cards due for review, optionally scoped to a language pair and/or deck."""
+    """Get cards due for review, optionally scoped to a language pair and/or deck.
+
+    Pass `seed` to get the same card order for the same due set (reproducible sessions).
+    """
     if language_pair is not None and language_pair not in SUPPORTED_LANGUAGE_PAIRS:
         raise HTTPException(status_code=400, detail=f"Unsupported language pair: {language_pair}")
     db = request.app.state.db
     user_id = user["id"]
 
-    cards = await models.get_due_flashcards(db, user_id, limit, language_pair=language_pair, deck_id=deck_id)
+    cards = await models.get_due_flashcards(
+        db, user_id, limit, language_pair=language_pair, deck_id=deck_id, seed=seed,
+    )
 
-    # Get total due count
-    stats = await models.get_user_stats(db, user_id, language_pair=language_pair, deck_id=deck_id)
+    # Get total due count from the incrementally maintained counters
+    counts = await models.get_card_counts(db, user_id, language_pair=language_pair, deck_id=deck_id)
 
     return {
         "cards": cards,
-        "total_due": stats["due"],
+        "total_due": counts["due"],
     }
 
 
@@ -71,45 +78,20 @@ async def submit_review(
             detail=f"Invalid difficulty: {body.difficulty}. Use 'easy', 'medium', or 'hard'.",
         )
 
-    # Get current card
-    card = await models.get_flashcard_by_id(db, body.card_id, user_id)
-    if not card:
-        raise HTTPException(status_code=404, detail="Card not found")
-
-    # Calculate new SRS values
-    result: SRSResult = calculate_srs(
-        quality=quality,
-        current_ease=card["ease_factor"],
-        current_interval=card["interval_days"],
-        current_reps=card["repetitions"],
-    )
-
-    # Update card
-    await models.update_flashcard_srs(
-        db,
-        body.card_id,
-        result.ease_factor,
-        result.interval_days,
-        result.repetitions,
-        result.next_review.strftime("%Y-%m-%d %H:%M:%S"),
-    )
-
-    # Log review to history
-    await models.log_review(
-        db, user_id, body.card_id, body.study_mode,
-        body.was_correct, quality, body.response_time_ms,
+    # Card update, history row, streak and remaining-due count in one transaction
+    outcome = await review.apply_review(
+        db, user_id, body.card_id, quality,
+        study_mode=body.study_mode,
+        was_correct=body.was_correct,
+        response_time_ms=body.response_time_ms,
     )
-
-    # Update daily practice streak
-    await models.update_streak(db, user_id)
-
-    # Get remaining due count scoped to the card's language pair
-    stats = await models.get_user_stats(db, user_id, language_pair=card.get("language_pair"))
+    if outcome is None:
+        raise HTTPException(status_code=404, detail="Card not found")
 
     return {
-        "next_review": result.next_review.strftime("%Y-%m-%d %H:%M:%S"),
-        "interval_days": result.interval_days,
-        "remaining_due": stats["due"],
+        "next_review": outcome.next_review,
+        "interval_days": outcome.interval_days,
+        "remaining_due": outcome.remaining_due,
     }
 
 
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 
-from backend.auth import ensure_user
+from backend.auth import ensure_user, issue_session_token, verify_init_data
 from backend.db import models
 
 router = APIRouter()
@@ -16,6 +16,24 @@ class PreferencesUpdateRequest(BaseModel):
     active_language_pair: Literal["ko-en", "en-ko", "ko-ru", "en-ru"] | None = None
 
 
+@router.post("/session")
+async def create_session(request: Request):
+    """Exchange Telegram initData for a short-lived session token.
+
+    Send the token back as `Authorization: Bearer <token>`. It never outlives
+    the initData it was issued for, and cannot itself be exchanged again.
+    """
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("tma "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid Authorization header. Expected: tma <initData>",
+        )
+    user, expires_at = verify_init_data(auth_header[4:])
+    token, exp = issue_session_token(user, expires_at)
+    return {"token": token, "expires_at": exp}
+
+
 @router.get("/preferences")
 async def get_preferences(
     user: dict[str, Any] = Depends(ensure_user),
@@ -0,0 +1,192 @@
+"""Deadlines, adaptive concurrency and a circuit breaker for outbound calls."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LLMUnavailableError(Exception):
+    """The provider is not taking calls right now (circuit open, overloaded or timed out)."""
+
+    def __init__(self, message: str, retry_after: int = 5) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CallGuard:
+    """Wraps each outbound call to one provider.
+
+    - Deadline: a call that takes longer than ``timeout`` seconds (or the
+      per-call timeout passed to ``call``/``next_item``) is cancelled and
+      counts as a failure.
+    - Adaptive concurrency (AIMD): at most ``limit`` calls are in flight.
+      Each success raises the limit by 1/limit (about +1 per full window),
+      each failure halves it, within [``min_limit``, ``max_limit``]. Callers
+      wait for a slot at most ``timeout`` seconds.
+    - Circuit breaker: ``failure_threshold`` consecutive failures open the
+      circuit, and calls fail fast for ``reset_timeout`` seconds. Then a
+      single probe call is let through (half-open); its outcome closes or
+      re-opens the circuit.
+
+    ValueError is an answer (e.g. an invalid word), not a provider failure.
+    Errors for which ``is_client_error`` returns True (a 4xx for a bad
+    request or bad credentials) are the caller's problem: they pass through
+    without counting as either a failure or a success.
+    Everything this guard rejects raises LLMUnavailableError.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        max_limit: int,
+        min_limit: int = 1,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        is_client_error: Callable[[BaseException], bool] | None = None,
+    ) -> None:
+        self.name = name
+        self._is_client_error = is_client_error or (lambda e: False)
+        self._timeout = timeout
+        self._min_limit = min_limit
+        self._max_limit = max(min_limit, max_limit)
+        self._limit = float(self._max_limit)
+        self._in_flight = 0
+        self._slot_freed = asyncio.Condition()
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def _admit(self) -> bool:
+        """Breaker check. Returns True if the caller is the half-open probe."""
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and not self._probing:
+            self._state = HALF_OPEN
+            self._probing = True
+            return True
+        self.rejected += 1
+        retry_after = max(1, int(self._opened_at + self._reset_timeout - time.monotonic()) + 1)
+        raise LLMUnavailableError(f"{self.name} is unavailable, please try again shortly", retry_after)
+
+    async def _acquire(self) -> None:
+        async with self._slot_freed:
+            try:
+                await asyncio.wait_for(
+                    self._slot_freed.wait_for(lambda: self._in_flight < int(self._limit)),
+                    self._timeout,
+                )
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise LLMUnavailableError(f"{self.name} is overloaded, please try again shortly") from None
+            self._in_flight += 1
+
+    async def _release(self) -> None:
+        async with self._slot_freed:
+            self._in_flight -= 1
+            self._slot_freed.notify_all()
+
+    def _on_success(self, probe: bool) -> None:
+        self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+        self._consecutive_failures = 0
+        if probe or self._state != CLOSED:
+            logger.info("%s circuit closed", self.name)
+            self._state = CLOSED
+
+    def _on_failure(self, probe: bool) -> None:
+        self.failures += 1
+        self._limit = max(self._min_limit, self._limit / 2)
+        self._consecutive_failures += 1
+        if probe or self._consecutive_failures >= self._failure_threshold:
+            if self._state != OPEN:
+                logger.warning(
+                    "%s circuit opened after %d consecutive failures", self.name, self._consecutive_failures
+                )
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Admit one call: breaker check, then a concurrency slot. Records the outcome."""
+        probe = self._admit()
+        try:
+            await self._acquire()
+        except BaseException:
+            if probe:
+                self._probing = False
+            raise
+        self.calls += 1
+        try:
+            yield
+        except ValueError:
+            self._on_success(probe)
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # Abandoned by the caller (a hedged call that lost, a closed stream); says nothing about the provider
+            raise
+        except BaseException as e:
+            if not self._is_client_error(e):
+                self._on_failure(probe)
+            raise
+        else:
+            self._on_success(probe)
+        finally:
+            if probe:
+                self._probing = False
+            await self._release()
+
+    async def call(self, fn, timeout: float | None = None):
+        """Run fn() inside a slot with a deadline (the guard's default unless given)."""
+        timeout = timeout or self._timeout
+        async with self.slot():
+            try:
+                return await asyncio.wait_for(fn(), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise LLMUnavailableError(f"{self.name} timed out after {timeout:g}s") from None
+
+    async def next_item(self, iterator, timeout: float | None = None):
+        """Await the next item of an async iterator with a deadline (the guard's default unless given)."""
+        timeout = timeout or self._timeout
+        try:
+            return await asyncio.wait_for(iterator.__anext__(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise LLMUnavailableError(f"{self.name} timed out after {timeout:g}s") from None
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "limit": round(self._limit, 2),
+            "in_flight": self._in_flight,
+            "consecutive_failures": self._consecutive_failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,345 @@
+"""Background queue for image translation, so an upload does not hold its request open for the vision call."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import secrets
+import time
+from dataclasses import dataclass, field
+
+from backend.db import models
+from backend.db.connection import Database
+from backend.services.call_guard import LLMUnavailableError
+from backend.services.image_prep import content_hash
+from backend.services.llm import CachedLLMProvider
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+REAP_INTERVAL = 30  # seconds between sweeps for expired jobs
+REMOTE_POLL_INTERVAL = 1  # seconds between reads of a job run by another worker
+# Unfinished jobs older than this were lost with a worker that stopped
+STALE_JOB_SECONDS = 3600
+
+
+class TooManyJobsError(Exception):
+    """The user already has IMAGE_JOB_MAX_PER_USER unfinished jobs in this worker's queue."""
+
+
+async def translate_image_for_user(
+    llm: CachedLLMProvider,
+    db: Database,
+    user_id: int,
+    data: bytes,
+    media_type: str,
+    language_pair: str,
+) -> dict:
+    """Translate an image, log its API usage and flag words the user already has as cards.
+
+    Returns the /translate-image response body. Errors propagate.
+    """
+    async def log_usage(usage: dict) -> None:
+        try:
+            await models.log_api_usage(
+                db, user_id, "translate_image", usage["model"],
+                usage["input_tokens"], usage["output_tokens"],
+                usage["estimated_cost_usd"], language_pair,
+            )
+        except Exception:
+            logger.exception("Failed to log API usage for translate_image")
+
+    source_lang, target_lang = language_pair.split("-", 1)
+    results, usage = await llm.translate_image_bytes(data, media_type, source_lang, target_lang, log_usage)
+    # Empty usage: a cached answer, or an identical upload already in flight paid for this call
+    if usage:
+        await log_usage(usage)
+    duplicates = await models.check_duplicates_batch(db, user_id, [r.source_text for r in results], language_pair)
+    translations = []
+    for r in results:
+        item = r.model_dump()
+        item["is_duplicate"] = r.source_text in duplicates
+        translations.append(item)
+    return {"translations": translations, "count": len(translations)}
+
+
+@dataclass(eq=False)
+class ImageJob:
+    """A job run by this worker (live: status changes wake ``wait_change``),
+    or a snapshot of one read from the image_jobs table (see ``from_row``)."""
+
+    id: str
+    user_id: int
+    key: str
+    language_pair: str
+    media_type: str
+    data: bytes | None
+    status: str = QUEUED
+    result: dict | None = None
+    error: Exception | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _save_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+        if self.finished:
+            self.finished_at = time.time()
+            self.data = None
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_change(self, timeout: float) -> bool:
+        """Wait until the status changes. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def to_row(self) -> dict:
+        error_kind = error_detail = retry_after = None
+        if isinstance(self.error, LLMUnavailableError):
+            error_kind, error_detail, retry_after = "unavailable", str(self.error), self.error.retry_after
+        elif isinstance(self.error, ValueError):
+            error_kind, error_detail = "invalid", str(self.error)
+        elif self.error is not None:
+            error_kind = "failed"
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "job_key": self.key,
+            "language_pair": self.language_pair,
+            "status": self.status,
+            "result": json.dumps(self.result) if self.result is not None else None,
+            "error_kind": error_kind,
+            "error_detail": error_detail,
+            "retry_after": retry_after,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    @classmethod
+    def from_row(cls, row: dict) -> ImageJob:
+        error: Exception | None = None
+        if row["error_kind"] == "unavailable":
+            error = LLMUnavailableError(row["error_detail"] or "", row["retry_after"] or 5)
+        elif row["error_kind"] == "invalid":
+            error = ValueError(row["error_detail"] or "")
+        elif row["error_kind"] is not None:
+            error = RuntimeError("Image translation failed")
+        return cls(
+            id=row["id"],
+            user_id=row["user_id"],
+            key=row["job_key"],
+            language_pair=row["language_pair"],
+            media_type="",
+            data=None,
+            status=row["status"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=error,
+            created_at=row["created_at"],
+            finished_at=row["finished_at"],
+        )
+
+
+class ImageJobQueue:
+    """Bounded in-process queue of image translation jobs, run by a fixed pool of worker tasks.
+
+    A submission returns its job at once; clients poll or subscribe to it
+    by id. Every status change is written to the image_jobs table, so with
+    several uvicorn workers a poll or event stream served by another worker
+    than the one running the job still sees it (by reading the table every
+    REMOTE_POLL_INTERVAL). Resubmitting the same image (same user, bytes and
+    language pair) while a job for it is queued, running or finished within
+    the TTL returns that job instead of a new one. A full queue rejects new
+    jobs with LLMUnavailableError, and a user with ``max_per_user``
+    unfinished jobs in it gets TooManyJobsError. Finished jobs are kept for
+    ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        llm: CachedLLMProvider,
+        db: Database,
+        workers: int,
+        max_queued: int,
+        ttl_seconds: int,
+        max_per_user: int = 3,
+    ) -> None:
+        self._llm = llm
+        self._db = db
+        self._workers = max(1, workers)
+        self._queue: asyncio.Queue[ImageJob] = asyncio.Queue(maxsize=max(1, max_queued))
+        self._ttl_seconds = ttl_seconds
+        self._max_per_user = max(1, max_per_user)
+        # Unfinished jobs run by this worker
+        self._jobs: dict[str, ImageJob] = {}
+        self._by_key: dict[str, ImageJob] = {}
+        self._per_user: dict[int, int] = {}
+        self._tasks: list[asyncio.Task] = []
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"image-job-worker-{i}") for i in range(self._workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._reap(), name="image-job-reaper"))
+
+    async def close(self) -> None:
+        """Stop the workers. Jobs still queued or running are marked failed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in list(self._jobs.values()):
+            job.error = LLMUnavailableError("Image job was interrupted by a shutdown")
+            await self._finish(job, FAILED)
+
+    async def submit(self, user_id: int, data: bytes, media_type: str, language_pair: str) -> tuple[ImageJob, bool]:
+        """Queue an image. Returns (job, True) if an existing job for the same image was reused."""
+        digest = await asyncio.to_thread(content_hash, data)
+        key = f"{user_id}|{digest}|{language_pair}"
+        existing = self._by_key.get(key)
+        if existing is None:
+            row = await models.find_image_job(self._db, key, time.time() - self._ttl_seconds)
+            # Checked again: another submission may have queued it during the read
+            existing = self._by_key.get(key) or (ImageJob.from_row(row) if row else None)
+        if existing is not None:
+            self.deduplicated += 1
+            return existing, True
+
+        if self._per_user.get(user_id, 0) >= self._max_per_user:
+            self.rejected += 1
+            raise TooManyJobsError(f"At most {self._max_per_user} image translations at a time")
+        job = ImageJob(secrets.token_urlsafe(12), user_id, key, language_pair, media_type, data)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise LLMUnavailableError("Image job queue is full", retry_after=10) from None
+        self._jobs[job.id] = job
+        self._by_key[key] = job
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        self.submitted += 1
+        await self._save(job)
+        return job, False
+
+    async def get(self, job_id: str, user_id: int) -> ImageJob | None:
+        """The job with this id if it belongs to the user and has not expired.
+
+        Live for jobs this worker runs, otherwise a snapshot from the table.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job if job.user_id == user_id else None
+        row = await models.get_image_job(self._db, job_id, user_id)
+        return ImageJob.from_row(row) if row else None
+
+    async def wait_change(self, job: ImageJob, seen_status: str, timeout: float) -> bool:
+        """Wait until the job's status differs from `seen_status`. Returns False on timeout."""
+        if self._jobs.get(job.id) is job:
+            if job.status != seen_status:
+                return True
+            return await job.wait_change(timeout)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(REMOTE_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+            row = await models.get_image_job(self._db, job.id, job.user_id)
+            if row is None or row["status"] != seen_status:
+                return True
+        return False
+
+    async def _save(self, job: ImageJob) -> None:
+        # Serialized per job, and the row is taken inside the lock, so the
+        # last write always carries the latest status
+        async with job._save_lock:
+            try:
+                await models.save_image_job(self._db, job.to_row())
+            except Exception:
+                logger.exception("Failed to save image job %s", job.id)
+
+    async def _finish(self, job: ImageJob, status: str) -> None:
+        job.set_status(status)
+        # Saved before it stops being served live, so a reader never sees the old row
+        await self._save(job)
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+        remaining = self._per_user.get(job.user_id, 1) - 1
+        if remaining > 0:
+            self._per_user[job.user_id] = remaining
+        else:
+            self._per_user.pop(job.user_id, None)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ImageJob) -> None:
+        if job.finished:
+            return  # Failed by close() while still queued
+        job.set_status(RUNNING)
+        await self._save(job)
+        try:
+            job.result = await translate_image_for_user(
+                self._llm, self._db, job.user_id, job.data or b"", job.media_type, job.language_pair
+            )
+        except asyncio.CancelledError:
+            raise  # Shutdown: close() marks the job failed
+        except Exception as e:
+            if isinstance(e, LLMUnavailableError):
+                logger.warning("Image translation job %s: LLM unavailable: %s", job.id, e)
+            elif not isinstance(e, ValueError):
+                logger.exception("Image translation job %s failed", job.id)
+            job.error = e
+            self.failed += 1
+            await self._finish(job, FAILED)
+        else:
+            self.completed += 1
+            await self._finish(job, DONE)
+
+    async def expire(self, now: float | None = None) -> int:
+        """Delete expired and stale jobs from the table. Returns the number removed."""
+        now = now if now is not None else time.time()
+        return await models.delete_expired_image_jobs(self._db, now - self._ttl_seconds, now - STALE_JOB_SECONDS)
+
+    async def _reap(self) -> None:
+        while True:
+            await asyncio.sleep(min(REAP_INTERVAL, self._ttl_seconds))
+            try:
+                await self.expire()
+            except Exception:
+                logger.exception("Failed to expire image jobs")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "jobs": len(self._jobs),
+            "workers": self._workers,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -0,0 +1,182 @@
+"""Downsize and strip uploaded images before the vision model sees them, and cache results per image."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # Pillow is optional: without it images are sent as uploaded
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_MEDIA_TYPE = "image/jpeg"
+
+
+def preprocessing_available() -> bool:
+    """Whether Pillow is installed, i.e. images can be preprocessed."""
+    return Image is not None
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    media_type: str
+    width: int
+    height: int
+    phash: int  # 64-bit difference hash of the picture, see dhash()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def dhash(img) -> int:
+    """64-bit difference hash: one bit per neighbouring-pixel comparison on a 9x8 grayscale thumbnail.
+
+    Re-encoding, resizing or light recompression of the same picture changes
+    few bits, so the Hamming distance between hashes measures similarity.
+    """
+    small = img.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left < right)
+    return bits
+
+
+def prepare_image(data: bytes, max_side: int, quality: int) -> PreparedImage:
+    """Decode, orient, downsize to ``max_side`` on the long edge and re-encode as JPEG.
+
+    EXIF orientation is applied to the pixels and all metadata (EXIF, GPS,
+    ICC, comments) is dropped. Transparent images are flattened on white.
+    JPEG input is decoded at a reduced scale when possible (draft mode),
+    which is most of the win for phone photos. Raises ValueError for data
+    Pillow cannot read. CPU-bound: run it off the event loop.
+    """
+    try:
+        img = Image.open(io.BytesIO(data))
+        scale = min(1.0, max_side / max(img.size))
+        img.draft("RGB", (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ValueError("Could not read image") from e
+
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=quality, optimize=True)
+    return PreparedImage(out.getvalue(), OUTPUT_MEDIA_TYPE, img.width, img.height, dhash(img))
+
+
+class ImagePreprocessor:
+    """Runs hashing and prepare_image on a small dedicated thread pool."""
+
+    def __init__(self, max_side: int, quality: int, workers: int) -> None:
+        self._max_side = max_side
+        self._quality = quality
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="image-prep")
+        self.prepared = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    async def hash(self, data: bytes) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, content_hash, data)
+
+    async def prepare(self, data: bytes) -> PreparedImage:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        prepared = await loop.run_in_executor(self._executor, prepare_image, data, self._max_side, self._quality)
+        self.seconds += time.perf_counter() - start
+        self.prepared += 1
+        self.bytes_in += len(data)
+        self.bytes_out += len(prepared.data)
+        return prepared
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "prepared": self.prepared,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "avg_ms": round(self.seconds / self.prepared * 1000, 1) if self.prepared else None,
+        }
+
+
+class ImageResultCache:
+    """In-memory LRU of image translation results, by content hash and optionally by perceptual hash.
+
+    ``get`` matches the exact uploaded bytes. ``get_similar`` scans for an
+    entry whose perceptual hash differs in at most ``max_phash_bits`` bits
+    (0 disables it), so a re-saved or re-sent copy of the same page is also
+    a hit among entries whose key ends with ``key_suffix`` (the language pair).
+    """
+
+    def __init__(self, max_size: int, max_phash_bits: int = 0) -> None:
+        self._entries: OrderedDict[str, tuple[int | None, object]] = OrderedDict()
+        self._max_size = max_size
+        self._max_phash_bits = max_phash_bits
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> object | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def get_similar(self, phash: int, key_suffix: str) -> object | None:
+        if self._max_phash_bits <= 0:
+            return None
+        best_key, best_bits = None, self._max_phash_bits + 1
+        for key, (other, _) in self._entries.items():
+            if other is None or not key.endswith(key_suffix):
+                continue
+            bits = (phash ^ other).bit_count()
+            if bits < best_bits:
+                best_key, best_bits = key, bits
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        self.similar_hits += 1
+        return self._entries[best_key][1]
+
+    def put(self, key: str, phash: int | None, value: object) -> None:
+        self._entries[key] = (phash, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,98 @@
+"""Local script-based language detection and translate input pre-filter."""
+
+from __future__ import annotations
+
+import bisect
+import re
+import unicodedata
+
+# Script of each supported language
+LANGUAGE_SCRIPTS = {"ko": "hangul", "en": "latin", "ru": "cyrillic"}
+
+# (first, last, script) code point ranges, sorted by first
+_SCRIPT_RANGES = [
+    (0x0041, 0x005A, "latin"),
+    (0x0061, 0x007A, "latin"),
+    (0x00C0, 0x024F, "latin"),  # Latin-1 Supplement letters, Latin Extended-A/B
+    (0x0400, 0x052F, "cyrillic"),
+    (0x1100, 0x11FF, "hangul"),  # Jamo
+    (0x1E00, 0x1EFF, "latin"),  # Latin Extended Additional
+    (0x3130, 0x318F, "hangul"),  # Compatibility Jamo
+    (0xA960, 0xA97F, "hangul"),  # Jamo Extended-A
+    (0xAC00, 0xD7A3, "hangul"),  # Syllables
+    (0xD7B0, 0xD7FF, "hangul"),  # Jamo Extended-B
+]
+_RANGE_STARTS = [start for start, _, _ in _SCRIPT_RANGES]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class InvalidWordError(ValueError):
+    """The input is not a word in either language of the pair."""
+
+    def __init__(self, message: str = "Invalid word") -> None:
+        super().__init__(message)
+
+
+def script_of(ch: str) -> str | None:
+    """Script of a single character, or None if it is not in a known script."""
+    code = ord(ch)
+    i = bisect.bisect_right(_RANGE_STARTS, code) - 1
+    if i >= 0 and code <= _SCRIPT_RANGES[i][1]:
+        return _SCRIPT_RANGES[i][2]
+    return None
+
+
+def normalize_input(text: str) -> str:
+    """NFC-normalize, trim and collapse inner whitespace."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _side_counts(text: str, source_lang: str, target_lang: str) -> tuple[int, int]:
+    """Letters of the text in the source and the target language's script."""
+    source_script = LANGUAGE_SCRIPTS.get(source_lang)
+    target_script = LANGUAGE_SCRIPTS.get(target_lang)
+    source_count = target_count = 0
+    for ch in text:
+        script = script_of(ch)
+        if script is None:
+            continue
+        if script == source_script:
+            source_count += 1
+        elif script == target_script:
+            target_count += 1
+    return source_count, target_count
+
+
+def detect_language(text: str, source_lang: str, target_lang: str) -> str | None:
+    """Which side of the pair the text is written in, judged by script.
+
+    Returns source_lang or target_lang when all of the text's letters from
+    either side are in that side's script, None if the text mixes both
+    (e.g. "SNS를") or has none.
+    """
+    source_count, target_count = _side_counts(text, source_lang, target_lang)
+    if source_count and not target_count:
+        return source_lang
+    if target_count and not source_count:
+        return target_lang
+    return None
+
+
+def check_input(text: str, source_lang: str, target_lang: str) -> tuple[str, str | None]:
+    """Pre-filter a translate input before any cache or LLM lookup.
+
+    Returns (normalized text, detect_language result). Raises
+    InvalidWordError if the text is empty after normalization, has no
+    letters (punctuation, digits, emoji), or has letters only in scripts
+    matching neither side of the pair. Pairs with a language outside
+    LANGUAGE_SCRIPTS only get the first two checks.
+    """
+    word = normalize_input(text)
+    if not any(ch.isalpha() for ch in word):
+        raise InvalidWordError()
+    if source_lang not in LANGUAGE_SCRIPTS or target_lang not in LANGUAGE_SCRIPTS:
+        return word, None
+    if _side_counts(word, source_lang, target_lang) == (0, 0):
+        raise InvalidWordError()
+    return word, detect_language(word, source_lang, target_lang)
@@ -0,0 +1,118 @@
+"""Read-only, memory-mapped bilingual lexicon: the translate tier before any cache miss."""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LEX1"
+
+# magic, entry count
+_HEADER = struct.Struct("<4sI")
+# per entry: offset of the key in the file, key length, value length.
+# The value (TranslationResult JSON) follows its key directly.
+_ENTRY = struct.Struct("<IHH")
+
+
+def write_lexicon(path: str, entries: dict[str, str]) -> int:
+    """Write key -> value entries as a lexicon file. Returns the entry count.
+
+    Layout: header, fixed-size entry table sorted by the UTF-8 bytes of the
+    key, then the key and value bytes. Written to a temporary file and
+    renamed into place, so a server that has the old file mapped keeps
+    reading it until it restarts.
+    """
+    items = sorted((key.encode(), value.encode()) for key, value in entries.items())
+    data_start = _HEADER.size + _ENTRY.size * len(items)
+    table = bytearray()
+    data = bytearray()
+    for key, value in items:
+        if len(key) > 0xFFFF or len(value) > 0xFFFF:
+            raise ValueError(f"Lexicon entry too large: {key[:40]!r}")
+        table += _ENTRY.pack(data_start + len(data), len(key), len(value))
+        data += key
+        data += value
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(items)))
+        f.write(table)
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(items)
+
+
+class Lexicon:
+    """Looks up values by exact key in a file written by write_lexicon.
+
+    The file is memory-mapped, not parsed: opening it reads only the header,
+    and a lookup is a binary search over the entry table touching
+    O(log n) pages, so cost and resident memory do not grow with the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(f"Not a lexicon file: {path}")
+        magic, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) < _HEADER.size + _ENTRY.size * self._count:
+            self._map.close()
+            raise ValueError(f"Not a lexicon file: {path}")
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open(cls, path: str) -> Lexicon | None:
+        """Open the lexicon at path, or return None (logged) if it is missing or unreadable."""
+        if not os.path.exists(path):
+            logger.info("No lexicon at %s, translations go to the caches and LLM only", path)
+            return None
+        try:
+            lexicon = cls(path)
+        except (OSError, ValueError):
+            logger.exception("Could not open lexicon %s", path)
+            return None
+        logger.info("Lexicon loaded: %s (%d entries)", path, len(lexicon))
+        return lexicon
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, i: int) -> tuple[int, int, int]:
+        return _ENTRY.unpack_from(self._map, _HEADER.size + _ENTRY.size * i)
+
+    def get(self, key: str) -> str | None:
+        target = key.encode()
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset, key_len, value_len = self._entry(mid)
+            probe = self._map[offset:offset + key_len]
+            if probe < target:
+                lo = mid + 1
+            elif probe > target:
+                hi = mid
+            else:
+                self.hits += 1
+                start = offset + key_len
+                return self._map[start:start + value_len].decode()
+        self.misses += 1
+        return None
+
+    def close(self) -> None:
+        self._map.close()
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "entries": self._count,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -1,23 +1,50 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import json
 import logging
 import re
+import time
 from abc import ABC, abstractmethod
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
 
 import anthropic
 import openai
 from pydantic import BaseModel, field_validator
 
 from backend import config
+from backend.db.connection import Database
+from backend.db.cache import TTLCache
+from backend.db.canonical import canonical_text
+from backend.services.call_guard import CallGuard, LLMUnavailableError
+from backend.services.image_prep import ImagePreprocessor, ImageResultCache, content_hash, preprocessing_available
+from backend.services.lang_detect import InvalidWordError, check_input, detect_language
+from backend.services.lexicon import Lexicon
+from backend.services.llm_cache import PersistentLLMCache
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 1.0
 
+# Bump the version for a kind of call when its prompt builder (or how its
+# answers are keyed) changes, so answers persisted for the old prompt stop
+# matching in the llm_cache table. EXPLAIN_PROMPT_VERSION also keys the
+# explanation_texts shared by cards, so bump it only for an explain change.
+TRANSLATE_PROMPT_VERSION = 2
+EXPLAIN_PROMPT_VERSION = 1
+IMAGE_PROMPT_VERSION = 1
+
+# llm_cache kind -> prompt version
+PROMPT_VERSIONS = {
+    "translate": TRANSLATE_PROMPT_VERSION,
+    "explain": EXPLAIN_PROMPT_VERSION,
+    "translate_image": IMAGE_PROMPT_VERSION,
+}
+
 
 class LRUCache:
     """Simple in-memory LRU cache using OrderedDict."""
@@ -36,6 +63,9 @@ class LRUCache:
         self.misses += 1
         return None
 
+    def __contains__(self, key: str) -> bool:
+        return key in self._cache
+
     def put(self, key: str, value: object) -> None:
         if key in self._cache:
             self._cache.move_to_end(key)
@@ -50,8 +80,225 @@ class LRUCache:
         return len(self._cache)
 
 
+# Logs usage that no caller collected, e.g. because every client went away
+# before a shared call finished. Must not raise.
+UsageSink = Callable[[dict], Awaitable[None]]
+
+_usage_deliveries: set[asyncio.Task] = set()
+
+
+async def _deliver_usage(sink: UsageSink, usage: dict) -> None:
+    try:
+        await sink(usage)
+    except Exception:
+        logger.exception("Failed to log usage of an abandoned LLM call")
+
+
+def _hand_off_usage(sink: UsageSink | None, usage: dict, what: str) -> None:
+    """Pass usage nobody collected to ``sink`` in the background."""
+    if sink is None:
+        logger.warning("Usage of an abandoned %s was not logged", what)
+        return
+    task = asyncio.ensure_future(_deliver_usage(sink, usage))
+    _usage_deliveries.add(task)
+    task.add_done_callback(_usage_deliveries.discard)
+
+
+class _Flight:
+    __slots__ = ("task", "usage_claimed", "usage_sink", "waiters")
+
+    def __init__(self, task: asyncio.Task, usage_sink: UsageSink | None) -> None:
+        self.task = task
+        self.usage_claimed = False
+        self.usage_sink = usage_sink
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one underlying call.
+
+    The call runs as its own task so a cancelled caller does not cancel it
+    for everyone else; callers await it through ``asyncio.shield`` and all
+    see the same result or exception. The first caller to collect a result
+    also gets its usage dict, the others get None, so a paid call is logged
+    exactly once. If every caller is gone by the time the call finishes,
+    its usage goes to the ``usage_sink`` of the caller that started it.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def run(self, key: str, fn, usage_sink: UsageSink | None = None) -> tuple[object, dict | None]:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()), usage_sink)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Coalesced in-flight LLM call: %s", key)
+
+        flight.waiters += 1
+        try:
+            result, usage = await asyncio.shield(flight.task)
+        except BaseException:
+            flight.waiters -= 1
+            if flight.waiters == 0 and flight.task.done():
+                # Cancelled after the result arrived but before collecting it
+                self._orphan(flight)
+            raise
+        flight.waiters -= 1
+        if flight.usage_claimed:
+            return result, None
+        flight.usage_claimed = True
+        return result, usage
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception retrieved even if every caller was cancelled
+            flight.task.exception()
+        if flight.waiters == 0:
+            self._orphan(flight)
+
+    def _orphan(self, flight: _Flight) -> None:
+        if flight.usage_claimed or flight.task.cancelled() or flight.task.exception() is not None:
+            return
+        usage = flight.task.result()[1]
+        if not usage:
+            return
+        flight.usage_claimed = True
+        self.abandoned += 1
+        _hand_off_usage(flight.usage_sink, usage, "LLM call")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "coalesced": self.coalesced, "abandoned": self.abandoned, "in_flight": self.in_flight}
+
+
+class _Broadcast:
+    __slots__ = ("task", "chunks", "end", "error", "changed", "subscribers", "usage_claimed", "usage_sink")
+
+    def __init__(self, usage_sink: UsageSink | None) -> None:
+        self.usage_sink = usage_sink
+        self.task: asyncio.Task | None = None
+        self.chunks: list[str] = []
+        self.end: StreamEnd | None = None
+        self.error: Exception | None = None
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self.usage_claimed = False
+
+    def notify(self) -> None:
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class StreamFlight:
+    """Fans one upstream stream out to every concurrent subscriber with the same key.
+
+    The upstream is consumed by its own task into a buffer; subscribers
+    that join late replay the buffered deltas first, then follow live.
+    Subscribers leaving never cut the upstream: it is paid for once it
+    starts, so it runs to the end and its text is cached. As with
+    SingleFlight, the first subscriber to reach the end gets the usage; the
+    others get a StreamEnd with empty usage and ``was_cached`` set. If none
+    is left to take it, the usage goes to the ``usage_sink`` of the
+    subscriber that started the stream.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Broadcast] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def subscribe(self, key: str, open_stream, usage_sink: UsageSink | None = None) -> AsyncIterator[str | StreamEnd]:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Broadcast(usage_sink)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._pump(key, flight, open_stream))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Joined in-flight LLM stream: %s", key)
+
+        flight.subscribers += 1
+        sent = 0
+        try:
+            while True:
+                while sent < len(flight.chunks):
+                    yield flight.chunks[sent]
+                    sent += 1
+                if flight.error is not None:
+                    raise flight.error
+                if flight.end is not None:
+                    if flight.usage_claimed:
+                        yield StreamEnd(flight.end.text, {}, True)
+                    else:
+                        flight.usage_claimed = True
+                        yield flight.end
+                    return
+                await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and flight.end is not None:
+                # Left between the end arriving and collecting it
+                self._orphan(flight)
+
+    async def _pump(self, key: str, flight: _Broadcast, open_stream) -> None:
+        try:
+            async for item in open_stream():
+                if isinstance(item, StreamEnd):
+                    flight.end = item
+                else:
+                    flight.chunks.append(item)
+                flight.notify()
+        except Exception as e:
+            flight.error = e
+            flight.notify()
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if flight.subscribers == 0 and flight.end is not None:
+            self._orphan(flight)
+
+    def _orphan(self, flight: _Broadcast) -> None:
+        """Hand uncollected usage to the starting subscriber's sink."""
+        if flight.usage_claimed or not flight.end.usage:  # type: ignore[union-attr]
+            return
+        flight.usage_claimed = True
+        self.abandoned += 1
+        _hand_off_usage(flight.usage_sink, flight.end.usage, "explanation stream")  # type: ignore[union-attr]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "coalesced": self.coalesced, "abandoned": self.abandoned, "in_flight": self.in_flight}
+
+
 # Module-level caches (initialized once at import time)
 _translation_cache = LRUCache(config.TRANSLATION_CACHE_SIZE)
+# Words the model answered "Invalid word" for, by canonical translate key
+INVALID_WORD_TTL = 7 * 86400
+_invalid_word_cache = TTLCache(config.TRANSLATION_CACHE_SIZE, ttl=INVALID_WORD_TTL)
 _explanation_cache = LRUCache(config.EXPLANATION_CACHE_SIZE)
 
 SUPPORTED_PAIRS: dict[str, dict] = {
@@ -98,8 +345,12 @@ def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
     return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
 
 
-def build_translation_prompt(source_lang: str, target_lang: str) -> str:
-    """Build a translation system prompt for the given language pair."""
+def build_translation_prompt(source_lang: str, target_lang: str, input_lang: str | None = None) -> str:
+    """Build a translation system prompt for the given language pair.
+
+    ``input_lang`` (source_lang or target_lang, when known from the script)
+    tells the model which side the input is on.
+    """
     pair_key = f"{source_lang}-{target_lang}"
     pair = SUPPORTED_PAIRS.get(pair_key)
     if pair:
@@ -112,8 +363,14 @@ def build_translation_prompt(source_lang: str, target_lang: str) -> str:
         extra = ""
 
     extra_line = f"\n   {extra}" if extra else ""
+    if input_lang == source_lang:
+        detect = f"The input is in {source_name}. Provide:"
+    elif input_lang == target_lang:
+        detect = f"The input is in {target_name}. Provide:"
+    else:
+        detect = "Detect the input language and provide:"
 
-    return f"""You are a {source_name}-{target_name} language expert. The user may input a word, phrase, or sentence in either {source_name} or {target_name}. Detect the input language and provide:
+    return f"""You are a {source_name}-{target_name} language expert. The user may input a word, phrase, or sentence in either {source_name} or {target_name}. {detect}
 1. `source_text`: The word/phrase in {source_name} (cleaned/corrected if needed)
 2. `target_text`: The translation in {target_name}. If the word has multiple meanings, provide the translation for each meaning.
 3. `example_source`: An example sentence in {source_name} using this word.
@@ -130,8 +387,13 @@ If the word is not valid in either {source_name} or {target_name}, respond with
 
 
 def _extract_json(text: str) -> dict:
-    """Extract JSON from LLM response, handling markdown code blocks."""
+    """Extract JSON from LLM response, handling markdown code blocks.
+
+    Raises InvalidWordError when the model gave the prompt's "Invalid word" answer.
+    """
     text = text.strip()
+    if text.strip('."\'').lower() == "invalid word":
+        raise InvalidWordError()
 
     try:
         return json.loads(text)
@@ -221,6 +483,39 @@ Respond with ONLY a raw JSON array, no markdown, no code fences, no explanation:
 Extract every word/phrase you can see. Do not skip any."""
 
 
+def build_batch_translation_prompt(source_lang: str, target_lang: str) -> str:
+    """Build a system prompt for translating a JSON array of words in one call."""
+    pair_key = f"{source_lang}-{target_lang}"
+    pair = SUPPORTED_PAIRS.get(pair_key)
+    if pair:
+        source_name = pair["source_name"]
+        target_name = pair["target_name"]
+        extra = pair["extra_instructions"]
+    else:
+        source_name = source_lang.upper()
+        target_name = target_lang.upper()
+        extra = ""
+
+    extra_line = f"\n{extra}" if extra else ""
+
+    return f"""You are a {source_name}-{target_name} language expert. The user will provide a JSON array of words, phrases, or sentences, each in either {source_name} or {target_name}.
+
+For each input, detect its language and provide:
+- `input`: The input exactly as given, unchanged.
+- `source_text`: The word/phrase in {source_name} (cleaned/corrected if needed)
+- `target_text`: The translation in {target_name}. If the word has multiple meanings, provide the translation for each meaning.
+- `example_source`: An example sentence in {source_name} using this word.
+- `example_target`: The {target_name} translation of the example sentence.
+- `part_of_speech`: The grammatical category of the source word (e.g. noun, verb, adjective, adverb, etc.)
+
+If an input is in {target_name}, translate it to {source_name} for `source_text` and use the original input as `target_text`.
+If an input is in {source_name}, use it as `source_text` and translate to {target_name} for `target_text`.{extra_line}
+Leave out any input that is not a valid word in either {source_name} or {target_name}.
+
+Respond with ONLY a raw JSON array in the same order as the input, no markdown, no code fences, no explanation:
+[{{"input": "...", "source_text": "...", "target_text": "...", "example_source": "...", "example_target": "...", "part_of_speech": "..."}}, ...]"""
+
+
 class TranslationResult(BaseModel):
     """Structured output from LLM translation."""
 
@@ -260,13 +555,97 @@ Use markdown formatting (bold, bullet points). Keep it concise — no more than
 Return ONLY the explanation text, no preamble or quotes."""
 
 
-async def _call_with_retry(fn, retryable_exceptions: tuple, label: str):
-    """Call fn() with exponential backoff retry on transient errors."""
+def _match_batch(words: list[str], items: list[dict]) -> list[TranslationResult | None]:
+    """Align batch results with the input words; None where a word has no usable result."""
+    by_input: dict[str, dict] = {}
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("input"), str):
+            by_input.setdefault(canonical_text(item["input"]), item)
+    if by_input:
+        matched = [by_input.get(canonical_text(word)) for word in words]
+    elif len(items) == len(words):
+        matched = list(items)
+    else:
+        return [None] * len(words)
+
+    results: list[TranslationResult | None] = []
+    for item in matched:
+        try:
+            results.append(TranslationResult.model_validate(item) if item is not None else None)
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def _add_usage(total: dict, usage: dict) -> dict:
+    """Sum two usage dicts (either may be empty)."""
+    if not total:
+        return dict(usage)
+    if not usage:
+        return total
+    return {
+        "model": total["model"],
+        "input_tokens": total["input_tokens"] + usage["input_tokens"],
+        "output_tokens": total["output_tokens"] + usage["output_tokens"],
+        "estimated_cost_usd": total["estimated_cost_usd"] + usage["estimated_cost_usd"],
+    }
+
+
+def _split_usage(usage: dict, parts: int) -> dict:
+    """Divide one call's usage evenly between the words it translated."""
+    if not usage or parts <= 1:
+        return usage
+    return {
+        "model": usage["model"],
+        "input_tokens": usage["input_tokens"] // parts,
+        "output_tokens": usage["output_tokens"] // parts,
+        "estimated_cost_usd": usage["estimated_cost_usd"] / parts,
+    }
+
+
+# 4xx statuses that are about load or timing, not the request itself
+_TRANSIENT_CLIENT_STATUSES = {408, 409, 429}
+
+
+def _is_client_error(e: BaseException) -> bool:
+    """A 4xx from the provider caused by the request or credentials: retrying cannot help."""
+    if not isinstance(e, (anthropic.APIStatusError, openai.APIStatusError)):
+        return False
+    return 400 <= e.status_code < 500 and e.status_code not in _TRANSIENT_CLIENT_STATUSES
+
+
+def _new_guard(name: str) -> CallGuard:
+    return CallGuard(
+        name,
+        timeout=config.LLM_CALL_TIMEOUT,
+        max_limit=config.LLM_MAX_CONCURRENCY,
+        failure_threshold=config.LLM_BREAKER_FAILURES,
+        reset_timeout=config.LLM_BREAKER_RESET_SECONDS,
+        is_client_error=_is_client_error,
+    )
+
+
+async def _call_with_retry(
+    fn,
+    retryable_exceptions: tuple,
+    label: str,
+    guard: CallGuard | None = None,
+    timeout: float | None = None,
+):
+    """Call fn() with exponential backoff retry on transient errors.
+
+    With a guard, every attempt runs under it with ``timeout`` as the
+    deadline (the guard's default, LLM_CALL_TIMEOUT, if not given).
+    LLMUnavailableError from the guard (open circuit, overload, deadline)
+    and client errors (4xx other than 408/409/429) are not retried.
+    """
     for attempt in range(MAX_RETRIES):
         try:
+            if guard is not None:
+                return await guard.call(fn, timeout)
             return await fn()
         except retryable_exceptions as e:
-            if attempt == MAX_RETRIES - 1:
+            if attempt == MAX_RETRIES - 1 or _is_client_error(e):
                 raise
             delay = RETRY_DELAY_BASE * (2 ** attempt)
             logger.warning("%s attempt %d failed: %s. Retrying in %.1fs", label, attempt + 1, e, delay)
@@ -274,9 +653,60 @@ async def _call_with_retry(fn, retryable_exceptions: tuple, label: str):
     raise RuntimeError("Unreachable")
 
 
+async def _stream_with_retry(open_stream, retryable_exceptions: tuple, label: str, guard: CallGuard) -> AsyncIterator:
+    """Iterate open_stream(), retrying like _call_with_retry until the first item arrives.
+
+    Once anything has been yielded the caller has seen partial output, so a
+    later failure is raised instead of restarting the stream. The first item
+    must arrive within the guard's default deadline (LLM_CALL_TIMEOUT), the
+    whole stream within LLM_STREAM_TIMEOUT; the slot is held until the
+    stream ends.
+    """
+    for attempt in range(MAX_RETRIES):
+        started = False
+        try:
+            async with guard.slot():
+                deadline = time.monotonic() + config.LLM_STREAM_TIMEOUT
+                stream = open_stream()
+                try:
+                    item = await guard.next_item(stream)
+                except StopAsyncIteration:
+                    return
+                started = True
+                yield item
+                while True:
+                    try:
+                        item = await guard.next_item(stream, max(deadline - time.monotonic(), 0.001))
+                    except StopAsyncIteration:
+                        break
+                    yield item
+            return
+        except retryable_exceptions as e:
+            if started or attempt == MAX_RETRIES - 1 or _is_client_error(e):
+                raise
+            delay = RETRY_DELAY_BASE * (2 ** attempt)
+            logger.warning("%s attempt %d failed: %s. Retrying in %.1fs", label, attempt + 1, e, delay)
+            await asyncio.sleep(delay)
+
+
+def _clean_explanation(text: str) -> str:
+    return text.strip().strip("`").strip()
+
+
+@dataclass
+class StreamEnd:
+    """Last item of an explanation stream: the full text and what it cost."""
+
+    text: str
+    usage: dict
+    was_cached: bool = False
+
+
 class LLMProvider(ABC):
     """Abstract base for LLM providers."""
 
+    model: str
+
     @abstractmethod
     async def translate(self, word: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[TranslationResult, dict, bool]:
         """Translate a word. Returns (result, usage, was_cached)."""
@@ -287,6 +717,44 @@ class LLMProvider(ABC):
         """Generate explanation. Returns (markdown, usage, was_cached)."""
         ...
 
+    async def translate_many(self, words: list[str], source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult | None], dict]:
+        """Translate several words in one call. Returns (results aligned with words, usage).
+
+        A None entry means the word got no usable result and should be retried
+        on its own. The default makes one call per word.
+        """
+        results: list[TranslationResult | None] = []
+        total: dict = {}
+        for word in words:
+            try:
+                result, usage, _ = await self.translate(word, source_lang, target_lang)
+            except ValueError:
+                results.append(None)
+                continue
+            results.append(result)
+            total = _add_usage(total, usage)
+        return results, total
+
+    async def explain_word_stream(self, word: str, translation: str, source_lang: str, target_lang: str) -> AsyncIterator[str | StreamEnd]:
+        """Generate an explanation as text deltas, ending with one StreamEnd.
+
+        The default yields the whole explain_word answer as a single delta.
+        """
+        text, usage, was_cached = await self.explain_word(word, translation, source_lang, target_lang)
+        yield text
+        yield StreamEnd(text, usage, was_cached)
+
+    def health(self) -> list[dict]:
+        """State of the call guards behind this provider, for monitoring."""
+        guard = getattr(self, "_guard", None)
+        return [guard.stats()] if guard is not None else []
+
+    async def start(self) -> None:
+        """Start background work (if any). Called from the app lifespan."""
+
+    async def close(self) -> None:
+        """Stop background work and flush state (if any)."""
+
     @abstractmethod
     async def translate_image(self, image_base64: str, media_type: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult], dict]:
         """Extract and translate all words from an image. Returns (list of translations, usage info)."""
@@ -298,9 +766,11 @@ class AnthropicProvider(LLMProvider):
 
     _RETRYABLE = (anthropic.APIError, anthropic.APIConnectionError, anthropic.RateLimitError)
 
-    def __init__(self) -> None:
-        self.client = anthropic.AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY)
-        self.model = config.LLM_MODEL
+    def __init__(self, model: str | None = None) -> None:
+        # Retries happen in _call_with_retry, under the guard
+        self.client = anthropic.AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY, max_retries=0)
+        self.model = model or config.LLM_MODEL
+        self._guard = _new_guard(f"Anthropic {self.model}")
 
     def _extract_text(self, response) -> str:
         for block in response.content:
@@ -318,7 +788,7 @@ class AnthropicProvider(LLMProvider):
         return usage
 
     async def translate(self, word: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[TranslationResult, dict, bool]:
-        system_prompt = build_translation_prompt(source_lang, target_lang)
+        system_prompt = build_translation_prompt(source_lang, target_lang, detect_language(word, source_lang, target_lang))
 
         async def call():
             response = await self.client.messages.create(
@@ -329,7 +799,21 @@ class AnthropicProvider(LLMProvider):
             logger.debug("Anthropic raw response: %s", text)
             return TranslationResult.model_validate(_extract_json(text)), self._usage(response), False
 
-        return await _call_with_retry(call, self._RETRYABLE, "Anthropic translate")
+        return await _call_with_retry(call, self._RETRYABLE, "Anthropic translate", self._guard)
+
+    async def translate_many(self, words: list[str], source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult | None], dict]:
+        system_prompt = build_batch_translation_prompt(source_lang, target_lang)
+
+        async def call():
+            response = await self.client.messages.create(
+                model=self.model, max_tokens=400 * len(words), system=system_prompt,
+                messages=[{"role": "user", "content": json.dumps(words, ensure_ascii=False)}],
+            )
+            text = self._extract_text(response)
+            logger.debug("Anthropic batch translate response: %s", text[:500])
+            return _match_batch(words, _extract_json_array(text)), self._usage(response)
+
+        return await _call_with_retry(call, self._RETRYABLE, "Anthropic batch translate", self._guard, config.LLM_LONG_CALL_TIMEOUT)
 
     async def explain_word(self, word: str, translation: str, source_lang: str, target_lang: str) -> tuple[str, dict, bool]:
         prompt = build_explanation_prompt(word, translation, source_lang, target_lang)
@@ -341,9 +825,27 @@ class AnthropicProvider(LLMProvider):
             )
             text = self._extract_text(response)
             logger.debug("Anthropic explain response: %s", text)
-            return text.strip().strip("`").strip(), self._usage(response), False
+            return _clean_explanation(text), self._usage(response), False
 
-        return await _call_with_retry(call, self._RETRYABLE, "Anthropic explain")
+        return await _call_with_retry(call, self._RETRYABLE, "Anthropic explain", self._guard)
+
+    async def explain_word_stream(self, word: str, translation: str, source_lang: str, target_lang: str) -> AsyncIterator[str | StreamEnd]:
+        prompt = build_explanation_prompt(word, translation, source_lang, target_lang)
+
+        async def stream():
+            async with self.client.messages.stream(
+                model=self.model, max_tokens=1024,
+                messages=[{"role": "user", "content": prompt}],
+            ) as response:
+                async for delta in response.text_stream:
+                    yield delta
+                final = await response.get_final_message()
+            text = self._extract_text(final)
+            logger.debug("Anthropic explain stream response: %s", text)
+            yield StreamEnd(_clean_explanation(text), self._usage(final))
+
+        async for item in _stream_with_retry(stream, self._RETRYABLE, "Anthropic explain stream", self._guard):
+            yield item
 
     async def translate_image(self, image_base64: str, media_type: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult], dict]:
         system_prompt = build_image_translation_prompt(source_lang, target_lang)
@@ -364,7 +866,7 @@ class AnthropicProvider(LLMProvider):
             results = [TranslationResult.model_validate(item) for item in _extract_json_array(text)]
             return results, self._usage(response)
 
-        return await _call_with_retry(call, self._RETRYABLE, "Anthropic image translate")
+        return await _call_with_retry(call, self._RETRYABLE, "Anthropic image translate", self._guard, config.LLM_LONG_CALL_TIMEOUT)
 
 
 class OpenAIProvider(LLMProvider):
@@ -372,9 +874,11 @@ class OpenAIProvider(LLMProvider):
 
     _RETRYABLE = (openai.APIError, openai.APIConnectionError, openai.RateLimitError)
 
-    def __init__(self) -> None:
-        self.client = openai.AsyncOpenAI(api_key=config.OPENAI_API_KEY)
-        self.model = config.LLM_MODEL or "gpt-4.1-mini"
+    def __init__(self, model: str | None = None) -> None:
+        # Retries happen in _call_with_retry, under the guard
+        self.client = openai.AsyncOpenAI(api_key=config.OPENAI_API_KEY, max_retries=0)
+        self.model = model or config.LLM_MODEL or "gpt-4.1-mini"
+        self._guard = _new_guard(f"OpenAI {self.model}")
 
     def _usage(self, response) -> dict:
         usage_obj = response.usage
@@ -387,7 +891,7 @@ class OpenAIProvider(LLMProvider):
         return usage
 
     async def translate(self, word: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[TranslationResult, dict, bool]:
-        system_prompt = build_translation_prompt(source_lang, target_lang)
+        system_prompt = build_translation_prompt(source_lang, target_lang, detect_language(word, source_lang, target_lang))
 
         async def call():
             response = await self.client.chat.completions.create(
@@ -402,7 +906,35 @@ class OpenAIProvider(LLMProvider):
             logger.debug("OpenAI raw response: %s", text)
             return TranslationResult.model_validate(_extract_json(text)), self._usage(response), False
 
-        return await _call_with_retry(call, self._RETRYABLE, "OpenAI translate")
+        return await _call_with_retry(call, self._RETRYABLE, "OpenAI translate", self._guard)
+
+    async def translate_many(self, words: list[str], source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult | None], dict]:
+        system_prompt = build_batch_translation_prompt(source_lang, target_lang)
+
+        async def call():
+            response = await self.client.chat.completions.create(
+                model=self.model, max_tokens=400 * len(words),
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": system_prompt + '\n\nIMPORTANT: Wrap the array in a JSON object like: {"words": [...]}'},
+                    {"role": "user", "content": json.dumps(words, ensure_ascii=False)},
+                ],
+            )
+            text = response.choices[0].message.content or "[]"
+            logger.debug("OpenAI batch translate response: %s", text[:500])
+            try:
+                parsed = json.loads(text)
+                if isinstance(parsed, dict) and "words" in parsed:
+                    items = parsed["words"]
+                elif isinstance(parsed, list):
+                    items = parsed
+                else:
+                    items = next((v for v in parsed.values() if isinstance(v, list)), [])
+            except json.JSONDecodeError:
+                items = _extract_json_array(text)
+            return _match_batch(words, items), self._usage(response)
+
+        return await _call_with_retry(call, self._RETRYABLE, "OpenAI batch translate", self._guard, config.LLM_LONG_CALL_TIMEOUT)
 
     async def explain_word(self, word: str, translation: str, source_lang: str, target_lang: str) -> tuple[str, dict, bool]:
         prompt = build_explanation_prompt(word, translation, source_lang, target_lang)
@@ -414,9 +946,35 @@ class OpenAIProvider(LLMProvider):
             )
             text = response.choices[0].message.content or ""
             logger.debug("OpenAI explain response: %s", text)
-            return text.strip().strip("`").strip(), self._usage(response), False
+            return _clean_explanation(text), self._usage(response), False
+
+        return await _call_with_retry(call, self._RETRYABLE, "OpenAI explain", self._guard)
+
+    async def explain_word_stream(self, word: str, translation: str, source_lang: str, target_lang: str) -> AsyncIterator[str | StreamEnd]:
+        prompt = build_explanation_prompt(word, translation, source_lang, target_lang)
 
-        return await _call_with_retry(call, self._RETRYABLE, "OpenAI explain")
+        async def stream():
+            response = await self.client.chat.completions.create(
+                model=self.model, max_tokens=1024,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True, stream_options={"include_usage": True},
+            )
+            parts: list[str] = []
+            last_chunk = None
+            async for chunk in response:
+                last_chunk = chunk
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+            if last_chunk is None:
+                raise RuntimeError("OpenAI explain stream returned no chunks")
+            text = "".join(parts)
+            logger.debug("OpenAI explain stream response: %s", text)
+            # With include_usage the final chunk carries the usage for the whole completion
+            yield StreamEnd(_clean_explanation(text), self._usage(last_chunk))
+
+        async for item in _stream_with_retry(stream, self._RETRYABLE, "OpenAI explain stream", self._guard):
+            yield item
 
     async def translate_image(self, image_base64: str, media_type: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult], dict]:
         system_prompt = build_image_translation_prompt(source_lang, target_lang)
@@ -450,51 +1008,865 @@ class OpenAIProvider(LLMProvider):
                 items = _extract_json_array(text)
             return [TranslationResult.model_validate(item) for item in items], self._usage(response)
 
-        return await _call_with_retry(call, self._RETRYABLE, "OpenAI image translate")
+        return await _call_with_retry(call, self._RETRYABLE, "OpenAI image translate", self._guard, config.LLM_LONG_CALL_TIMEOUT)
 
 
-class CachedLLMProvider(LLMProvider):
-    """Wraps any LLMProvider with in-memory LRU caching for translate/explain."""
+HEALTH_WINDOW = 50  # recent calls kept per provider
+HEALTH_MIN_SAMPLES = 5
+HEALTH_MAX_ERROR_RATE = 0.5
+HEALTH_MAX_AGE = 60  # seconds a sample counts; a degraded provider gets retried after this
 
-    def __init__(self, inner: LLMProvider) -> None:
-        self._inner = inner
+
+class ProviderHealth:
+    """Rolling latency and error stats for one provider over its recent calls.
+
+    Keeps the last HEALTH_WINDOW calls, ignoring any older than HEALTH_MAX_AGE.
+    Latency is kept per operation ("translate", "explain", ...), since a
+    vision call legitimately takes many times longer than a word lookup.
+    """
+
+    def __init__(self) -> None:
+        self._samples: deque[tuple[float, str, float, bool]] = deque(maxlen=HEALTH_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.wins = 0
+        self.cost_usd = 0.0
+
+    def record(self, op: str, latency: float, ok: bool) -> None:
+        self._samples.append((time.monotonic(), op, latency, ok))
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+
+    def _recent(self, op: str | None = None) -> list[tuple[float, bool]]:
+        cutoff = time.monotonic() - HEALTH_MAX_AGE
+        return [
+            (latency, ok) for at, sample_op, latency, ok in self._samples
+            if at >= cutoff and (op is None or sample_op == op)
+        ]
+
+    @property
+    def error_rate(self) -> float:
+        samples = self._recent()
+        if not samples:
+            return 0.0
+        return sum(1 for _, ok in samples if not ok) / len(samples)
+
+    def latency(self, quantile: float, op: str | None = None) -> float | None:
+        latencies = sorted(latency for latency, ok in self._recent(op) if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+    def degraded(self, slow_after: float | None, op: str = "translate") -> bool:
+        """Mostly failing, or (with slow_after) typically slower than that at ``op``, lately."""
+        if len(self._recent()) < HEALTH_MIN_SAMPLES:
+            return False
+        if self.error_rate > HEALTH_MAX_ERROR_RATE:
+            return True
+        if slow_after is None or len(self._recent(op)) < HEALTH_MIN_SAMPLES:
+            return False
+        p50 = self.latency(0.5, op)
+        return p50 is not None and p50 > slow_after
+
+    def stats(self) -> dict:
+        latency = {}
+        for op in sorted({sample[1] for sample in self._samples}):
+            p50, p95 = self.latency(0.5, op), self.latency(0.95, op)
+            latency[op] = {
+                "p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            }
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "wins": self.wins,
+            "error_rate": round(self.error_rate, 3),
+            "latency": latency,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+class FailoverLLMProvider(LLMProvider):
+    """Spreads calls over several providers, in order of preference.
+
+    Each call goes to the first provider that is not degraded (see
+    ProviderHealth). A single-word translation that has not answered after
+    ``hedge_after_ms`` is also sent to the next provider; the first answer
+    wins and the other call is cancelled. Batch, explain and image calls
+    are never hedged: they normally take longer than any useful threshold,
+    so hedging them would pay for most of them twice. If a call fails, the
+    next provider is tried straight away. A ValueError (e.g. an invalid
+    word) is an answer, not a failure.
+
+    Usage comes from the provider that answered, so tokens are logged
+    against the model actually used. A cancelled hedge was still billed:
+    its cost is estimated from the winner's token counts at the loser's
+    prices and added to the returned ``estimated_cost_usd``, so it counts
+    towards the user's daily ceiling and the loser's ``cost_usd``.
+    """
+
+    def __init__(self, providers: list[LLMProvider], hedge_after_ms: int = 0) -> None:
+        self._providers = providers
+        self._health = [ProviderHealth() for _ in providers]
+        self._hedge_after = hedge_after_ms / 1000 if hedge_after_ms > 0 else None
+        # Cache keys follow the preferred model, wherever the answer came from
+        self.model = providers[0].model
+        self.hedges = 0
+        self.hedge_cost_usd = 0.0
+        self.failovers = 0
+
+    def _order(self) -> list[int]:
+        return sorted(range(len(self._providers)), key=lambda i: self._health[i].degraded(self._hedge_after))
+
+    async def _timed(self, op: str, i: int, fn):
+        health = self._health[i]
+        start = time.monotonic()
+        try:
+            out = await fn(self._providers[i])
+        except ValueError:
+            health.record(op, time.monotonic() - start, True)
+            raise
+        except asyncio.CancelledError:
+            health.cancelled += 1
+            raise
+        except Exception as e:
+            # A rejected request says nothing about this provider's health (the other may still accept it)
+            if not _is_client_error(e):
+                health.record(op, time.monotonic() - start, False)
+            raise
+        health.record(op, time.monotonic() - start, True)
+        # Every method returns its usage second
+        health.cost_usd += out[1].get("estimated_cost_usd", 0.0) if out[1] else 0.0
+        return out
+
+    async def _call(self, op: str, label: str, fn, hedge: bool = False):
+        remaining = self._order()
+        tasks: dict[asyncio.Future, int] = {}
+
+        def launch() -> None:
+            i = remaining.pop(0)
+            tasks[asyncio.ensure_future(self._timed(op, i, fn))] = i
+
+        launch()
+        error: BaseException | None = None
+        try:
+            while True:
+                hedge_after = self._hedge_after if hedge and remaining and len(tasks) == 1 else None
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    logger.info("%s slow on %s, hedging", label, type(self._providers[tasks[next(iter(tasks))]]).__name__)
+                    launch()
+                    continue
+                for task in done:
+                    i = tasks.pop(task)
+                    error = task.exception()
+                    if error is None or isinstance(error, ValueError):
+                        self._health[i].wins += 1
+                        out = task.result()
+                        if tasks:
+                            out = await self._settle_hedges(tasks, out)
+                        return out
+                    logger.warning("%s failed on %s: %s", label, type(self._providers[i]).__name__, error)
+                if not tasks:
+                    if not remaining:
+                        raise error  # type: ignore[misc]
+                    self.failovers += 1
+                    launch()
+        finally:
+            # Only reached with tasks left when the caller itself was cancelled
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _settle_hedges(self, tasks: dict[asyncio.Future, int], out):
+        """Cancel the losing calls and add what they cost to the winner's usage."""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        usage = out[1]
+        for task, i in list(tasks.items()):
+            del tasks[task]
+            if not usage:
+                continue  # An invalid-word answer: nothing to price the loser by
+            if not task.cancelled() and task.exception() is None:
+                # Finished at the same moment; _timed already counted its real cost
+                cost = (task.result()[1] or {}).get("estimated_cost_usd", 0.0)
+            else:
+                # The prompt was billed in full and the answer is short, so the
+                # winner's token counts are a fair upper bound for the loser's
+                cost = estimate_cost(self._providers[i].model, usage["input_tokens"], usage["output_tokens"])
+                self._health[i].cost_usd += cost
+            self.hedge_cost_usd += cost
+            usage = {**usage, "estimated_cost_usd": usage["estimated_cost_usd"] + cost}
+        return (out[0], usage, *out[2:])
 
     async def translate(self, word: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[TranslationResult, dict, bool]:
-        key = f"{word.strip().lower()}|{source_lang}|{target_lang}"
+        return await self._call("translate", "translate", lambda p: p.translate(word, source_lang, target_lang), hedge=True)
+
+    async def translate_many(self, words: list[str], source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult | None], dict]:
+        return await self._call("translate_many", "batch translate", lambda p: p.translate_many(words, source_lang, target_lang))
+
+    async def explain_word(self, word: str, translation: str, source_lang: str, target_lang: str) -> tuple[str, dict, bool]:
+        return await self._call("explain", "explain", lambda p: p.explain_word(word, translation, source_lang, target_lang))
+
+    async def translate_image(self, image_base64: str, media_type: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult], dict]:
+        return await self._call(
+            "translate_image", "image translate", lambda p: p.translate_image(image_base64, media_type, source_lang, target_lang)
+        )
+
+    async def explain_word_stream(self, word: str, translation: str, source_lang: str, target_lang: str) -> AsyncIterator[str | StreamEnd]:
+        # Streams are not hedged; a provider that fails before its first delta is skipped
+        order = self._order()
+        for n, i in enumerate(order):
+            health = self._health[i]
+            start = time.monotonic()
+            started = False
+            try:
+                async for item in self._providers[i].explain_word_stream(word, translation, source_lang, target_lang):
+                    started = True
+                    if isinstance(item, StreamEnd):
+                        health.record("explain_stream", time.monotonic() - start, True)
+                        health.wins += 1
+                        health.cost_usd += item.usage.get("estimated_cost_usd", 0.0) if item.usage else 0.0
+                    yield item
+                return
+            except Exception as e:
+                health.record("explain_stream", time.monotonic() - start, False)
+                if started or n == len(order) - 1:
+                    raise
+                self.failovers += 1
+                logger.warning("explain stream failed on %s: %s", type(self._providers[i]).__name__, e)
+
+    async def start(self) -> None:
+        for provider in self._providers:
+            await provider.start()
+
+    async def close(self) -> None:
+        for provider in self._providers:
+            await provider.close()
+
+    def health(self) -> list[dict]:
+        return [entry for provider in self._providers for entry in provider.health()]
+
+    def stats(self) -> dict:
+        return {
+            "hedge_after_ms": round(self._hedge_after * 1000) if self._hedge_after else 0,
+            "hedges": self.hedges,
+            "hedge_cost_usd": round(self.hedge_cost_usd, 6),
+            "failovers": self.failovers,
+            "providers": [
+                {"provider": type(p).__name__, "model": p.model, **h.stats()}
+                for p, h in zip(self._providers, self._health)
+            ],
+        }
+
+
+class TranslateBatcher:
+    """Micro-batches translate calls into multi-word LLM requests.
+
+    ``translate`` queues a word per language pair and waits; a queue is sent
+    as one ``translate_many`` call once it holds ``max_words`` words or
+    ``window_ms`` after its first word arrived. ``translate_words`` sends a
+    known list right away. The batch usage is split evenly over its words.
+    Words the batch answer does not cover (invalid words, a dropped item,
+    a failed call) are retried one by one with ``translate``, so callers
+    see the same results and errors as without batching.
+    """
+
+    def __init__(self, inner: LLMProvider, window_ms: int, max_words: int) -> None:
+        self._inner = inner
+        self._window = window_ms / 1000
+        self._max_words = max(1, max_words)
+        self._queues: dict[tuple[str, str], list[tuple[str, asyncio.Future]]] = {}
+        self._timers: dict[tuple[str, str], asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.batched_words = 0
+        self.fallbacks = 0
+
+    async def translate(self, word: str, source_lang: str, target_lang: str) -> tuple[TranslationResult, dict | None]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pair = (source_lang, target_lang)
+        queue = self._queues.setdefault(pair, [])
+        queue.append((word, future))
+        if len(queue) >= self._max_words:
+            self._flush(pair)
+        elif pair not in self._timers:
+            self._timers[pair] = loop.call_later(self._window, self._flush, pair)
+        return await future
+
+    async def translate_words(self, words: list[str], source_lang: str, target_lang: str) -> list[tuple[TranslationResult, dict | None] | Exception]:
+        """Translate a known list now, in chunks of max_words. Errors are returned, not raised."""
+        loop = asyncio.get_running_loop()
+        entries = [(word, loop.create_future()) for word in words]
+        await asyncio.gather(*(
+            self._run(entries[i:i + self._max_words], source_lang, target_lang)
+            for i in range(0, len(entries), self._max_words)
+        ))
+        return [future.result() if future.exception() is None else future.exception() for _, future in entries]
+
+    def _flush(self, pair: tuple[str, str]) -> None:
+        timer = self._timers.pop(pair, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._queues.pop(pair, None)
+        if queue:
+            task = asyncio.ensure_future(self._run(queue, *pair))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, entries: list[tuple[str, asyncio.Future]], source_lang: str, target_lang: str) -> None:
+        waiters: dict[str, list[asyncio.Future]] = {}
+        words: list[str] = []
+        for word, future in entries:
+            key = canonical_text(word)
+            if key not in waiters:
+                waiters[key] = []
+                words.append(word)
+            waiters[key].append(future)
+
+        try:
+            if len(words) == 1:
+                results: list[TranslationResult | None] = [None]
+                usage: dict = {}
+            else:
+                results, usage = await self._inner.translate_many(words, source_lang, target_lang)
+                self.batches += 1
+                self.batched_words += len(words)
+        except LLMUnavailableError as exc:
+            # Retrying word by word would only add load to a provider that is shedding it
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        except Exception:
+            logger.warning("Batch translate of %d words failed, retrying singly", len(words), exc_info=True)
+            results, usage = [None] * len(words), {}
+        share = _split_usage(usage, len(words))
+
+        async def settle(word: str, result: TranslationResult | None) -> None:
+            futures = [f for f in waiters[canonical_text(word)] if not f.done()]
+            word_usage = share
+            if result is None:
+                if len(words) > 1:
+                    self.fallbacks += 1
+                try:
+                    result, extra, _ = await self._inner.translate(word, source_lang, target_lang)
+                except Exception as exc:
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(exc)
+                    return
+                word_usage = _add_usage(share, extra)
+            for i, future in enumerate(f for f in futures if not f.done()):
+                # Usage is charged to one waiter; duplicates get None, like a coalesced call
+                future.set_result((result, word_usage if i == 0 else None))
+
+        await asyncio.gather(*(settle(word, result) for word, result in zip(words, results)))
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": int(self._window * 1000),
+            "max_words": self._max_words,
+            "queued": sum(len(q) for q in self._queues.values()),
+            "batches": self.batches,
+            "batched_words": self.batched_words,
+            "fallbacks": self.fallbacks,
+        }
+
+
+# Lists of meanings ("1. Buddha 2. department", "над, выше") and glosses in parentheses
+_MULTI_MEANING = re.compile(r"[,;/\n(]|\d+[.)]")
+
+
+def is_symmetric(result: TranslationResult) -> bool:
+    """Whether a result is one term for one term, so it also answers the reverse direction.
+
+    Translating the target back would give the source again. A list of
+    meanings is not: the reverse prompt would give its own, different list.
+    """
+    return not any(_MULTI_MEANING.search(text) for text in (result.source_text, result.target_text))
+
+
+def reversed_result(result: TranslationResult) -> TranslationResult:
+    """The same translation seen from the reverse language pair."""
+    return TranslationResult(
+        source_text=result.target_text,
+        target_text=result.source_text,
+        example_source=result.example_target,
+        example_target=result.example_source,
+        part_of_speech=result.part_of_speech,
+    )
+
+
+class CachedLLMProvider(LLMProvider):
+    """Wraps any LLMProvider with two-tier caching for translate/explain.
+
+    L1 is the in-memory LRU; L2 (optional) is the persistent llm_cache table,
+    consulted on an L1 miss and filled behind the response. Misses are
+    coalesced: concurrent requests for the same key (or the same image)
+    share one L2 lookup and at most one call to the inner provider.
+    Translate misses that reach the provider can be micro-batched (see
+    TranslateBatcher); batching of single translates is on when
+    ``batch_window_ms`` > 0.
+
+    An optional read-only Lexicon sits between L1 and L2 for translations:
+    it answers common words from a memory-mapped file at no API cost. Its
+    answers are not copied into L1 or L2.
+
+    Image translations are cached by the SHA-256 of the uploaded bytes
+    (in-memory ImageResultCache, then L2). With an ImagePreprocessor, a miss
+    is downsized and stripped off the event loop before it is sent, and can
+    also be answered by a perceptually similar cached image.
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        l2: PersistentLLMCache | None = None,
+        batch_window_ms: int = 0,
+        batch_max_words: int = 20,
+        lexicon: Lexicon | None = None,
+        image_prep: ImagePreprocessor | None = None,
+        image_cache_size: int = 500,
+        image_phash_bits: int = 0,
+    ) -> None:
+        self._inner = inner
+        self._l2 = l2
+        self._lexicon = lexicon
+        self._image_prep = image_prep
+        self._image_cache = ImageResultCache(image_cache_size, image_phash_bits)
+        self._batcher = TranslateBatcher(inner, batch_window_ms, batch_max_words)
+        self._batch_single = batch_window_ms > 0
+        self._translate_flights = SingleFlight()
+        self._explain_flights = SingleFlight()
+        self._explain_streams = StreamFlight()
+        self._image_flights = SingleFlight()
+        self.rejected = 0
+        self.alias_writes = 0
+        self.reverse_writes = 0
+        # Paid single-word translations and their cost, for estimated_word_cost()
+        self.translated_words = 0
+        self.translated_cost = 0.0
+
+    async def start(self) -> None:
+        await self._inner.start()
+        if self._l2 is not None:
+            await self._l2.start()
+
+    async def close(self) -> None:
+        if self._l2 is not None:
+            await self._l2.close()
+        await self._inner.close()
+        if self._lexicon is not None:
+            self._lexicon.close()
+        if self._image_prep is not None:
+            self._image_prep.close()
+
+    def _translate_key(self, word: str, source_lang: str, target_lang: str) -> tuple[str, str]:
+        """Pre-filter a word and map it to its cache key.
+
+        Returns (normalized word, key). The key holds the word's
+        canonical_text, so spelling variants share an entry, and the
+        direction of the pair. Raises InvalidWordError for input rejected
+        locally or already confirmed invalid by the model.
+        """
+        try:
+            word, _ = check_input(word, source_lang, target_lang)
+        except InvalidWordError:
+            self.rejected += 1
+            raise
+        key = f"{canonical_text(word)}|{source_lang}|{target_lang}"
+        if _invalid_word_cache.get(key) is not None:
+            raise InvalidWordError()
+        return word, key
+
+    async def translate(
+        self,
+        word: str,
+        source_lang: str = "ko",
+        target_lang: str = "en",
+        usage_sink: UsageSink | None = None,
+    ) -> tuple[TranslationResult, dict, bool]:
+        """Translate through the cache tiers; ``usage_sink`` gets the usage of a call every caller abandoned."""
+        word, key = self._translate_key(word, source_lang, target_lang)
         cached = _translation_cache.get(key)
         if cached is not None:
             logger.debug("Translation cache HIT: %s", key)
             return cached, {}, True  # type: ignore[return-value]
+        entry = self._lexicon_get(key)
+        if entry is not None:
+            logger.debug("Translation lexicon HIT: %s", key)
+            return entry, {}, True
 
-        result, usage, _ = await self._inner.translate(word, source_lang, target_lang)
+        async def call():
+            if self._l2 is not None:
+                stored = await self._l2.get("translate", key)
+                if stored is not None:
+                    result = TranslationResult.model_validate_json(stored)
+                    _translation_cache.put(key, result)
+                    logger.debug("Translation L2 HIT: %s", key)
+                    return result, None
+            try:
+                if self._batch_single:
+                    result, usage = await self._batcher.translate(word, source_lang, target_lang)
+                else:
+                    result, usage, _ = await self._inner.translate(word, source_lang, target_lang)
+            except InvalidWordError:
+                _invalid_word_cache.put(key, True)
+                raise
+            self._store_translation(key, result, word)
+            self._count_word_cost(usage)
+            logger.debug("Translation cache MISS: %s (cache size: %d)", key, _translation_cache.size)
+            return result, usage
+
+        result, usage = await self._translate_flights.run(key, call, usage_sink)
+        if usage is None:
+            return result, {}, True  # type: ignore[return-value]
+        return result, usage, False  # type: ignore[return-value]
+
+    def _count_word_cost(self, usage: dict | None) -> None:
+        if usage:
+            self.translated_words += 1
+            self.translated_cost += usage.get("estimated_cost_usd", 0.0)
+
+    def estimated_word_cost(self) -> float:
+        """Average cost of translating one word so far in this process (0 before the first)."""
+        if not self.translated_words:
+            return 0.0
+        return self.translated_cost / self.translated_words
+
+    def _lexicon_get(self, key: str) -> TranslationResult | None:
+        if self._lexicon is None:
+            return None
+        stored = self._lexicon.get(key)
+        return TranslationResult.model_validate_json(stored) if stored is not None else None
+
+    def _store_translation(self, key: str, result: TranslationResult, word: str = "") -> None:
+        """Cache a result under its key, its alias and, if one-to-one, its reverse.
+
+        The alias is the canonical form of the model's cleaned-up source_text
+        ("사과요" -> "사과"), so a translation produced for one spelling also
+        serves the canonical form; only used when the input was on the
+        source side. The reverse entry (target_text in the reverse pair) is
+        only written for is_symmetric results. Neither replaces an existing
+        entry.
+        """
+        self._put_translation(key, result)
+
+        _, source_lang, target_lang = key.rsplit("|", 2)
+        if word and detect_language(word, source_lang, target_lang) == source_lang:
+            alias = f"{canonical_text(result.source_text)}|{source_lang}|{target_lang}"
+            if alias != key and alias not in _translation_cache:
+                self.alias_writes += 1
+                self._put_translation(alias, result)
+
+        if f"{target_lang}-{source_lang}" in SUPPORTED_PAIRS and is_symmetric(result):
+            reverse = f"{canonical_text(result.target_text)}|{target_lang}|{source_lang}"
+            if reverse not in _translation_cache:
+                self.reverse_writes += 1
+                self._put_translation(reverse, reversed_result(result))
+
+    def _put_translation(self, key: str, result: TranslationResult) -> None:
         _translation_cache.put(key, result)
-        logger.debug("Translation cache MISS: %s (cache size: %d)", key, _translation_cache.size)
-        return result, usage, False
-
-    async def explain_word(self, word: str, translation: str, source_lang: str, target_lang: str) -> tuple[str, dict, bool]:
-        key = f"{word.strip().lower()}|{translation.strip().lower()}|{source_lang}|{target_lang}"
+        if self._l2 is not None:
+            self._l2.put("translate", key, result.model_dump_json())
+
+    async def translate_batch(self, words: list[str], source_lang: str = "ko", target_lang: str = "en") -> list[tuple[TranslationResult, dict, bool] | Exception]:
+        """Translate several words, sending all cache misses in batched calls.
+
+        Returns one entry per word, aligned with ``words``: (result, usage,
+        cached) or the exception that word failed with.
+        """
+        out: list[tuple[TranslationResult, dict, bool] | Exception | None] = [None] * len(words)
+        keys: list[str] = [""] * len(words)
+        normalized: list[str] = [""] * len(words)
+        misses: list[int] = []
+        for i, word in enumerate(words):
+            try:
+                normalized[i], keys[i] = self._translate_key(word, source_lang, target_lang)
+            except InvalidWordError as e:
+                out[i] = e
+                continue
+            cached = _translation_cache.get(keys[i])
+            if cached is None:
+                cached = self._lexicon_get(keys[i])
+            if cached is not None:
+                out[i] = (cached, {}, True)  # type: ignore[assignment]
+            elif self._l2 is not None and (stored := await self._l2.get("translate", keys[i])) is not None:
+                result = TranslationResult.model_validate_json(stored)
+                _translation_cache.put(keys[i], result)
+                out[i] = (result, {}, True)
+            else:
+                misses.append(i)
+
+        if misses:
+            answers = await self._batcher.translate_words(
+                [normalized[i] for i in misses], source_lang, target_lang
+            )
+            for i, answer in zip(misses, answers):
+                if isinstance(answer, InvalidWordError):
+                    _invalid_word_cache.put(keys[i], True)
+                if isinstance(answer, Exception):
+                    out[i] = answer
+                    continue
+                result, usage = answer
+                self._store_translation(keys[i], result, normalized[i])
+                self._count_word_cost(usage)
+                out[i] = (result, usage or {}, usage is None)
+        return out  # type: ignore[return-value]
+
+    async def explain_word(
+        self,
+        word: str,
+        translation: str,
+        source_lang: str,
+        target_lang: str,
+        usage_sink: UsageSink | None = None,
+    ) -> tuple[str, dict, bool]:
+        """Explain through the cache tiers; ``usage_sink`` gets the usage of a call every caller abandoned."""
+        key = f"{canonical_text(word)}|{canonical_text(translation)}|{source_lang}|{target_lang}"
         cached = _explanation_cache.get(key)
         if cached is not None:
             logger.debug("Explanation cache HIT: %s", key)
             return cached, {}, True  # type: ignore[return-value]
+        if key in self._explain_streams:
+            # A streaming call for this word is already running; wait for its text
+            async for item in self._explain_streams.subscribe(
+                key, lambda: self._explain_upstream(key, word, translation, source_lang, target_lang), usage_sink
+            ):
+                if isinstance(item, StreamEnd):
+                    return item.text, item.usage, item.was_cached
+
+        async def call():
+            if self._l2 is not None:
+                stored = await self._l2.get("explain", key)
+                if stored is not None:
+                    _explanation_cache.put(key, stored)
+                    logger.debug("Explanation L2 HIT: %s", key)
+                    return stored, None
+            result, usage, _ = await self._inner.explain_word(word, translation, source_lang, target_lang)
+            _explanation_cache.put(key, result)
+            if self._l2 is not None:
+                self._l2.put("explain", key, result)
+            logger.debug("Explanation cache MISS: %s (cache size: %d)", key, _explanation_cache.size)
+            return result, usage
+
+        result, usage = await self._explain_flights.run(key, call, usage_sink)
+        if usage is None:
+            return result, {}, True  # type: ignore[return-value]
+        return result, usage, False  # type: ignore[return-value]
+
+    async def explain_word_stream(
+        self,
+        word: str,
+        translation: str,
+        source_lang: str,
+        target_lang: str,
+        usage_sink: UsageSink | None = None,
+    ) -> AsyncIterator[str | StreamEnd]:
+        """Stream an explanation, serving cached answers whole.
+
+        Concurrent streams for the same explanation share one upstream call
+        (see StreamFlight), and a stream started while a non-streaming call
+        runs waits for that call. The upstream always runs to completion and
+        its full text goes into both cache tiers; if every client left
+        before the end, its usage is passed to ``usage_sink``.
+        """
+        key = f"{canonical_text(word)}|{canonical_text(translation)}|{source_lang}|{target_lang}"
+        cached = _explanation_cache.get(key)
+        if cached is None and self._l2 is not None:
+            cached = await self._l2.get("explain", key)
+            if cached is not None:
+                _explanation_cache.put(key, cached)
+        if cached is None and key in self._explain_flights:
+            # A non-streaming call for this word is already running; share it
+            text, usage, was_cached = await self.explain_word(word, translation, source_lang, target_lang, usage_sink)
+            yield text
+            yield StreamEnd(text, usage, was_cached)
+            return
+        if cached is not None:
+            logger.debug("Explanation stream cache HIT: %s", key)
+            yield cached  # type: ignore[misc]
+            yield StreamEnd(cached, {}, True)  # type: ignore[arg-type]
+            return
+
+        async for item in self._explain_streams.subscribe(
+            key, lambda: self._explain_upstream(key, word, translation, source_lang, target_lang), usage_sink
+        ):
+            yield item
 
-        result, usage, _ = await self._inner.explain_word(word, translation, source_lang, target_lang)
-        _explanation_cache.put(key, result)
-        logger.debug("Explanation cache MISS: %s (cache size: %d)", key, _explanation_cache.size)
-        return result, usage, False
+    async def _explain_upstream(self, key: str, word: str, translation: str, source_lang: str, target_lang: str) -> AsyncIterator[str | StreamEnd]:
+        async for item in self._inner.explain_word_stream(word, translation, source_lang, target_lang):
+            if isinstance(item, StreamEnd):
+                _explanation_cache.put(key, item.text)
+                if self._l2 is not None:
+                    self._l2.put("explain", key, item.text)
+                logger.debug("Explanation stream MISS: %s (cache size: %d)", key, _explanation_cache.size)
+            yield item
 
     async def translate_image(self, image_base64: str, media_type: str, source_lang: str = "ko", target_lang: str = "en") -> tuple[list[TranslationResult], dict]:
-        # Image translations are not cached (unique images)
-        return await self._inner.translate_image(image_base64, media_type, source_lang, target_lang)
+        return await self.translate_image_bytes(base64.b64decode(image_base64), media_type, source_lang, target_lang)
+
+    async def translate_image_bytes(
+        self,
+        data: bytes,
+        media_type: str,
+        source_lang: str = "ko",
+        target_lang: str = "en",
+        usage_sink: UsageSink | None = None,
+    ) -> tuple[list[TranslationResult], dict]:
+        """Translate an uploaded image, served from cache when the same image was seen before.
+
+        Lookup order: exact bytes in memory, exact bytes in L2, then (after
+        preprocessing) a perceptually similar image in memory. Identical
+        uploads in flight at the same time share one call. Cached and
+        coalesced answers come with empty usage; ``usage_sink`` gets the
+        usage of a call every caller abandoned.
+        """
+        digest = await self._image_prep.hash(data) if self._image_prep is not None else content_hash(data)
+        key = f"{digest}|{source_lang}|{target_lang}"
+        cached = self._image_cache.get(key)
+        if cached is not None:
+            logger.debug("Image cache HIT: %s", key)
+            return cached, {}  # type: ignore[return-value]
+
+        async def call():
+            if self._l2 is not None:
+                stored = await self._l2.get("translate_image", key)
+                if stored is not None:
+                    results = [TranslationResult.model_validate(item) for item in json.loads(stored)]
+                    self._image_cache.put(key, None, results)
+                    return results, None
+
+            phash = None
+            if self._image_prep is not None:
+                prepared = await self._image_prep.prepare(data)
+                similar = self._image_cache.get_similar(prepared.phash, f"|{source_lang}|{target_lang}")
+                if similar is not None:
+                    logger.debug("Image cache similar HIT: %s", key)
+                    self._image_cache.put(key, prepared.phash, similar)
+                    return similar, None
+                phash, image, image_type = prepared.phash, prepared.data, prepared.media_type
+            else:
+                image, image_type = data, media_type
+
+            image_base64 = base64.b64encode(image).decode()
+            results, usage = await self._inner.translate_image(image_base64, image_type, source_lang, target_lang)
+            self._image_cache.put(key, phash, results)
+            if self._l2 is not None:
+                self._l2.put("translate_image", key, json.dumps([r.model_dump() for r in results]))
+            return results, usage
+
+        results, usage = await self._image_flights.run(key, call, usage_sink)
+        return results, usage or {}  # type: ignore[return-value]
+
+    def health(self) -> list[dict]:
+        return self._inner.health()
+
+    def stats(self) -> dict:
+        return {
+            "l1": {
+                "translation": {
+                    "size": _translation_cache.size,
+                    "hits": _translation_cache.hits,
+                    "misses": _translation_cache.misses,
+                    "alias_writes": self.alias_writes,
+                    "reverse_writes": self.reverse_writes,
+                    "estimated_word_cost_usd": round(self.estimated_word_cost(), 8),
+                },
+                "explanation": {
+                    "size": _explanation_cache.size,
+                    "hits": _explanation_cache.hits,
+                    "misses": _explanation_cache.misses,
+                },
+            },
+            "invalid_words": {
+                "rejected_locally": self.rejected,
+                **_invalid_word_cache.stats(),
+            },
+            "lexicon": self._lexicon.stats() if self._lexicon is not None else None,
+            "images": {
+                **self._image_cache.stats(),
+                "preprocessing": self._image_prep.stats() if self._image_prep is not None else None,
+            },
+            "l2": self._l2.stats() if self._l2 is not None else None,
+            "batching": self._batcher.stats(),
+            "failover": self._inner.stats() if isinstance(self._inner, FailoverLLMProvider) else None,
+            "coalescing": {
+                "translate": self._translate_flights.stats(),
+                "explain": self._explain_flights.stats(),
+                "explain_stream": self._explain_streams.stats(),
+                "translate_image": self._image_flights.stats(),
+            },
+        }
+
+
+# Model used for a fallback provider when LLM_FALLBACK_MODEL is not set
+DEFAULT_MODELS = {
+    "anthropic": "claude-haiku-4-5-20251001",
+    "openai": "gpt-4.1-mini",
+}
 
 
-def create_llm_provider() -> LLMProvider:
-    """Factory: reads LLM_PROVIDER from config, returns a cached provider."""
-    provider = config.LLM_PROVIDER.lower()
+def _make_provider(name: str, model: str) -> LLMProvider:
+    provider = name.lower()
     if provider == "anthropic":
-        inner = AnthropicProvider()
-    elif provider == "openai":
-        inner = OpenAIProvider()
+        return AnthropicProvider(model)
+    if provider == "openai":
+        return OpenAIProvider(model)
+    raise ValueError(f"Unknown LLM provider: {provider!r}. Use 'anthropic' or 'openai'.")
+
+
+def create_llm_provider(db: Database | None = None) -> CachedLLMProvider:
+    """Factory: reads LLM_PROVIDER from config, returns a cached provider.
+
+    With LLM_FALLBACK_PROVIDER set, calls fail over (and are hedged) between
+    the two providers; see FailoverLLMProvider.
+
+    With a database (and LLM_CACHE_TTL_DAYS > 0), answers are also persisted
+    in the llm_cache table as a second cache tier.
+
+    If a lexicon file exists at LEXICON_PATH (see scripts/build_lexicon.py),
+    translations found in it skip L2 and the provider.
+
+    With Pillow installed, uploaded images are downsized to IMAGE_MAX_SIDE
+    and re-encoded before they are sent to the model.
+    """
+    inner: LLMProvider = _make_provider(config.LLM_PROVIDER, config.LLM_MODEL)
+    if config.LLM_FALLBACK_PROVIDER:
+        fallback_model = config.LLM_FALLBACK_MODEL or DEFAULT_MODELS.get(config.LLM_FALLBACK_PROVIDER.lower(), "")
+        fallback = _make_provider(config.LLM_FALLBACK_PROVIDER, fallback_model)
+        inner = FailoverLLMProvider([inner, fallback], hedge_after_ms=config.LLM_HEDGE_AFTER_MS)
+
+    l2 = None
+    if db is not None and config.LLM_CACHE_TTL_DAYS > 0:
+        l2 = PersistentLLMCache(
+            db,
+            model=inner.model,
+            prompt_versions=PROMPT_VERSIONS,
+            ttl_seconds=config.LLM_CACHE_TTL_DAYS * 86400,
+            max_rows=config.LLM_CACHE_MAX_ROWS,
+        )
+
+    image_prep = None
+    if preprocessing_available():
+        image_prep = ImagePreprocessor(config.IMAGE_MAX_SIDE, config.IMAGE_JPEG_QUALITY, config.IMAGE_PREP_WORKERS)
     else:
-        raise ValueError(f"Unknown LLM provider: {provider!r}. Use 'anthropic' or 'openai'.")
-    return CachedLLMProvider(inner)
+        logger.warning("Pillow is not installed; images are sent to the model as uploaded")
+    return CachedLLMProvider(
+        inner,
+        l2,
+        batch_window_ms=config.LLM_TRANSLATE_BATCH_WINDOW_MS,
+        batch_max_words=config.LLM_TRANSLATE_BATCH_MAX_WORDS,
+        lexicon=Lexicon.open(config.LEXICON_PATH) if config.LEXICON_PATH else None,
+        image_prep=image_prep,
+        image_cache_size=config.IMAGE_CACHE_SIZE,
+        image_phash_bits=config.IMAGE_PHASH_MAX_BITS,
+    )
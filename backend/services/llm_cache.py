@@ -0,0 +1,171 @@
+"""Persistent second-tier cache for LLM answers, backed by the llm_cache table."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+
+from backend.db.connection import Database
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 1.0  # seconds between write-behind flushes
+FLUSH_MAX_BATCH = 100
+EVICT_INTERVAL = 3600  # seconds between TTL/size eviction passes
+
+
+def compute_llm_cache_hash(kind: str, input_key: str, model: str, prompt_version: int) -> str:
+    """Compute SHA-256 hash for the llm_cache key."""
+    return hashlib.sha256(f"{kind}|{input_key}|{model}|{prompt_version}".encode()).hexdigest()
+
+
+class PersistentLLMCache:
+    """Durable L2 under the in-memory LRUs, so paid answers survive restarts.
+
+    Entries are keyed by kind ("translate"/"explain"/"translate_image"),
+    the same normalized input key as the LRU, the model and that kind's
+    prompt version (``prompt_versions``), so changing either of the latter
+    simply stops matching old rows of that kind. Reads go through
+    the read pool. Writes are queued and flushed in batches by a background
+    task (write-behind), so a cache fill never delays the response. Rows
+    older than ``ttl_seconds`` are ignored and periodically deleted, and the
+    table is trimmed to the newest ``max_rows``.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        model: str,
+        prompt_versions: dict[str, int],
+        ttl_seconds: int,
+        max_rows: int,
+    ) -> None:
+        self._db = db
+        self._model = model
+        self._prompt_versions = prompt_versions
+        self._ttl_seconds = ttl_seconds
+        self._max_rows = max_rows
+        self._pending: dict[str, tuple[str, str, str]] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+
+    def _hash(self, kind: str, input_key: str) -> str:
+        return compute_llm_cache_hash(kind, input_key, self._model, self._prompt_versions[kind])
+
+    async def get(self, kind: str, input_key: str) -> str | None:
+        key_hash = self._hash(kind, input_key)
+        pending = self._pending.get(key_hash)
+        if pending is not None:
+            self.hits += 1
+            return pending[2]
+
+        async with self._db.read() as conn:
+            cursor = await conn.execute(
+                "SELECT value FROM llm_cache WHERE key_hash = ? AND created_at >= datetime('now', ?)",
+                (key_hash, f"-{self._ttl_seconds} seconds"),
+            )
+            row = await cursor.fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row["value"]
+
+    def put(self, kind: str, input_key: str, value: str) -> None:
+        """Queue an entry for the next flush. Never blocks."""
+        if self._closed:
+            return
+        self._pending[self._hash(kind, input_key)] = (kind, input_key, value)
+        if len(self._pending) >= FLUSH_MAX_BATCH:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        rows = [
+            (key_hash, kind, input_key, self._model, self._prompt_versions[kind], value)
+            for key_hash, (kind, input_key, value) in batch.items()
+        ]
+        try:
+            async with self._db.transaction() as conn:
+                await conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO llm_cache (key_hash, kind, input_key, model, prompt_version, value)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+        except Exception:
+            logger.exception("Failed to persist %d LLM cache entries", len(rows))
+            return
+        self.writes += len(rows)
+
+    async def evict(self) -> int:
+        """Delete expired rows, then the oldest beyond max_rows. Returns rows deleted."""
+        async with self._db.transaction() as conn:
+            cursor = await conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < datetime('now', ?)",
+                (f"-{self._ttl_seconds} seconds",),
+            )
+            deleted = cursor.rowcount
+            # ids increase with every INSERT OR REPLACE, so low ids are the oldest writes
+            cursor = await conn.execute(
+                """
+                DELETE FROM llm_cache WHERE id <= (
+                    SELECT id FROM llm_cache ORDER BY id DESC LIMIT 1 OFFSET ?
+                )
+                """,
+                (self._max_rows,),
+            )
+            deleted += cursor.rowcount
+        self.evicted += deleted
+        if deleted:
+            logger.info("Evicted %d LLM cache rows", deleted)
+        return deleted
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.evict()
+            self._task = asyncio.create_task(self._run(), name="llm-cache-writer")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_evict = loop.time() + EVICT_INTERVAL
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+            if loop.time() >= next_evict:
+                next_evict = loop.time() + EVICT_INTERVAL
+                try:
+                    await self.evict()
+                except Exception:
+                    logger.exception("LLM cache eviction failed")
+
+    async def close(self) -> None:
+        """Stop the writer and flush whatever is still queued."""
+        self._closed = True
+        if self._task is not None:
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evicted": self.evicted,
+            "pending": len(self._pending),
+        }
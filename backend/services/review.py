@@ -0,0 +1,118 @@
+"""Review engine: apply one SRS review as a single transaction."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from backend.db import models
+from backend.db.connection import Database
+from backend.services.srs import calculate_srs
+
+_SELECT_CARD = """
+    SELECT ease_factor, interval_days, repetitions, language_pair
+    FROM flashcards
+    WHERE id = ? AND user_id = ?
+"""
+
+_UPDATE_CARD = """
+    UPDATE flashcards
+    SET ease_factor = ?, interval_days = ?, repetitions = ?, next_review = ?
+    WHERE id = ?
+"""
+
+_INSERT_REVIEW = """
+    INSERT INTO review_history (user_id, card_id, study_mode, was_correct, quality, response_time_ms)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Same rules as models.update_streak, evaluated in SQL against the old row.
+# The WHERE clause makes this a no-op on the second and later reviews of the day.
+_UPDATE_STREAK = """
+    UPDATE users
+    SET current_streak = CASE
+            WHEN last_practice_date = date(:today, '-1 day') THEN COALESCE(current_streak, 0) + 1
+            ELSE 1
+        END,
+        longest_streak = MAX(
+            COALESCE(longest_streak, 0),
+            CASE
+                WHEN last_practice_date = date(:today, '-1 day') THEN COALESCE(current_streak, 0) + 1
+                ELSE 1
+            END
+        ),
+        last_practice_date = :today,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = :user_id AND (last_practice_date IS NULL OR last_practice_date != :today)
+    RETURNING current_streak, longest_streak
+"""
+
+
+@dataclass
+class ReviewOutcome:
+    """Result of applying a review to a card."""
+
+    next_review: str
+    interval_days: int
+    language_pair: str
+    remaining_due: int
+    streak_updated: bool
+
+
+async def apply_review(
+    db: Database,
+    user_id: int,
+    card_id: int,
+    quality: int,
+    study_mode: str = "flip",
+    was_correct: bool | None = None,
+    response_time_ms: int | None = None,
+) -> ReviewOutcome | None:
+    """Apply an SM-2 review, log it and bump the streak in one transaction.
+
+    Runs a fixed handful of statements (card read, card update, history
+    insert, streak update, due counters read) and one group commit. Returns
+    None if the card does not exist or belongs to another user; nothing is
+    written then.
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    async with db.transaction() as conn:
+        cursor = await conn.execute(_SELECT_CARD, (card_id, user_id))
+        card = await cursor.fetchone()
+        if not card:
+            return None
+
+        result = calculate_srs(
+            quality=quality,
+            current_ease=card["ease_factor"],
+            current_interval=card["interval_days"],
+            current_reps=card["repetitions"],
+        )
+        next_review = result.next_review.strftime("%Y-%m-%d %H:%M:%S")
+
+        await conn.execute(
+            _UPDATE_CARD,
+            (result.ease_factor, result.interval_days, result.repetitions, next_review, card_id),
+        )
+        await conn.execute(
+            _INSERT_REVIEW,
+            (user_id, card_id, study_mode,
+             int(was_correct) if was_correct is not None else None,
+             quality, response_time_ms),
+        )
+        streak_rows = await conn.execute_fetchall(_UPDATE_STREAK, {"today": today, "user_id": user_id})
+        streak_updated = bool(streak_rows)
+
+        # card_counters already reflect the update above (maintained by triggers)
+        counts = await models.get_card_counts(conn, user_id, language_pair=card["language_pair"])
+        remaining_due = counts["due"]
+
+    models.invalidate_user_stats(user_id)
+    return ReviewOutcome(
+        next_review=next_review,
+        interval_days=result.interval_days,
+        language_pair=card["language_pair"],
+        remaining_due=remaining_due,
+        streak_updated=streak_updated,
+    )
@@ -14,11 +14,13 @@ import type {
   Deck,
   AdminGlobalStats,
   AdminUserStats,
+  ImageTranslationJob,
   ImageTranslationResponse,
   BatchCreateResult,
 } from './types'
 
 const API_BASE = import.meta.env.VITE_API_URL || ''
+const IMAGE_JOB_POLL_MS = 1000
 
 export class ApiError extends Error {
   status: number
@@ -70,6 +72,50 @@ async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
   return res.json()
 }
 
+// Reads a Server-Sent Events stream of explanation deltas; resolves with the full text
+async function streamExplanation(path: string, body: object | undefined, onDelta: (text: string) => void): Promise<string> {
+  const headers: Record<string, string> = { 'Content-Type': 'application/json' }
+  const initData = WebApp.initData
+  if (initData) {
+    headers['Authorization'] = `tma ${initData}`
+  }
+
+  const res = await fetch(`${API_BASE}${path}`, {
+    method: 'POST',
+    headers,
+    body: body ? JSON.stringify(body) : undefined,
+  })
+  if (!res.ok || !res.body) {
+    const error = await res.json().catch(() => ({ detail: 'Request failed' }))
+    const message = error.detail || `HTTP ${res.status}`
+    if (res.status === 429) {
+      const retryAfter = res.headers.get('Retry-After')
+      throw new ApiError(429, message, retryAfter ? parseInt(retryAfter, 10) : null)
+    }
+    throw new ApiError(res.status, message)
+  }
+
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let boundary: number
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      const event = raw.match(/^event: (.*)$/m)?.[1]
+      const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}')
+      if (event === 'delta') onDelta(data.text)
+      else if (event === 'done') return data.explanation
+      else if (event === 'error') throw new ApiError(500, data.detail || 'Explanation failed')
+    }
+  }
+  throw new ApiError(500, 'Explanation stream ended early')
+}
+
 // Cards API
 export const api = {
   translateWord: (word: string, languagePair: string = 'ko-en') => {
@@ -128,6 +174,19 @@ export const api = {
     })
   },
 
+  streamExplanation: (cardId: number, onDelta: (text: string) => void) =>
+    streamExplanation(`/api/cards/${cardId}/explanation/stream`, undefined, onDelta),
+
+  streamExplainWord: (source_text: string, target_text: string, language_pair: string, onDelta: (text: string) => void) => {
+    if (source_text.trim().length > 100) throw new Error('Source text too long (max 100 characters)')
+    if (target_text.trim().length > 200) throw new Error('Target text too long (max 200 characters)')
+    return streamExplanation(
+      '/api/cards/explain/stream',
+      { source_text: source_text.trim(), target_text: target_text.trim(), language_pair },
+      onDelta,
+    )
+  },
+
   translateImage: async (image: File, languagePair: string = 'ko-en'): Promise<ImageTranslationResponse> => {
     const formData = new FormData()
     formData.append('image', image)
@@ -139,7 +198,7 @@ export const api = {
       headers['Authorization'] = `tma ${initData}`
     }
     // Do NOT set Content-Type — browser sets it with boundary for multipart/form-data
-    const res = await fetch(`${API_BASE}/api/cards/translate-image`, {
+    const res = await fetch(`${API_BASE}/api/cards/translate-image/jobs`, {
       method: 'POST',
       headers,
       body: formData,
@@ -148,7 +207,23 @@ export const api = {
       const error = await res.json().catch(() => ({ detail: 'Request failed' }))
       throw new Error(error.detail || `HTTP ${res.status}`)
     }
-    return res.json()
+
+    // Poll the job with short requests rather than holding one open for the whole AI call
+    let job: ImageTranslationJob = await res.json()
+    while (job.status === 'queued' || job.status === 'running') {
+      await new Promise((resolve) => setTimeout(resolve, IMAGE_JOB_POLL_MS))
+      try {
+        job = await request<ImageTranslationJob>(`/api/cards/translate-image/jobs/${job.job_id}`)
+      } catch (e) {
+        // A dropped connection is retried on the next tick; the job keeps running on the server
+        if (e instanceof ApiError) throw e
+      }
+    }
+    if (job.status === 'failed') {
+      const error = job.error ?? { status_code: 500, detail: 'Image translation failed' }
+      throw new ApiError(error.status_code, error.detail, error.retry_after ?? null)
+    }
+    return { translations: job.translations ?? [], count: job.count ?? 0 }
   },
 
   createCardsBatch: (cards: Array<{ source_text: string; target_text: string; example_source?: string; example_target?: string; part_of_speech?: string | null; language_pair?: string }>, deckId?: number) =>
@@ -67,14 +67,17 @@ export default function ExplainButton({ cardId, translationData }: ExplainButton
     setState('loading')
     setError('')
     try {
-      let explanationText: string
-      if (translationData) {
-        const result = await api.explainWord(translationData.source_text, translationData.target_text, translationData.language_pair)
-        explanationText = result.explanation
-      } else {
-        const result = await api.generateExplanation(cardId!)
-        explanationText = result.explanation
+      // Show the text as it streams in; the final event carries the cleaned-up version
+      let streamed = ''
+      const onDelta = (text: string) => {
+        streamed += text
+        setExplanation(streamed)
       }
+      setExplanation('')
+      setVisible(true)
+      const explanationText = translationData
+        ? await api.streamExplainWord(translationData.source_text, translationData.target_text, translationData.language_pair, onDelta)
+        : await api.streamExplanation(cardId!, onDelta)
       setExplanation(explanationText)
       setState('loaded')
       setVisible(true)
@@ -198,7 +201,7 @@ export default function ExplainButton({ cardId, translationData }: ExplainButton
         </div>
       )}
 
-      {state === 'loaded' && visible && (
+      {(state === 'loaded' || (state === 'loading' && explanation)) && visible && (
         <div style={{
           marginTop: '10px',
           backgroundColor: 'var(--tg-secondary-bg-color)',
@@ -45,6 +45,12 @@ export interface ImageTranslationResponse {
   count: number
 }
 
+export interface ImageTranslationJob extends Partial<ImageTranslationResponse> {
+  job_id: string
+  status: 'queued' | 'running' | 'done' | 'failed'
+  error?: { status_code: number; detail: string; retry_after?: number }
+}
+
 export interface BatchCreateResult {
   created: number
   duplicates: number
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Replay logged translate inputs and compare cache hit rates per key scheme.
+
+Usage:
+    python scripts/bench_cache_keys.py [--db database/flashcards.db] [--input words.tsv] [--cache-size 5000]
+
+Inputs come from the flashcards table (source_text in creation order, as
+typed or corrected when the card was saved) and/or from --input, a file
+with one `word` or `language_pair<TAB>word` per line (e.g. extracted from
+request logs). Each input is replayed through an LRU of --cache-size
+entries under two key schemes:
+
+    legacy     word.strip().lower()|src|tgt
+    canonical  canonical_text(word)|src|tgt (current)
+
+Inputs the local pre-filter rejects never reach the cache and are counted
+separately. Alias and reverse-pair entries depend on live answers and are
+not simulated, so the canonical figure is a lower bound.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from collections import OrderedDict
+
+# Add project root to path so we can import backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import config
+from backend.db.canonical import canonical_text
+from backend.services.lang_detect import InvalidWordError, check_input
+
+
+def load_inputs(db_path: str | None, input_path: str | None) -> list[tuple[str, str]]:
+    inputs: list[tuple[str, str]] = []
+    if db_path:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        inputs += conn.execute(
+            "SELECT language_pair, source_text FROM flashcards ORDER BY created_at, id"
+        ).fetchall()
+        conn.close()
+    if input_path:
+        with open(input_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line:
+                    continue
+                pair, _, word = line.partition("\t")
+                inputs.append((pair, word) if word else ("ko-en", pair))
+    return inputs
+
+
+def legacy_key(word: str, pair: str) -> str:
+    source_lang, target_lang = pair.split("-", 1)
+    return f"{word.strip().lower()}|{source_lang}|{target_lang}"
+
+
+def canonical_key(word: str, pair: str) -> str:
+    source_lang, target_lang = pair.split("-", 1)
+    return f"{canonical_text(word)}|{source_lang}|{target_lang}"
+
+
+def replay(inputs: list[tuple[str, str]], key_fn, cache_size: int) -> tuple[int, int]:
+    """Returns (hits, distinct keys)."""
+    cache: OrderedDict[str, None] = OrderedDict()
+    seen: set[str] = set()
+    hits = 0
+    for pair, word in inputs:
+        key = key_fn(word, pair)
+        seen.add(key)
+        if key in cache:
+            cache.move_to_end(key)
+            hits += 1
+            continue
+        if len(cache) >= cache_size:
+            cache.popitem(last=False)
+        cache[key] = None
+    return hits, len(seen)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=config.DATABASE_PATH, help="database to read flashcards from ('' to skip)")
+    parser.add_argument("--input", help="extra inputs: `word` or `language_pair<TAB>word` per line")
+    parser.add_argument("--cache-size", type=int, default=config.TRANSLATION_CACHE_SIZE)
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.db or None, args.input)
+    accepted = []
+    for pair, word in inputs:
+        try:
+            check_input(word, *pair.split("-", 1))
+        except InvalidWordError:
+            continue
+        accepted.append((pair, word))
+    if not accepted:
+        sys.exit("No inputs to replay")
+
+    print(f"inputs: {len(inputs)}  rejected by pre-filter: {len(inputs) - len(accepted)}  cache size: {args.cache_size}")
+    print(f"{'scheme':>10} | {'distinct':>8} {'hits':>7} {'hit rate':>8} {'gain':>7}")
+    baseline = None
+    for name, key_fn in (("legacy", legacy_key), ("canonical", canonical_key)):
+        hits, distinct = replay(accepted, key_fn, args.cache_size)
+        rate = hits / len(accepted)
+        if baseline is None:
+            baseline = rate
+        print(f"{name:>10} | {distinct:8d} {hits:7d} {rate:8.2%} {(rate - baseline) * 100:+6.2f}pp")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark due-card sampling as the due backlog grows.
+
+Usage:
+    python scripts/bench_due_sampling.py [--sizes 100,1000,10000,100000] [--runs 50]
+
+Builds a throwaway database per backlog size with every card already due,
+then times models.get_due_flashcards (bounded index window + shuffle)
+against the previous ORDER BY RANDOM() query. Latencies are per call, in ms.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to path so we can import backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.db import models
+from backend.db.connection import close_db, init_db
+
+USER_ID = 1
+LANGUAGE_PAIR = "ko-en"
+LIMIT = 20
+
+LEGACY_QUERY = """
+    SELECT * FROM flashcards
+    WHERE user_id = ? AND next_review <= datetime('now') AND language_pair = ?
+    ORDER BY RANDOM()
+    LIMIT ?
+"""
+
+
+async def _seed(db, size: int) -> None:
+    deck = await models.get_or_create_default_deck(db, USER_ID, LANGUAGE_PAIR)
+    rows = [
+        (USER_ID, f"word{i}", f"meaning{i}", LANGUAGE_PAIR, deck["id"], f"-{i % 1000} minutes")
+        for i in range(size)
+    ]
+    await db.writer.executemany(
+        """
+        INSERT INTO flashcards (user_id, source_text, target_text, language_pair, deck_id, next_review)
+        VALUES (?, ?, ?, ?, ?, datetime('now', '-1 day', ?))
+        """,
+        rows,
+    )
+    await db.writer.commit()
+
+
+async def _time(fn, runs: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+async def bench(size: int, runs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = await init_db(os.path.join(tmp, "bench.db"), read_pool_size=1)
+        await _seed(db, size)
+
+        async def sampled():
+            await models.get_due_flashcards(db, USER_ID, LIMIT, language_pair=LANGUAGE_PAIR)
+
+        async def legacy():
+            async with db.read() as conn:
+                cursor = await conn.execute(LEGACY_QUERY, (USER_ID, LANGUAGE_PAIR, LIMIT))
+                await cursor.fetchall()
+
+        new_p50, new_p95 = await _time(sampled, runs)
+        old_p50, old_p95 = await _time(legacy, runs)
+        print(f"{size:>8} | {new_p50:8.2f} {new_p95:8.2f} | {old_p50:8.2f} {old_p95:8.2f}")
+        await close_db(db)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000,100000")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'due':>8} | {'window p50':>8} {'p95':>8} | {'random p50':>8} {'p95':>8}  (ms)")
+    for size in (int(s) for s in args.sizes.split(",")):
+        await bench(size, args.runs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Benchmark the rate limiter's _check at high key counts.
+
+Usage:
+    python scripts/bench_rate_limit.py [--keys 1000,100000,1000000] [--calls 200000] [--limit 200]
+
+For each key count, pre-fills the limiter with that many (user, group) keys,
+then times random checks against the sliding-window counter and against the
+previous timestamp-list implementation. Reports ns per check and the traced
+memory held by the limiter state.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Add project root to path so we can import backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.rate_limit import WINDOW_SECONDS, SlidingWindowLimiter
+
+GROUP = "tts"
+
+
+class LegacyLimiter:
+    """The previous limiter: one timestamp list per key, rebuilt on each check."""
+
+    def __init__(self) -> None:
+        self._windows: dict[tuple[int, str], list[float]] = {}
+
+    def check(self, key: tuple[int, str], limit: int, now: float) -> int | None:
+        cutoff = now - WINDOW_SECONDS
+        timestamps = [t for t in self._windows.get(key, []) if t > cutoff]
+        self._windows[key] = timestamps
+        if len(timestamps) >= limit:
+            return max(int(timestamps[0] + WINDOW_SECONDS - now) + 1, 1)
+        timestamps.append(now)
+        return None
+
+
+def bench(limiter, keys: int, calls: int, limit: int, hits_per_key: int) -> tuple[float, float]:
+    tracemalloc.start()
+    now = 0.0
+    for user_id in range(keys):
+        for _ in range(hits_per_key):
+            limiter.check((user_id, GROUP), limit, now)
+            now += 1e-6
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    rng = random.Random(0)
+    targets = [(rng.randrange(keys), GROUP) for _ in range(calls)]
+    start = time.perf_counter()
+    for key in targets:
+        limiter.check(key, limit, now)
+        now += 1e-6
+    ns_per_check = (time.perf_counter() - start) / calls * 1e9
+    return ns_per_check, memory_mb
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", default="1000,100000,1000000")
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--hits-per-key", type=int, default=20, help="hits recorded per key before timing")
+    args = parser.parse_args()
+
+    print(f"{'keys':>8} | {'counter ns':>10} {'MB':>7} | {'list ns':>10} {'MB':>7}")
+    for keys in (int(k) for k in args.keys.split(",")):
+        new_ns, new_mb = bench(
+            SlidingWindowLimiter(WINDOW_SECONDS, max_keys=keys), keys, args.calls, args.limit, args.hits_per_key,
+        )
+        old_ns, old_mb = bench(LegacyLimiter(), keys, args.calls, args.limit, args.hits_per_key)
+        print(f"{keys:>8} | {new_ns:10.0f} {new_mb:7.1f} | {old_ns:10.0f} {old_mb:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
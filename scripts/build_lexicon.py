@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Build the memory-mapped translation lexicon from saved cards and cached answers.
+
+Usage:
+    python scripts/build_lexicon.py [--db database/flashcards.db] [--jsonl export.jsonl] [--min-count 2] [--max-entries 50000] [--output database/lexicon.bin]
+
+Sources, each counted as votes for a (word, pair) key:
+  - llm_cache translate rows (current model and prompt not required): one vote
+  - --jsonl: exported TranslationResult objects, one per line, with
+    "source_lang" and "target_lang" and an optional "count" (default 1)
+  - flashcards rows: one vote per user who saved the word
+
+Card text is user-editable, so cards only corroborate: a card votes for a
+translation only if a cached answer or --jsonl row gives the same one, and
+the spelling, part of speech and examples always come from those rows.
+Accounts that save or edit cards cannot put an answer of their own into
+the lexicon.
+
+Keys use the same canonical word and pair as the translation cache. A
+one-to-one answer (see is_symmetric) is also filed under the reverse pair,
+like the cache does. Rows vote for a translation by its canonical target
+text, so a card and a cached answer that agree count together even if
+their examples or part of speech differ. For each key the most voted
+translation wins, with the part of speech and example pair taken from the
+most voted rows that have them. Keys whose winning translation has fewer
+than --min-count votes are left to the LLM, and only the --max-entries most
+voted keys are kept.
+Restart the backend to pick up a rebuilt file.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+
+# Add project root to path so we can import backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import config
+from backend.db.canonical import canonical_text
+from backend.services.lexicon import write_lexicon
+from backend.services.llm import SUPPORTED_PAIRS, TranslationResult, is_symmetric, reversed_result
+
+# key -> canonical target_text -> (result, votes, from_card) for each row giving that translation
+Votes = defaultdict[str, defaultdict[str, list[tuple[TranslationResult, int, bool]]]]
+
+
+def new_votes() -> Votes:
+    return defaultdict(lambda: defaultdict(list))
+
+
+def add_vote(
+    votes: Votes,
+    result: TranslationResult,
+    source_lang: str,
+    target_lang: str,
+    count: int = 1,
+    reverse: bool = True,
+    from_card: bool = False,
+) -> None:
+    if f"{source_lang}-{target_lang}" not in SUPPORTED_PAIRS:
+        return
+    if not result.source_text.strip() or not result.target_text.strip():
+        return
+    key = f"{canonical_text(result.source_text)}|{source_lang}|{target_lang}"
+    votes[key][canonical_text(result.target_text)].append((result, count, from_card))
+    if reverse and f"{target_lang}-{source_lang}" in SUPPORTED_PAIRS and is_symmetric(result):
+        add_vote(votes, reversed_result(result), target_lang, source_lang, count, reverse=False, from_card=from_card)
+
+
+def load_db(votes: Votes, db_path: str) -> int:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(flashcards)")}
+    # Databases from before migration 8 have no part_of_speech column
+    pos_column = "part_of_speech" if "part_of_speech" in columns else "NULL"
+    rows = conn.execute(
+        f"""
+        SELECT source_text, target_text, example_source, example_target, {pos_column}, language_pair,
+               COUNT(DISTINCT user_id)
+        FROM flashcards
+        GROUP BY source_text, target_text, example_source, example_target, {pos_column}, language_pair
+        """
+    ).fetchall()
+    read = 0
+    for source_text, target_text, example_source, example_target, part_of_speech, pair, users in rows:
+        source_lang, _, target_lang = pair.partition("-")
+        result = TranslationResult(
+            source_text=source_text,
+            target_text=target_text,
+            example_source=example_source or "",
+            example_target=example_target or "",
+            part_of_speech=part_of_speech,
+        )
+        add_vote(votes, result, source_lang, target_lang, users, from_card=True)
+        read += users
+
+    has_cache = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'llm_cache'"
+    ).fetchone()
+    if has_cache:
+        for input_key, value in conn.execute(
+            "SELECT input_key, value FROM llm_cache WHERE kind = 'translate'"
+        ):
+            _, source_lang, target_lang = input_key.rsplit("|", 2)
+            add_vote(votes, TranslationResult.model_validate_json(value), source_lang, target_lang)
+            read += 1
+    conn.close()
+    return read
+
+
+def load_jsonl(votes: Votes, path: str) -> int:
+    read = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            result = TranslationResult.model_validate(item)
+            count = int(item.get("count", 1))
+            add_vote(votes, result, item["source_lang"], item["target_lang"], count)
+            read += count
+    return read
+
+
+def merge(rows: list[tuple[TranslationResult, int, bool]]) -> TranslationResult:
+    """One entry from rows that agree on a translation.
+
+    Spelling comes from the most voted non-card row; part of speech and the
+    example pair from the most voted non-card rows that have them.
+    """
+    ranked = [result for result, _, from_card in sorted(rows, key=lambda row: -row[1]) if not from_card]
+    best = ranked[0]
+    part_of_speech = next((r.part_of_speech for r in ranked if r.part_of_speech), None)
+    example = next((r for r in ranked if r.example_source and r.example_target), best)
+    return best.model_copy(update={
+        "part_of_speech": part_of_speech,
+        "example_source": example.example_source,
+        "example_target": example.example_target,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=config.DATABASE_PATH, help="database to read cards and llm_cache from ('' to skip)")
+    parser.add_argument("--jsonl", help="exported TranslationResult objects, one per line")
+    parser.add_argument("--min-count", type=int, default=2, help="fewest votes for a word to be included")
+    parser.add_argument("--max-entries", type=int, default=50000)
+    parser.add_argument("--output", default=config.LEXICON_PATH)
+    args = parser.parse_args()
+
+    votes = new_votes()
+    read = 0
+    if args.db:
+        read += load_db(votes, args.db)
+    if args.jsonl:
+        read += load_jsonl(votes, args.jsonl)
+
+    ranked = []
+    for key, answers in votes.items():
+        tallies = {
+            target: sum(count for _, count, _ in rows)
+            for target, rows in answers.items()
+            if not all(from_card for _, _, from_card in rows)
+        }
+        if not tallies:
+            continue
+        winner = min(tallies, key=lambda target: (-tallies[target], target))
+        if tallies[winner] >= args.min_count:
+            ranked.append((tallies[winner], key, answers[winner]))
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    entries = {key: merge(rows).model_dump_json() for _, key, rows in ranked[:args.max_entries]}
+    if not entries:
+        sys.exit(f"No translation has {args.min_count}+ votes ({read} votes over {len(votes)} words); nothing written")
+
+    written = write_lexicon(args.output, entries)
+    print(f"{read} votes over {len(votes)} words -> {written} entries in {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()